@@ -1,171 +1,293 @@
+"""
+Client Relationships Analysis
+=============================
+Reports, for every client, its PizzaStatuses and the StatusTypes (by
+division) that reference each of them. It ends with statistics on
+PizzaStatuses without a client, StatusTypes without a PizzaStatus, and
+orphaned PizzaStatuses.
+
+Client sections are streamed to the output file in client-name order.
+They are rendered in-process by default; pickling a section for a worker
+costs more than rendering it. With ``--workers N`` each worker process
+loads App_Data once, at start-up, and is sent only client IDs. This only
+helps when sections are large. At most a few sections per worker are in
+flight, so memory does not grow with the number of clients.
+
+Formats:
+    text  the original report (Queries/client_relationships_analysis.txt)
+    json  {"summary", "clients": [...], "statistics"}, one client per line
+    csv   one row per (client, PizzaStatus, referencing StatusType)
+
+Usage:
+    python analyze_client_relationships.py [--format text|json|csv] [--output PATH]
+        [--workers N] [--app-data DIR] [--profile] [--trace-memory]
+"""
+
+import argparse
+import csv
+import io
 import json
 import os
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import profiling
+from app_data import APP_DATA_DIR, AppData
 
 # Paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
-app_data_path = os.path.join(project_root, 'OrionOperatorLifecycleWebApp', 'App_Data')
 queries_path = os.path.join(project_root, 'Queries')
 
-# Read data files
-with open(os.path.join(app_data_path, 'pay_PizzaStatuses.json'), 'r') as f:
-    pizza_statuses = json.load(f)
-
-with open(os.path.join(app_data_path, 'pay_StatusTypes.json'), 'r') as f:
-    status_types = json.load(f)
-
-with open(os.path.join(app_data_path, 'pay_Clients.json'), 'r') as f:
-    clients = json.load(f)
-
-# Create client lookup
-client_lookup = {c['ID']: c['Description'] for c in clients}
-
-# Group PizzaStatuses by ClientID
-client_pizza_map = defaultdict(list)
-for ps in pizza_statuses:
-    client_id = ps.get('ClientID')
-    if client_id:
-        client_pizza_map[client_id].append(ps)
-
-# Build report
-report_lines = []
-report_lines.append("=" * 100)
-report_lines.append("CLIENT RELATIONSHIPS ANALYSIS")
-report_lines.append("=" * 100)
-report_lines.append("")
-
-# Summary
-report_lines.append(f"Total Clients: {len(client_lookup)}")
-report_lines.append(f"Total PizzaStatuses: {len(pizza_statuses)}")
-report_lines.append(f"Total StatusTypes: {len(status_types)}")
-report_lines.append("")
-report_lines.append("=" * 100)
-report_lines.append("")
-
-# Analyze each client
-for client_id in sorted(client_pizza_map.keys(), key=lambda x: client_lookup.get(x, 'Unknown')):
-    client_name = client_lookup.get(client_id, 'Unknown Client')
-    client_pizzas = client_pizza_map[client_id]
-    
-    report_lines.append("")
-    report_lines.append("=" * 100)
-    report_lines.append(f"CLIENT: {client_name}")
-    report_lines.append(f"Client ID: {client_id}")
-    report_lines.append(f"PizzaStatuses Count: {len(client_pizzas)}")
-    report_lines.append("=" * 100)
-    report_lines.append("")
-    
+FORMATS = ('text', 'json', 'csv')
+EXTENSIONS = {'text': 'txt', 'json': 'json', 'csv': 'csv'}
+
+# Sections queued per worker before the writer waits for the oldest one
+SECTIONS_IN_FLIGHT = 4
+
+# Per-process state of a --workers pool: (store, client_lookup, output_format)
+_worker = None
+
+CSV_FIELDS = ['ClientID', 'Client', 'PizzaStatusID', 'PizzaStatus', 'Description', 'MobileAppOrder',
+              'IsOperator', 'IsProvider', 'DivisionID', 'StatusTypeID', 'StatusType', 'OrderID', 'isDeleted']
+
+def client_lookup_for(store):
+    return {c['ID']: c['Description'] for c in store.clients}
+
+def client_ids(store, client_lookup):
+    """ClientIDs that have PizzaStatuses, in report order."""
+    return sorted(store.pizza_statuses.index('ClientID').keys(), key=lambda x: client_lookup.get(x, 'Unknown'))
+
+def client_section(store, client_lookup, client_id):
+    """(client_id, client_name, [(PizzaStatus, referencing StatusTypes)]) for one client."""
+    status_types = store.status_types
     # Sort PizzaStatuses by MobileAppOrder
     sorted_pizzas = sorted(
-        client_pizzas, 
+        store.pizza_statuses.index('ClientID').get(client_id, []),
         key=lambda x: (x.get('MobileAppOrder') is None, x.get('MobileAppOrder', 0))
     )
-    
-    for ps in sorted_pizzas:
-        pizza_id = ps.get('ID')
-        status_name = ps.get('Status', 'Unknown')
-        description = ps.get('Description', '')
-        mobile_order = ps.get('MobileAppOrder', 'N/A')
-        is_operator = ps.get('IsOperator', False)
-        is_provider = ps.get('IsProvider', False)
-        
-        report_lines.append(f"  📊 PizzaStatus: {status_name}")
-        report_lines.append(f"     ID: {pizza_id}")
-        report_lines.append(f"     Description: {description}")
-        report_lines.append(f"     MobileAppOrder: {mobile_order}")
-        report_lines.append(f"     IsOperator: {is_operator}, IsProvider: {is_provider}")
-        
-        # Find StatusTypes that reference this PizzaStatus
-        related_status_types = [
-            st for st in status_types 
-            if st.get('PizzaStatusID') == pizza_id
-        ]
-        
+    return (client_id, client_lookup.get(client_id, 'Unknown Client'),
+            [(ps, status_types.where('PizzaStatusID', ps.get('ID'))) for ps in sorted_pizzas])
+
+def by_division(related_status_types):
+    division_groups = defaultdict(list)
+    for st in related_status_types:
+        division_groups[st.get('DivisionID', 'Unknown')].append(st)
+    return [(division, division_groups[division]) for division in sorted(division_groups.keys())]
+
+def render_text(section):
+    client_id, client_name, pizzas = section
+    lines = [
+        "",
+        "=" * 100,
+        f"CLIENT: {client_name}",
+        f"Client ID: {client_id}",
+        f"PizzaStatuses Count: {len(pizzas)}",
+        "=" * 100,
+        "",
+    ]
+    for ps, related_status_types in pizzas:
+        lines.append(f"  📊 PizzaStatus: {ps.get('Status', 'Unknown')}")
+        lines.append(f"     ID: {ps.get('ID')}")
+        lines.append(f"     Description: {ps.get('Description', '')}")
+        lines.append(f"     MobileAppOrder: {ps.get('MobileAppOrder', 'N/A')}")
+        lines.append(f"     IsOperator: {ps.get('IsOperator', False)}, IsProvider: {ps.get('IsProvider', False)}")
         if related_status_types:
-            report_lines.append(f"     → Referenced by {len(related_status_types)} StatusType(s):")
-            
-            # Group by division
-            division_groups = defaultdict(list)
-            for st in related_status_types:
-                division = st.get('DivisionID', 'Unknown')
-                division_groups[division].append(st)
-            
-            for division in sorted(division_groups.keys()):
-                division_sts = division_groups[division]
-                report_lines.append(f"        Division: {division}")
+            lines.append(f"     → Referenced by {len(related_status_types)} StatusType(s):")
+            for division, division_sts in by_division(related_status_types):
+                lines.append(f"        Division: {division}")
                 for st in division_sts:
-                    st_status = st.get('Status', 'Unknown')
-                    st_order = st.get('OrderID', 'N/A')
-                    is_deleted = st.get('isDeleted', False)
-                    deleted_marker = ' [DELETED]' if is_deleted else ''
-                    report_lines.append(f"          • {st_status} (Order: {st_order}){deleted_marker}")
+                    deleted_marker = ' [DELETED]' if st.get('isDeleted', False) else ''
+                    lines.append(f"          • {st.get('Status', 'Unknown')} (Order: {st.get('OrderID', 'N/A')})"
+                                 f"{deleted_marker}")
         else:
-            report_lines.append(f"     → ⚠️ NOT referenced by any StatusTypes")
-        
-        report_lines.append("")
-
-# Statistics
-report_lines.append("")
-report_lines.append("=" * 100)
-report_lines.append("STATISTICS")
-report_lines.append("=" * 100)
-report_lines.append("")
-
-# PizzaStatuses without ClientID
-no_client = [ps for ps in pizza_statuses if not ps.get('ClientID')]
-if no_client:
-    report_lines.append(f"⚠️ PizzaStatuses without ClientID: {len(no_client)}")
-    for ps in no_client[:5]:  # Show first 5
-        report_lines.append(f"   • {ps.get('Status', 'Unknown')} (ID: {ps.get('ID')})")
-    if len(no_client) > 5:
-        report_lines.append(f"   ... and {len(no_client) - 5} more")
-    report_lines.append("")
-
-# StatusTypes without PizzaStatusID
-no_pizza = [st for st in status_types if not st.get('PizzaStatusID')]
-if no_pizza:
-    report_lines.append(f"⚠️ StatusTypes without PizzaStatusID: {len(no_pizza)}")
-    for st in no_pizza[:10]:  # Show first 10
-        division = st.get('DivisionID', 'Unknown')
-        status = st.get('Status', 'Unknown')
-        report_lines.append(f"   • {status} (Division: {division})")
-    if len(no_pizza) > 10:
-        report_lines.append(f"   ... and {len(no_pizza) - 10} more")
-    report_lines.append("")
-
-# Orphaned PizzaStatuses (not referenced by any StatusType)
-orphaned = []
-for ps in pizza_statuses:
-    pizza_id = ps.get('ID')
-    has_reference = any(st.get('PizzaStatusID') == pizza_id for st in status_types)
-    if not has_reference:
-        orphaned.append(ps)
-
-if orphaned:
-    report_lines.append(f"⚠️ Orphaned PizzaStatuses (not referenced by StatusTypes): {len(orphaned)}")
-    for ps in orphaned[:10]:
-        client_id = ps.get('ClientID')
-        client_name = client_lookup.get(client_id, 'No Client')
-        report_lines.append(f"   • {ps.get('Status', 'Unknown')} - Client: {client_name}")
-    if len(orphaned) > 10:
-        report_lines.append(f"   ... and {len(orphaned) - 10} more")
-
-report_lines.append("")
-report_lines.append("=" * 100)
-report_lines.append("END OF REPORT")
-report_lines.append("=" * 100)
-
-# Write report
-output_file = os.path.join(queries_path, 'client_relationships_analysis.txt')
-with open(output_file, 'w', encoding='utf-8') as f:
-    f.write('\n'.join(report_lines))
-
-print(f"✅ Analysis complete!")
-print(f"📄 Report written to: {output_file}")
-print(f"\nSummary:")
-print(f"  • Clients analyzed: {len(client_pizza_map)}")
-print(f"  • PizzaStatuses: {len(pizza_statuses)}")
-print(f"  • StatusTypes: {len(status_types)}")
-print(f"  • Orphaned PizzaStatuses: {len(orphaned)}")
-print(f"  • StatusTypes without PizzaStatusID: {len(no_pizza)}")
+            lines.append(f"     → ⚠️ NOT referenced by any StatusTypes")
+        lines.append("")
+    return '\n'.join(lines) + '\n'
+
+def render_json(section):
+    client_id, client_name, pizzas = section
+    data = {
+        'ClientID': client_id,
+        'Client': client_name,
+        'PizzaStatuses': [{
+            'ID': ps.get('ID'),
+            'Status': ps.get('Status'),
+            'Description': ps.get('Description'),
+            'MobileAppOrder': ps.get('MobileAppOrder'),
+            'IsOperator': ps.get('IsOperator'),
+            'IsProvider': ps.get('IsProvider'),
+            'Divisions': {division: [{'Id': st.get('Id'), 'Status': st.get('Status'),
+                                      'OrderID': st.get('OrderID'), 'isDeleted': st.get('isDeleted')}
+                                     for st in division_sts]
+                          for division, division_sts in by_division(related_status_types)},
+        } for ps, related_status_types in pizzas],
+    }
+    return json.dumps(data, ensure_ascii=False)
+
+def render_csv(section):
+    client_id, client_name, pizzas = section
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for ps, related_status_types in pizzas:
+        pizza_fields = [client_id, client_name, ps.get('ID'), ps.get('Status'), ps.get('Description'),
+                        ps.get('MobileAppOrder'), ps.get('IsOperator'), ps.get('IsProvider')]
+        if not related_status_types:
+            writer.writerow(pizza_fields + [None] * 5)
+        for division, division_sts in by_division(related_status_types):
+            for st in division_sts:
+                writer.writerow(pizza_fields + [division, st.get('Id'), st.get('Status'), st.get('OrderID'),
+                                                st.get('isDeleted')])
+    return buffer.getvalue()
+
+RENDERERS = {'text': render_text, 'json': render_json, 'csv': render_csv}
+
+def init_worker(app_data_dir, cache_dir, output_format):
+    """Pool initializer: load App_Data once per worker process."""
+    global _worker
+    store = AppData(app_data_dir, cache_dir)
+    _worker = (store, client_lookup_for(store), output_format)
+
+def render_client(client_id):
+    """Render one client's section in a worker process."""
+    store, client_lookup, output_format = _worker
+    return RENDERERS[output_format](client_section(store, client_lookup, client_id))
+
+def rendered_sections(store, client_lookup, output_format, workers=1):
+    """Rendered sections in report order, with a bounded number in flight."""
+    ids = client_ids(store, client_lookup)
+    if workers <= 1:
+        for client_id in ids:
+            yield RENDERERS[output_format](client_section(store, client_lookup, client_id))
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(store.app_data_dir, store.cache_dir, output_format)) as pool:
+        pending = deque()
+        for client_id in ids:
+            pending.append(pool.submit(render_client, client_id))
+            if len(pending) >= workers * SECTIONS_IN_FLIGHT:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def find_issues(pizza_statuses, status_types):
+    """(PizzaStatuses without ClientID, StatusTypes without PizzaStatusID, orphaned PizzaStatuses)"""
+    no_client = [ps for ps in pizza_statuses if not ps.get('ClientID')]
+    no_pizza = [st for st in status_types if not st.get('PizzaStatusID')]
+    orphaned = [ps for ps in pizza_statuses if not status_types.where('PizzaStatusID', ps.get('ID'))]
+    return no_client, no_pizza, orphaned
+
+def header_text(client_lookup, pizza_statuses, status_types):
+    lines = [
+        "=" * 100,
+        "CLIENT RELATIONSHIPS ANALYSIS",
+        "=" * 100,
+        "",
+        f"Total Clients: {len(client_lookup)}",
+        f"Total PizzaStatuses: {len(pizza_statuses)}",
+        f"Total StatusTypes: {len(status_types)}",
+        "",
+        "=" * 100,
+        "",
+    ]
+    return '\n'.join(lines) + '\n'
+
+def statistics_text(client_lookup, no_client, no_pizza, orphaned):
+    lines = ["", "=" * 100, "STATISTICS", "=" * 100, ""]
+
+    if no_client:
+        lines.append(f"⚠️ PizzaStatuses without ClientID: {len(no_client)}")
+        for ps in no_client[:5]:  # Show first 5
+            lines.append(f"   • {ps.get('Status', 'Unknown')} (ID: {ps.get('ID')})")
+        if len(no_client) > 5:
+            lines.append(f"   ... and {len(no_client) - 5} more")
+        lines.append("")
+
+    if no_pizza:
+        lines.append(f"⚠️ StatusTypes without PizzaStatusID: {len(no_pizza)}")
+        for st in no_pizza[:10]:  # Show first 10
+            lines.append(f"   • {st.get('Status', 'Unknown')} (Division: {st.get('DivisionID', 'Unknown')})")
+        if len(no_pizza) > 10:
+            lines.append(f"   ... and {len(no_pizza) - 10} more")
+        lines.append("")
+
+    if orphaned:
+        lines.append(f"⚠️ Orphaned PizzaStatuses (not referenced by StatusTypes): {len(orphaned)}")
+        for ps in orphaned[:10]:
+            lines.append(f"   • {ps.get('Status', 'Unknown')} - Client: {client_lookup.get(ps.get('ClientID'), 'No Client')}")
+        if len(orphaned) > 10:
+            lines.append(f"   ... and {len(orphaned) - 10} more")
+
+    lines += ["", "=" * 100, "END OF REPORT", "=" * 100]
+    return '\n'.join(lines)
+
+def write_report(store, output_file, output_format='text', workers=1):
+    """Stream the report to output_file. Returns (clients, no_client, no_pizza, orphaned)."""
+    pizza_statuses = store.pizza_statuses
+    status_types = store.status_types
+    client_lookup = client_lookup_for(store)
+    with profiling.phase('compute'):
+        no_client, no_pizza, orphaned = find_issues(pizza_statuses, status_types)
+    sections = rendered_sections(store, client_lookup, output_format, workers)
+
+    clients = 0
+    newline = '' if output_format == 'csv' else None
+    # Sections are rendered (by the workers) as they are written, so both count as render
+    with profiling.phase('render'), open(output_file, 'w', encoding='utf-8', newline=newline) as f:
+        if output_format == 'text':
+            f.write(header_text(client_lookup, pizza_statuses, status_types))
+            for text in sections:
+                f.write(text)
+                clients += 1
+            f.write(statistics_text(client_lookup, no_client, no_pizza, orphaned))
+        elif output_format == 'json':
+            summary = {'clients': len(client_lookup), 'pizzaStatuses': len(pizza_statuses),
+                       'statusTypes': len(status_types)}
+            f.write(f'{{"summary": {json.dumps(summary)},\n "clients": [\n')
+            for text in sections:
+                f.write((',\n' if clients else '') + text)
+                clients += 1
+            statistics = {
+                'pizzaStatusesWithoutClient': [{'ID': ps.get('ID'), 'Status': ps.get('Status')} for ps in no_client],
+                'statusTypesWithoutPizzaStatus': [{'Id': st.get('Id'), 'Status': st.get('Status'),
+                                                   'DivisionID': st.get('DivisionID')} for st in no_pizza],
+                'orphanedPizzaStatuses': [{'ID': ps.get('ID'), 'Status': ps.get('Status'),
+                                           'ClientID': ps.get('ClientID')} for ps in orphaned],
+            }
+            f.write(f'\n ],\n "statistics": {json.dumps(statistics, ensure_ascii=False)}}}\n')
+        else:
+            csv.writer(f).writerow(CSV_FIELDS)
+            for text in sections:
+                f.write(text)
+                clients += 1
+    return clients, no_client, no_pizza, orphaned
+
+def main():
+    parser = argparse.ArgumentParser(description="Report clients, their PizzaStatuses and referencing StatusTypes.")
+    parser.add_argument('--format', choices=FORMATS, default='text')
+    parser.add_argument('--output', help="Output file (default: Queries/client_relationships_analysis.<ext>)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes rendering client sections (default: 1, in-process)")
+    parser.add_argument('--app-data', default=APP_DATA_DIR, help="App_Data directory to read")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+
+    store = AppData(args.app_data)
+    output_file = args.output
+    if not output_file:
+        os.makedirs(queries_path, exist_ok=True)
+        output_file = os.path.join(queries_path, f"client_relationships_analysis.{EXTENSIONS[args.format]}")
+    profiling.start(args, 'analyze_client_relationships', output_file)
+    clients, no_client, no_pizza, orphaned = write_report(store, output_file, args.format, args.workers)
+
+    print(f"✅ Analysis complete!")
+    print(f"📄 Report written to: {output_file}")
+    print(f"\nSummary:")
+    print(f"  • Clients analyzed: {clients}")
+    print(f"  • PizzaStatuses: {len(store.pizza_statuses)}")
+    print(f"  • StatusTypes: {len(store.status_types)}")
+    print(f"  • Orphaned PizzaStatuses: {len(orphaned)}")
+    print(f"  • StatusTypes without PizzaStatusID: {len(no_pizza)}")
+
+if __name__ == '__main__':
+    main()
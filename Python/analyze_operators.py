@@ -4,55 +4,47 @@ Analyze Exported Operator Data
 Generates a summary report of the operators in the JSON files.
 Shows distribution by division, status, and other key metrics.
 
+The counts come from the persistent store in operator_aggregates.py: the
+first run counts every file once, later runs only apply what the exporter
+changed since (or recount a table whose file was replaced).
+
 Usage:
-    python analyze_operators.py
+    python analyze_operators.py [--rebuild] [--change-log PATH] [--app-data DIR] [--output CSV]
+        [--profile] [--trace-memory]
 """
 
-import json
+import argparse
 import os
-from collections import defaultdict, Counter
-from datetime import datetime
+
+import profiling
+from app_data import APP_DATA_DIR
+from operator_aggregates import CERTIFICATIONS, CHANGE_LOG, OPERATORS, STATUS_TRACKER, load
 
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-APP_DATA_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'OrionOperatorLifecycleWebApp', 'App_Data')
 
-def load_json_file(filename):
-    """Load JSON file from App_Data directory."""
-    filepath = os.path.join(APP_DATA_DIR, filename)
-    if not os.path.exists(filepath):
-        print(f"⚠️  File not found: {filepath}")
-        return None
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+def check_file(aggregates, filename):
+    """Warn if an App_Data file does not exist."""
+    if aggregates.sources.get(filename) is None:
+        print(f"⚠️  File not found: {aggregates.store.path(filename)}")
 
-def analyze_operators():
+def analyze_operators(aggregates):
     """Analyze operator distribution by division and status."""
     print("=" * 80)
     print("OPERATOR DATA SUMMARY")
     print("=" * 80)
     
-    # Load operators
-    operators = load_json_file('pay_Operators.json')
-    if not operators:
-        print("❌ Could not load operators data")
-        return
+    check_file(aggregates, OPERATORS)
+    operator_count = aggregates.operator_count
+    by_division = aggregates.by_division
+    by_status = aggregates.by_status
+    by_division_status = aggregates.by_division_status
     
-    print(f"\n📊 Total Operators: {len(operators)}")
-    
-    # Group by division and status
-    by_division = defaultdict(list)
-    by_status = defaultdict(list)
-    by_division_status = defaultdict(lambda: defaultdict(list))
+    if not operator_count:
+        print("❌ Could not load operators data")
+        return None, None
     
-    for op in operators:
-        division_id = op.get('DivisionID') or 'Unknown'
-        status = op.get('Status') or 'None'
-        
-        by_division[division_id].append(op)
-        by_status[status].append(op)
-        by_division_status[division_id][status].append(op)
+    print(f"\n📊 Total Operators: {operator_count}")
     
     # Summary by Division
     print("\n" + "=" * 80)
@@ -62,7 +54,7 @@ def analyze_operators():
     print("-" * 80)
     
     for division in sorted(by_division.keys()):
-        count = len(by_division[division])
+        count = by_division[division]
         print(f"{division:<30} {count:>10}")
     
     # Summary by Status
@@ -73,7 +65,7 @@ def analyze_operators():
     print("-" * 80)
     
     for status in sorted(by_status.keys()):
-        count = len(by_status[status])
+        count = by_status[status]
         print(f"{status:<40} {count:>10}")
     
     # Detailed breakdown: Division + Status
@@ -83,39 +75,34 @@ def analyze_operators():
     print(f"{'Division':<30} {'Status':<40} {'Count':>10}")
     print("-" * 80)
     
-    for division in sorted(by_division_status.keys()):
-        for status in sorted(by_division_status[division].keys()):
-            count = len(by_division_status[division][status])
-            print(f"{division:<30} {status:<40} {count:>10}")
+    for division, status in sorted(by_division_status.keys()):
+        count = by_division_status[division, status]
+        print(f"{division:<30} {status:<40} {count:>10}")
     
-    return operators, by_division_status
+    return operator_count, by_division_status
 
-def analyze_certifications(operators):
+def analyze_certifications(aggregates, operator_count):
     """Analyze certification data for the operators."""
     print("\n" + "=" * 80)
     print("CERTIFICATION SUMMARY")
     print("=" * 80)
     
-    # Load certifications
-    certifications = load_json_file('pay_Certifications.json')
-    if not certifications:
+    check_file(aggregates, CERTIFICATIONS)
+    total_certs = aggregates.certification_count
+    certs_by_operator = aggregates.certs_by_operator
+    cert_types = aggregates.cert_types
+    
+    if not total_certs:
         print("⚠️  Could not load certifications data")
         return
     
-    print(f"\n📜 Total Certifications: {len(certifications)}")
-    
-    # Group by operator
-    certs_by_operator = defaultdict(list)
-    for cert in certifications:
-        operator_id = cert.get('OperatorID')
-        if operator_id:
-            certs_by_operator[operator_id].append(cert)
+    print(f"\n📜 Total Certifications: {total_certs}")
     
     # Calculate stats
     operators_with_certs = len(certs_by_operator)
-    operators_without_certs = len(operators) - operators_with_certs
+    operators_without_certs = operator_count - operators_with_certs
     
-    cert_counts = [len(certs) for certs in certs_by_operator.values()]
+    cert_counts = certs_by_operator.values()
     avg_certs = sum(cert_counts) / len(cert_counts) if cert_counts else 0
     max_certs = max(cert_counts) if cert_counts else 0
     min_certs = min(cert_counts) if cert_counts else 0
@@ -127,43 +114,33 @@ def analyze_certifications(operators):
     print(f"   Min certifications (single operator): {min_certs}")
     
     # Top certification types
-    cert_types = Counter()
-    for cert in certifications:
-        cert_name = cert.get('Cert') or 'Unknown'
-        cert_types[cert_name] += 1
-    
     print(f"\n📋 Top 10 Certification Types:")
     print(f"{'Certification Name':<50} {'Count':>10}")
     print("-" * 80)
     for cert_name, count in cert_types.most_common(10):
         print(f"{cert_name[:48]:<50} {count:>10}")
 
-def analyze_status_tracker(operators):
+def analyze_status_tracker(aggregates, operator_count):
     """Analyze status tracker data."""
     print("\n" + "=" * 80)
     print("STATUS TRACKER SUMMARY")
     print("=" * 80)
     
-    # Load status tracker
-    status_tracker = load_json_file('pay_StatusTracker.json')
-    if not status_tracker:
+    check_file(aggregates, STATUS_TRACKER)
+    total_records = aggregates.tracker_records
+    tracker_by_operator = aggregates.tracker_by_operator
+    
+    if not total_records:
         print("⚠️  Could not load status tracker data")
         return
     
-    print(f"\n📊 Total Status Tracker Records: {len(status_tracker)}")
-    
-    # Group by operator
-    tracker_by_operator = defaultdict(list)
-    for record in status_tracker:
-        operator_id = record.get('OperatorID')
-        if operator_id:
-            tracker_by_operator[operator_id].append(record)
+    print(f"\n📊 Total Status Tracker Records: {total_records}")
     
     # Calculate stats
     operators_with_history = len(tracker_by_operator)
-    operators_without_history = len(operators) - operators_with_history
+    operators_without_history = operator_count - operators_with_history
     
-    history_counts = [len(records) for records in tracker_by_operator.values()]
+    history_counts = tracker_by_operator.values()
     avg_records = sum(history_counts) / len(history_counts) if history_counts else 0
     max_records = max(history_counts) if history_counts else 0
     
@@ -172,31 +149,44 @@ def analyze_status_tracker(operators):
     print(f"   Average status changes per operator: {avg_records:.1f}")
     print(f"   Max status changes (single operator): {max_records}")
 
-def export_to_csv(by_division_status):
-    """Export the division/status summary to CSV."""
-    output_file = os.path.join(SCRIPT_DIR, 'operator_summary.csv')
+def export_to_csv(by_division_status, output_file=None):
+    """Export the {(division, status): count} summary to CSV."""
+    output_file = output_file or os.path.join(SCRIPT_DIR, 'operator_summary.csv')
     
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write("Division,Status,Count\n")
         
-        for division in sorted(by_division_status.keys()):
-            for status in sorted(by_division_status[division].keys()):
-                count = len(by_division_status[division][status])
-                # Escape commas in division/status names
-                div_safe = f'"{division}"' if ',' in division else division
-                status_safe = f'"{status}"' if ',' in status else status
-                f.write(f"{div_safe},{status_safe},{count}\n")
+        for division, status in sorted(by_division_status.keys()):
+            count = by_division_status[division, status]
+            # Escape commas in division/status names
+            div_safe = f'"{division}"' if ',' in division else division
+            status_safe = f'"{status}"' if ',' in status else status
+            f.write(f"{div_safe},{status_safe},{count}\n")
     
     print(f"\n💾 Exported summary to: {output_file}")
 
 def main():
     """Main analysis function."""
-    operators, by_division_status = analyze_operators()
-    
-    if operators:
-        analyze_certifications(operators)
-        analyze_status_tracker(operators)
-        export_to_csv(by_division_status)
+    parser = argparse.ArgumentParser(description="Summarize operators, certifications and status history.")
+    parser.add_argument('--rebuild', action='store_true', help="Recount every file instead of applying changes")
+    parser.add_argument('--app-data', default=APP_DATA_DIR, help="App_Data directory to read")
+    parser.add_argument('--change-log', default=CHANGE_LOG, help="Exporter change log to apply")
+    parser.add_argument('--output', help="Summary CSV to write (default: Python/operator_summary.csv)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'analyze_operators', args.output or SCRIPT_DIR)
+    
+    with profiling.phase('compute'):
+        aggregates, _, _ = load(args.app_data, change_log=args.change_log, rebuild=args.rebuild)
+    with profiling.phase('render'):
+        operator_count, by_division_status = analyze_operators(aggregates)
+    
+    if operator_count:
+        with profiling.phase('render'):
+            analyze_certifications(aggregates, operator_count)
+            analyze_status_tracker(aggregates, operator_count)
+        with profiling.phase('write'):
+            export_to_csv(by_division_status, args.output)
     
     print("\n" + "=" * 80)
     print("✅ Analysis completed!")
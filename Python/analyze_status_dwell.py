@@ -0,0 +1,229 @@
+"""
+Status Dwell-Time and Funnel Analysis
+=====================================
+Answers two questions from pay_StatusTracker history:
+
+- How long do operators sit in each status? Each operator's events are
+  ordered by ``Date``, and the dwell time of an event is the time until that
+  operator's next event. The report gives count, mean and p50/p90/p95 in
+  days, per division and status. An operator's latest status is still open
+  and is counted separately as "current".
+- Where do operators drop out of each division's workflow? Statuses are
+  placed in the workflow by ``pay_StatusTypes.OrderID``. For each step the
+  funnel shows how many operators reached it (or got further), how many
+  stopped there, and the conversion to the next step.
+
+The work is done on the columnar tracker (tracker_columns.py) with whole-
+column operations: C-level sorts of an index permutation keyed on
+``list.__getitem__`` and applied with ``operator.itemgetter``, ``map``/
+``compress`` over shifted columns, and ``groupby`` over sorted runs. There is
+no per-event Python code after the initial conversion.
+
+Usage:
+    python analyze_status_dwell.py [--columns tracker.columns] [--division "10 - OR"]
+        [--min-events 5] [--csv DIR] [--profile] [--trace-memory]
+"""
+
+import argparse
+import csv
+import operator
+import os
+from collections import Counter
+from itertools import compress, groupby, repeat
+
+import profiling
+from app_data import AppData
+from tracker_columns import MISSING, NO_DATE, TrackerColumns
+
+MICROSECONDS_PER_DAY = 86400 * 1000000
+NOT_IN_WORKFLOW = -1
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * fraction // 1))
+    return sorted_values[int(rank) - 1]
+
+def status_lookup(columns, store):
+    """Per status code: (DivisionID, Status, OrderID or None) from pay_StatusTypes."""
+    status_types = store.status_types
+    lookup = []
+    for status_id in columns.statuses.values:
+        status_type = status_types.get(status_id) or {}
+        order = status_type.get('OrderID')
+        lookup.append((status_type.get('DivisionID') or 'Unknown',
+                       status_type.get('Status') or f"<unknown {status_id}>",
+                       float(order) if order not in (None, '') else None))
+    return lookup
+
+def sort_columns(keys, columns):
+    """Return columns (lists) reordered so the keys columns, most significant first, are ascending.
+
+    An index permutation is sorted once per key, least significant first (the
+    sort is stable), and applied to every column with itemgetter.
+    """
+    order = list(range(len(keys[0])))
+    for key in reversed(keys):
+        order.sort(key=key.__getitem__)
+    if len(order) < 2:
+        return [list(column) for column in columns]
+    take = operator.itemgetter(*order)
+    return [list(take(column)) for column in columns]
+
+def sorted_events(columns):
+    """Usable events as three parallel lists (operator, date, status) sorted by operator, then date.
+
+    Events without a date, operator or status are dropped.
+    """
+    usable = list(map(all, zip(map(operator.ne, columns.date, repeat(NO_DATE)),
+                               map(operator.ne, columns.operator, repeat(MISSING)),
+                               map(operator.ne, columns.status, repeat(MISSING)))))
+    events = [list(compress(column, usable)) for column in (columns.operator, columns.date, columns.status)]
+    operators, dates, statuses = sort_columns(events, events)
+    return operators, dates, statuses
+
+def dwell_times(operators, dates, statuses):
+    """Return ({status code: sorted dwell times in microseconds}, Counter of current statuses)."""
+    # An event is closed when the next event belongs to the same operator
+    same_operator = list(map(operator.eq, operators[1:], operators[:-1]))
+    durations = map(operator.sub, dates[1:], dates[:-1])
+    closed = [list(compress(statuses[:-1], same_operator)), list(compress(durations, same_operator))]
+    closed_statuses, closed_durations = sort_columns(closed, closed)
+    by_status = {status: list(map(operator.itemgetter(1), group))
+                 for status, group in groupby(zip(closed_statuses, closed_durations),
+                                              key=operator.itemgetter(0))}
+    # The last event of each operator is the status they are in now
+    is_last = list(map(operator.not_, same_operator)) + [True] if operators else []
+    current = Counter(compress(statuses, is_last))
+    return by_status, current
+
+def furthest_steps(operators, statuses, lookup):
+    """{operator code: status code of the furthest workflow step reached}."""
+    orders = [NOT_IN_WORKFLOW if order is None else order for _, _, order in lookup]
+    steps = list(map(orders.__getitem__, statuses))
+    in_workflow = list(map(operator.ne, steps, repeat(NOT_IN_WORKFLOW)))
+    ranked = [list(compress(column, in_workflow)) for column in (operators, steps, statuses)]
+    ranked_operators, _, ranked_statuses = sort_columns(ranked, ranked)
+    # Sorted by (operator, step), dict() keeps the last -- i.e. furthest -- step per operator
+    return dict(zip(ranked_operators, ranked_statuses))
+
+def build_dwell_report(lookup, by_status, current, division=None, min_events=1):
+    """Rows of (division, status, order, count, mean, p50, p90, p95, current) with times in days."""
+    rows = []
+    for code, (status_division, status, order) in enumerate(lookup):
+        if division and status_division != division:
+            continue
+        durations = by_status.get(code, [])
+        if len(durations) < min_events and not current.get(code):
+            continue
+        days = list(map(operator.truediv, durations, repeat(MICROSECONDS_PER_DAY)))
+        rows.append((status_division, status, order, len(days),
+                     sum(days) / len(days) if days else None,
+                     percentile(days, 0.5), percentile(days, 0.9), percentile(days, 0.95),
+                     current.get(code, 0)))
+    rows.sort(key=lambda row: (row[0], row[2] is None, row[2] or 0, row[1]))
+    return rows
+
+def build_funnels(furthest, lookup, division=None):
+    """{division: [(order, status, reached, stopped, conversion to next step)]}"""
+    stopped = Counter(furthest.values())
+    steps_by_division = {}
+    for code, (status_division, status, order) in enumerate(lookup):
+        if order is None or (division and status_division != division):
+            continue
+        steps_by_division.setdefault(status_division, []).append((order, status, stopped.get(code, 0)))
+
+    funnels = {}
+    for status_division, steps in steps_by_division.items():
+        # Merge status codes that share a step, then accumulate from the last step backwards
+        merged = []
+        for order, group in groupby(sorted(steps), key=operator.itemgetter(0)):
+            group = list(group)
+            merged.append((order, ' / '.join(sorted({name for _, name, _ in group})),
+                           sum(count for _, _, count in group)))
+        reached = 0
+        funnel = []
+        for order, status, count in reversed(merged):
+            next_reached = reached
+            reached += count
+            funnel.append((order, status, reached, count,
+                           next_reached / reached if reached and funnel else None))
+        funnels[status_division] = funnel[::-1]
+    return funnels
+
+def format_days(value):
+    return f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+
+def print_dwell_report(rows):
+    print("=" * 120)
+    print("STATUS DWELL TIME (days)")
+    print("=" * 120)
+    print(f"{'Division':<22} {'Status':<40} {'Order':>6} {'Count':>7} {'Mean':>8} {'p50':>8} "
+          f"{'p90':>8} {'p95':>8} {'Current':>8}")
+    print("-" * 120)
+    for division, status, order, count, mean, p50, p90, p95, current in rows:
+        order_text = f"{order:g}" if order is not None else '-'
+        print(f"{division[:22]:<22} {status[:40]:<40} {order_text:>6} {count:>7} {format_days(mean)} "
+              f"{format_days(p50)} {format_days(p90)} {format_days(p95)} {current:>8}")
+
+def print_funnels(funnels):
+    print("\n" + "=" * 120)
+    print("WORKFLOW FUNNEL (operators reaching each step, by furthest step reached)")
+    print("=" * 120)
+    for division in sorted(funnels):
+        print(f"\n📍 {division}")
+        print(f"   {'Order':>6} {'Status':<50} {'Reached':>8} {'Stopped':>8} {'→ Next':>8}")
+        for order, status, reached, stopped, conversion in funnels[division]:
+            conversion_text = f"{conversion:>7.0%}" if conversion is not None else f"{'-':>7}"
+            print(f"   {order:>6g} {status[:50]:<50} {reached:>8} {stopped:>8} {conversion_text:>8}")
+
+def write_csv(directory, dwell_rows, funnels):
+    """Write dwell_times.csv and funnel.csv to directory."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'dwell_times.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Division', 'Status', 'OrderID', 'Count', 'MeanDays', 'P50Days', 'P90Days',
+                         'P95Days', 'Current'])
+        writer.writerows(dwell_rows)
+    with open(os.path.join(directory, 'funnel.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Division', 'OrderID', 'Status', 'Reached', 'Stopped', 'ConversionToNext'])
+        for division in sorted(funnels):
+            for step in funnels[division]:
+                writer.writerow([division, *step])
+    print(f"\n💾 Wrote dwell_times.csv and funnel.csv to {directory}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Status dwell-time percentiles and workflow funnels.")
+    parser.add_argument('--columns', help="Columnar tracker saved by tracker_columns.py --save "
+                                          "(default: convert App_Data/pay_StatusTracker.json)")
+    parser.add_argument('--division', help="Only report this DivisionID")
+    parser.add_argument('--min-events', type=int, default=1,
+                        help="Hide statuses with fewer closed events than this (default: 1)")
+    parser.add_argument('--csv', metavar='DIR', help="Also write the results as CSV files to DIR")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'analyze_status_dwell', args.csv)
+
+    store = AppData()
+    with profiling.phase('load'):
+        columns = TrackerColumns.load(args.columns) if args.columns else TrackerColumns.from_app_data(store)
+    print(f"📊 {len(columns):,} tracker events for {len(columns.operators):,} operators\n")
+
+    with profiling.phase('compute'):
+        lookup = status_lookup(columns, store)
+        operators, dates, statuses = sorted_events(columns)
+        by_status, current = dwell_times(operators, dates, statuses)
+        furthest = furthest_steps(operators, statuses, lookup)
+        dwell_rows = build_dwell_report(lookup, by_status, current, args.division, args.min_events)
+        funnels = build_funnels(furthest, lookup, args.division)
+    with profiling.phase('render'):
+        print_dwell_report(dwell_rows)
+        print_funnels(funnels)
+    if args.csv:
+        with profiling.phase('write'):
+            write_csv(args.csv, dwell_rows, funnels)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+"""
+Shared App_Data Loader
+======================
+Loads the JSON files in OrionOperatorLifecycleWebApp/App_Data once per
+process and serves lookups from hash indexes instead of list scans.
+
+    from app_data import AppData
+
+    store = AppData()
+    store.status_types.where('PizzaStatusID', pizza_id)   # list of StatusTypes
+    store.clients.get(client_id)                         # one client or None
+    store.certifications.index('OperatorID')             # {OperatorID: [certs]}
+
+Each file is parsed on first access and each index is built on first use
+(one pass over the records), so a report that does k lookups on a table of
+n records costs O(n + k) rather than O(n * k).
+
+Parsed files are also kept as binary ``marshal`` snapshots in
+Python/app_data_cache/, keyed on the file's path, size and mtime. A later
+run loads the snapshot instead of re-parsing the JSON; when the exporter
+rewrites a file its size/mtime change and the snapshot is rebuilt. Set
+ORION_APP_DATA_CACHE=off to bypass the cache, or to a directory to move it.
+ORION_APP_DATA_DIR points every tool at another App_Data directory (e.g. one
+written by generate_app_data.py).
+
+For files too large to hold in memory, ``AppData.stream(filename)`` yields
+one record at a time from a JSON array or an NDJSON file (one object per
+line, e.g. pay_StatusTracker.ndjson), reading the file in fixed-size chunks.
+
+Loading a file and building an index are timed as the ``load`` and
+``index`` phases of a ``--profile`` run (profiling.py).
+
+Usage (pre-build snapshots and compare load times):
+    python app_data.py [--clear]
+"""
+
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import shutil
+import sys
+import threading
+import time
+
+import profiling
+
+# Paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DATA_DIR = (os.environ.get('ORION_APP_DATA_DIR')
+                or os.path.join(os.path.dirname(SCRIPT_DIR), 'OrionOperatorLifecycleWebApp', 'App_Data'))
+
+# Snapshot cache directory (None disables the cache)
+CACHE_DIR = os.environ.get('ORION_APP_DATA_CACHE', os.path.join(SCRIPT_DIR, 'app_data_cache'))
+if CACHE_DIR.lower() in ('', '0', 'off', 'false', 'no'):
+    CACHE_DIR = None
+
+# Bump when the snapshot layout changes; marshal data is also tied to the interpreter
+SNAPSHOT_VERSION = 1
+
+# Characters read per chunk by the streaming reader
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Extensions always read as NDJSON (one object per line)
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+# Keys of the wrapper objects some older exports put around their records
+WRAPPER_KEYS = ('certifications', 'value')
+
+# Attribute name -> App_Data file
+FILES = {
+    'operators': 'pay_Operators.json',
+    'certifications': 'pay_Certifications.json',
+    'status_tracker': 'pay_StatusTracker.json',
+    'status_types': 'pay_StatusTypes.json',
+    'cert_types': 'pay_CertTypes.json',
+    'pizza_statuses': 'pay_PizzaStatuses.json',
+    'clients': 'pay_Clients.json',
+}
+
+# Composite indexes the query tool uses when all of their fields are filtered on
+COMPOSITE_INDEXES = {
+    'pay_CertTypes.json': [('DivisionID', 'PizzaStatusID')],
+    'pay_StatusTypes.json': [('DivisionID', 'Status')],
+    'pay_Operators.json': [('DivisionID', 'Status')],
+}
+
+def ndjson_name(filename):
+    """pay_X.json -> pay_X.ndjson"""
+    return os.path.splitext(filename)[0] + '.ndjson'
+
+def record_id(record):
+    """Primary key of a record (StatusTypes use ``Id``, everything else ``ID``)."""
+    return record.get('ID') or record.get('Id')
+
+def unwrap(data):
+    """The records of a parsed file: the array itself, or the array inside a wrapper object."""
+    # Some older certification exports were wrapped in an object
+    if isinstance(data, dict):
+        for key in WRAPPER_KEYS:
+            if key in data:
+                return data[key]
+        return []
+    return data
+
+def parse_json_file(filepath):
+    """Parse an App_Data file into a list of records."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return unwrap(json.load(f))
+
+def snapshot_path(filepath, cache_dir):
+    """Snapshot file for an App_Data file."""
+    digest = hashlib.sha1(os.path.abspath(filepath).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{os.path.basename(filepath)}.{digest}.marshal")
+
+def snapshot_key(filepath, stat):
+    """What a snapshot must match to be used for filepath."""
+    return (SNAPSHOT_VERSION, sys.implementation.cache_tag, os.path.abspath(filepath),
+            stat.st_size, stat.st_mtime_ns)
+
+def share_strings(records):
+    """Make equal string values one object (GUIDs, divisions and statuses repeat a lot).
+
+    marshal writes a shared object once and back-references it after that,
+    so this makes snapshots smaller and faster to load.
+    """
+    memo = {}
+    return [{key: memo.setdefault(value, value) if isinstance(value, str) else value
+             for key, value in record.items()} if isinstance(record, dict) else record
+            for record in records]
+
+def read_snapshot(path, key):
+    """Records from the snapshot at path if it matches key, else None."""
+    try:
+        with open(path, 'rb') as f:
+            # One read + loads; marshal.load on a file object reads in small pieces
+            stored_key, records = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return records if stored_key == key else None
+
+def write_snapshot(path, key, records):
+    """Atomically write a snapshot; failures (e.g. read-only checkout) are ignored."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            marshal.dump((key, share_strings(records)), f)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def load_records(filepath, cache_dir=CACHE_DIR):
+    """Load an App_Data file, from its snapshot when the file is unchanged."""
+    if cache_dir is None:
+        return parse_json_file(filepath)
+    key = snapshot_key(filepath, os.stat(filepath))
+    path = snapshot_path(filepath, cache_dir)
+    records = read_snapshot(path, key)
+    if records is None:
+        records = parse_json_file(filepath)
+        write_snapshot(path, key, records)
+    return records
+
+def iter_json_array(f, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield the elements of a top-level JSON array from a text file, one at a time.
+
+    Only the current chunk and the element being decoded are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    started = False
+    while True:
+        # Skip whitespace and separators, refilling the buffer as needed
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = f.read(chunk_size), 0
+            eof = not buffer
+        if pos >= len(buffer):
+            raise ValueError("Unexpected end of JSON array")
+        if not started:
+            if buffer[pos] != '[':
+                raise ValueError("Expected a JSON array")
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            end = None
+        # The element is complete once the next ',' or ']' is in the buffer;
+        # otherwise it may continue in the next chunk (e.g. a split number)
+        if end is not None:
+            follow = end
+            while follow < len(buffer) and buffer[follow] in ' \t\r\n':
+                follow += 1
+            if follow < len(buffer) and buffer[follow] not in ',]':
+                if eof or buffer[follow:].strip('0123456789.eE+-'):
+                    raise ValueError(f"Malformed JSON array at offset {follow}")
+                end = None
+        if end is None or (follow == len(buffer) and not eof):
+            if eof:
+                raise ValueError(f"Malformed JSON array element at offset {pos}")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield record
+        pos = end
+
+def iter_ndjson(f):
+    """Yield one record per non-blank line of a newline-delimited JSON file."""
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+def iter_records(filepath, chunk_size=STREAM_CHUNK_SIZE):
+    """Stream the records of an App_Data file (JSON array or NDJSON).
+
+    .ndjson/.jsonl files are always read as NDJSON. Any other file starting
+    with an object is NDJSON only if it holds more than one top-level object;
+    a single object is a wrapper around the records (see unwrap()).
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        if os.path.splitext(filepath)[1].lower() in NDJSON_EXTENSIONS:
+            yield from iter_ndjson(f)
+            return
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        if first == '[':
+            yield from iter_json_array(_prepend(first, f), chunk_size)
+        elif first == '{':
+            line = first + f.readline()
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A (wrapped) JSON object spread over several lines
+                yield from parse_json_file(filepath)
+                return
+            second = next((line for line in f if line.strip()), None)
+            if second is None:
+                # A single compact JSON object, not NDJSON
+                yield from unwrap(record)
+                return
+            yield record
+            yield json.loads(second)
+            yield from iter_ndjson(f)
+        elif first:
+            raise ValueError(f"{filepath} is neither a JSON array nor NDJSON")
+
+class _prepend:
+    """File-like wrapper that returns already-consumed text before the rest of f."""
+
+    def __init__(self, text, f):
+        self.text = text
+        self.f = f
+
+    def read(self, size):
+        if self.text:
+            text, self.text = self.text, ''
+            return text + self.f.read(max(0, size - len(text)))
+        return self.f.read(size)
+
+class Table:
+    """The records of one App_Data file plus lazily built hash indexes."""
+
+    def __init__(self, name, records):
+        self.name = name
+        self.records = records
+        self._indexes = {}
+        self._by_id = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def index(self, field, *aliases):
+        """Return {value: [records]} for field, built once and cached.
+
+        Records where the field is missing or empty are left out. aliases are
+        alternative spellings of the field tried in order (e.g. 'OperatorId').
+        """
+        key = (field, *aliases)
+        index = self._indexes.get(key)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    index = {}
+                    fields = key
+                    with profiling.phase('index'):
+                        for record in self.records:
+                            value = None
+                            for name in fields:
+                                value = record.get(name)
+                                if value:
+                                    break
+                            if value:
+                                index.setdefault(value, []).append(record)
+                    self._indexes[key] = index
+        return index
+
+    def where(self, field, value):
+        """Records whose field equals value (an empty list if none)."""
+        return self.index(field).get(value, [])
+
+    def composite_index(self, *fields):
+        """Return {(value, ...): [records]} over several fields, built once and cached.
+
+        Unlike index(), records with missing or empty values are kept (their
+        key holds None/'' for that field).
+        """
+        key = ('composite', *fields)
+        index = self._indexes.get(key)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    index = {}
+                    with profiling.phase('index'):
+                        for record in self.records:
+                            index.setdefault(tuple(record.get(field) for field in fields), []).append(record)
+                    self._indexes[key] = index
+        return index
+
+    def where_all(self, **criteria):
+        """Records matching every field=value in criteria, via a composite index."""
+        fields = tuple(sorted(criteria))
+        return self.composite_index(*fields).get(tuple(criteria[field] for field in fields), [])
+
+    def by_id(self):
+        """Return {primary key: record}."""
+        by_id = self._by_id
+        if by_id is None:
+            with self._lock:
+                by_id = self._by_id
+                if by_id is None:
+                    with profiling.phase('index'):
+                        by_id = self._by_id = {record_id(record): record for record in self.records}
+        return by_id
+
+    def get(self, key, default=None):
+        """Record with the given primary key."""
+        return self.by_id().get(key, default)
+
+class AppData:
+    """Process-wide view of the App_Data files; every file is loaded at most once."""
+
+    def __init__(self, app_data_dir=APP_DATA_DIR, cache_dir=CACHE_DIR):
+        self.app_data_dir = app_data_dir
+        self.cache_dir = cache_dir
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def path(self, filename):
+        return os.path.join(self.app_data_dir, filename)
+
+    def has(self, filename):
+        """True if filename (or its NDJSON variant) exists in App_Data."""
+        return (filename in self._tables or os.path.exists(self.path(filename))
+                or os.path.exists(self.path(ndjson_name(filename))))
+
+    def stream(self, filename):
+        """Iterate over the records of filename without loading the whole file.
+
+        Falls back to the NDJSON variant (pay_X.ndjson) when pay_X.json is
+        absent; an already loaded table is iterated from memory.
+        """
+        if filename in self._tables:
+            return iter(self._tables[filename])
+        path = self.path(filename)
+        if not os.path.exists(path) and os.path.exists(self.path(ndjson_name(filename))):
+            path = self.path(ndjson_name(filename))
+        return iter_records(path)
+
+    def table(self, filename):
+        """Return the Table for filename, loading it on first use.
+
+        Raises FileNotFoundError if the file does not exist.
+        """
+        table = self._tables.get(filename)
+        if table is None:
+            with self._lock:
+                table = self._tables.get(filename)
+                if table is None:
+                    with profiling.phase('load'):
+                        table = Table(filename, load_records(self.path(filename), self.cache_dir))
+                    self._tables[filename] = table
+        return table
+
+    def __getattr__(self, name):
+        if name in FILES:
+            return self.table(FILES[name])
+        raise AttributeError(name)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build App_Data snapshots and compare load times.")
+    parser.add_argument('--clear', action='store_true', help="Delete all snapshots first")
+    args = parser.parse_args()
+
+    if CACHE_DIR is None:
+        print("⚠️  Snapshot cache is disabled (ORION_APP_DATA_CACHE)")
+        return
+    if args.clear and os.path.isdir(CACHE_DIR):
+        shutil.rmtree(CACHE_DIR)
+        print(f"🗑️  Cleared {CACHE_DIR}")
+
+    print(f"{'File':<28} {'JSON (ms)':>10} {'Snapshot (ms)':>14} {'Speed-up':>9}")
+    print("-" * 64)
+    for filename in FILES.values():
+        filepath = os.path.join(APP_DATA_DIR, filename)
+        if not os.path.exists(filepath):
+            continue
+        load_records(filepath)  # builds the snapshot if needed
+        started = time.perf_counter()
+        parse_json_file(filepath)
+        parse_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        load_records(filepath)
+        snapshot_ms = (time.perf_counter() - started) * 1000
+        print(f"{filename:<28} {parse_ms:>10.1f} {snapshot_ms:>14.1f} {parse_ms / snapshot_ms:>8.1f}x")
+    print(f"\n💾 Snapshots in {CACHE_DIR}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""
+Auto-Advance Dry Run
+====================
+Replays AutoAdvanceService.RecalculateAndAdvanceDivisionAsync against
+App_Data for every operator, without changing anything, and reports who
+would be advanced and why the others would not.
+
+The per-operator rules mirror AutoAdvanceService.cs:
+
+1. Resolve the current StatusType from the operator's StatusID. If that
+   fails, fall back to a case-insensitive Status match in the operator's
+   division.
+2. Look up the PizzaStatus by that StatusType's Status name. Only
+   ``isAuto`` statuses advance.
+3. Required certs are the non-deleted CertTypes for (operator DivisionID,
+   PizzaStatus ID). Held certs are the approved, non-deleted
+   certifications. Both are bitsets (cert_bitsets.py), so the check is one
+   AND.
+4. The next StatusType is the one in the operator's division with the lowest
+   OrderID above the current one, skipping any that share the current
+   PizzaStatusID. A non-numeric OrderID counts as 0.
+
+Steps 1 and 4 are lookups in the cached workflow graph (workflow_graph.py);
+the rest is precomputed once. Divisions are split into chunks and
+evaluated in a process pool, one worker per core by default.
+
+``--all-auto`` previews what would happen if every PizzaStatus were isAuto.
+
+Usage:
+    python auto_advance_dry_run.py [--division "10 - OR"] [--workers N] [--all-auto]
+        [--output results.csv|results.json] [--app-data DIR] [--profile] [--trace-memory]
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import profiling
+from app_data import APP_DATA_DIR, AppData
+from cert_bitsets import CertTypeBits, held_masks, requirement_masks
+from workflow_graph import WorkflowGraph
+
+# Operators per task handed to a worker
+CHUNK_SIZE = 5000
+
+# Reasons, as returned by AutoAdvanceService
+ADVANCED = 'AutoAdvance'
+NOT_FOUND = 'Current status not found'
+NOT_AUTO = 'Status is not auto-advance eligible'
+NOT_MET = 'Requirements not met'
+NO_NEXT = 'No valid next status found'
+
+class AdvanceRules:
+    """Everything needed to evaluate operators, precomputed from App_Data.
+
+    Picklable, so it is sent to each worker process once.
+    """
+
+    def __init__(self, store, all_auto=False):
+        self.status_types = {st.get('Id'): st for st in store.status_types if st.get('Id')}
+        self.graph = WorkflowGraph.for_store(store)
+
+        # PizzaStatus by Status name, case-insensitive, first match wins (PizzaStatusRepository.GetByStatus)
+        self.pizza_by_name = {}
+        for pizza_status in store.pizza_statuses:
+            if pizza_status.get('Status'):
+                is_auto = all_auto or pizza_status.get('isAuto') in (True, 1)
+                self.pizza_by_name.setdefault(pizza_status['Status'].lower(), (pizza_status.get('ID'), is_auto))
+
+        self.bits = CertTypeBits(store.cert_types)
+        self.required = requirement_masks(store.cert_types, self.bits)
+
+    def evaluate(self, operator, held):
+        """(to StatusType ID or None, reason) for one operator holding cert mask held."""
+        status_id = self.graph.resolve(operator)
+        if status_id is None:
+            return None, NOT_FOUND
+        pizza_status = self.pizza_by_name.get((self.status_types[status_id].get('Status') or '').lower())
+        if pizza_status is None or not pizza_status[1]:
+            return None, NOT_AUTO
+        division = operator.get('DivisionID')
+        required = self.required.get((division or '', pizza_status[0]), 0)
+        if required & ~held:
+            return None, NOT_MET
+        if not division:
+            return None, NO_NEXT
+        next_id = self.graph.next_status(division, status_id)
+        if next_id is None:
+            return None, NO_NEXT
+        return next_id, ADVANCED
+
+_rules = None
+
+def _init_worker(rules):
+    global _rules
+    _rules = rules
+
+def evaluate_chunk(operators):
+    """Evaluate (operator fields, held mask) pairs in a worker; returns result tuples."""
+    results = []
+    for operator, held in operators:
+        to_status, reason = _rules.evaluate(operator, held)
+        results.append((operator.get('ID'), operator.get('DivisionID'), operator.get('StatusID'),
+                        to_status, to_status is not None, reason))
+    return results
+
+def operator_tasks(store, held, division=None, chunk_size=CHUNK_SIZE):
+    """Chunks of (slim operator, held mask) pairs, grouped by division."""
+    by_division = defaultdict(list)
+    for operator in store.operators:
+        if division and operator.get('DivisionID') != division:
+            continue
+        slim = {field: operator.get(field) for field in ('ID', 'DivisionID', 'Status', 'StatusID')}
+        by_division[operator.get('DivisionID')].append((slim, held.get(operator.get('ID'), 0)))
+    for division_operators in by_division.values():
+        for start in range(0, len(division_operators), chunk_size):
+            yield division_operators[start:start + chunk_size]
+
+def run(store, division=None, workers=None, all_auto=False):
+    """Evaluate every operator. Returns (results, AdvanceRules)."""
+    rules = AdvanceRules(store, all_auto)
+    if store.has('pay_Certifications.json'):
+        held = held_masks(store.certifications, rules.bits)
+    else:
+        print("⚠️  pay_Certifications.json not found; operators are treated as holding no certs")
+        held = {}
+    tasks = list(operator_tasks(store, held, division))
+
+    results = []
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker(rules)
+        for task in tasks:
+            results.extend(evaluate_chunk(task))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker,
+                                 initargs=(rules,)) as pool:
+            for chunk in pool.map(evaluate_chunk, tasks):
+                results.extend(chunk)
+    return results, rules
+
+def print_summary(results, rules):
+    by_division = defaultdict(Counter)
+    for _, division, _, _, _, reason in results:
+        by_division[division or 'Unknown'][reason] += 1
+
+    print("\n" + "=" * 110)
+    print("AUTO-ADVANCE DRY RUN")
+    print("=" * 110)
+    print(f"{'Division':<26} {'Operators':>10} {'Advance':>9} {'Not met':>9} {'Not auto':>9} "
+          f"{'No next':>9} {'No status':>10}")
+    print("-" * 110)
+    totals = Counter()
+    for division in sorted(by_division):
+        counts = by_division[division]
+        totals.update(counts)
+        print(f"{division[:26]:<26} {sum(counts.values()):>10} {counts[ADVANCED]:>9} {counts[NOT_MET]:>9} "
+              f"{counts[NOT_AUTO]:>9} {counts[NO_NEXT]:>9} {counts[NOT_FOUND]:>10}")
+    print("-" * 110)
+    print(f"{'Total':<26} {sum(totals.values()):>10} {totals[ADVANCED]:>9} {totals[NOT_MET]:>9} "
+          f"{totals[NOT_AUTO]:>9} {totals[NO_NEXT]:>9} {totals[NOT_FOUND]:>10}")
+
+    moves = Counter((rules.status_types[from_id].get('Status') if from_id in rules.status_types else from_id,
+                     rules.status_types[to_id].get('Status'), division)
+                    for _, division, from_id, to_id, changed, _ in results if changed)
+    if moves:
+        print(f"\n📈 Most common transitions:")
+        for (from_status, to_status, division), count in moves.most_common(10):
+            print(f"   {division}: {from_status} → {to_status}: {count}")
+
+def write_results(path, results, rules):
+    """Write per-operator results as CSV or JSON (by extension)."""
+    status_name = lambda status_id: rules.status_types.get(status_id, {}).get('Status') if status_id else None
+    rows = [{'OperatorID': operator_id, 'DivisionID': division, 'FromStatusID': from_id,
+             'FromStatus': status_name(from_id), 'ToStatusID': to_id, 'ToStatus': status_name(to_id),
+             'Changed': changed, 'Reason': reason}
+            for operator_id, division, from_id, to_id, changed, reason in results]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+        else:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['OperatorID'])
+            writer.writeheader()
+            writer.writerows(rows)
+    print(f"\n💾 Wrote {len(rows)} results to {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Dry-run auto-advance for every operator in App_Data.")
+    parser.add_argument('--division', help="Only evaluate this DivisionID")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per core; 1 = in-process)")
+    parser.add_argument('--output', help="Write per-operator results to a .csv or .json file")
+    parser.add_argument('--app-data', default=APP_DATA_DIR, help="App_Data directory to read")
+    parser.add_argument('--all-auto', action='store_true',
+                        help="What-if: treat every PizzaStatus as isAuto")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'auto_advance_dry_run', args.output)
+
+    started = time.perf_counter()
+    with profiling.phase('compute'):
+        results, rules = run(AppData(args.app_data), args.division, args.workers, args.all_auto)
+    elapsed = time.perf_counter() - started
+    with profiling.phase('render'):
+        print_summary(results, rules)
+    print(f"\n⏱️  Evaluated {len(results):,} operators in {elapsed:.2f}s")
+    if args.output:
+        with profiling.phase('write'):
+            write_results(args.output, results, rules)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Analysis Benchmark
+==================
+Runs the Python analysis scripts against generated App_Data at several
+scales (see generate_app_data.py) and reports wall time and peak memory,
+so superlinear behaviour shows up before production data reaches that size.
+
+Each run is its own process, pointed at the generated data with
+ORION_APP_DATA_DIR, so peak RSS covers just that run (n/a where it cannot be
+measured; see benchmark_export.run_measured).
+Runs are cold by default: the App_Data snapshot cache is off, so every
+script parses the JSON. ``--warm`` gives each scale its own cache and
+discards one warm-up run first.
+
+For each pair of consecutive scales the report gives the growth exponent
+log(time ratio) / log(scale ratio): about 1 for linear work, 2 for
+quadratic. It is flagged when it exceeds SUPERLINEAR and the larger run
+takes long enough for the ratio to mean something.
+
+Only operator-linked tables grow with the scale by default, so scripts that
+read just the reference tables (analyze_client_relationships.py) stay flat.
+``--scale-reference`` grows the clients, PizzaStatuses, StatusTypes and
+CertTypes by the same factor.
+
+Generated data is kept in the work directory and only regenerated when
+missing or with ``--regenerate``. Script output goes to a log file per run.
+
+Usage:
+    python benchmark_analysis.py [--scales 1,10,100] [--only analyze_operators,...]
+        [--repeat 1] [--warm] [--scale-reference] [--work-dir analysis_benchmark] [--regenerate] [--json results.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+
+from benchmark_export import format_mb, run_measured
+from generate_app_data import generate
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WORK_DIR = os.path.join(SCRIPT_DIR, 'analysis_benchmark')
+
+# Name -> command line ({run_dir} is the run's scratch directory)
+ANALYSES = {
+    'analyze_operators': ['analyze_operators.py', '--rebuild', '--change-log', '',
+                          '--output', '{run_dir}/operator_summary.csv'],
+    'analyze_client_relationships': ['analyze_client_relationships.py',
+                                     '--output', '{run_dir}/client_relationships.txt'],
+    'check_operator_certs': ['check_operator_certs.py'],
+    'check_integrity': ['check_integrity.py', '--warn-only'],
+    'cert_compliance': ['cert_compliance.py'],
+    'auto_advance_dry_run': ['auto_advance_dry_run.py'],
+    'analyze_status_dwell': ['analyze_status_dwell.py'],
+}
+
+# Growth exponent above which a step is flagged
+SUPERLINEAR = 1.2
+
+# Runs shorter than this are dominated by interpreter start-up and are not flagged
+MIN_FLAG_SECONDS = 0.5
+
+def scale_label(scale):
+    return f"{scale:g}x"
+
+def run_analysis(name, app_data_dir, run_dir, cache_dir=None):
+    """Run one analysis as a child process. Returns (wall seconds, peak RSS MB or None, exit code)."""
+    os.makedirs(run_dir, exist_ok=True)
+    script, *script_args = ANALYSES[name]
+    command = [sys.executable, os.path.join(SCRIPT_DIR, script),
+               *(arg.format(run_dir=run_dir) for arg in script_args)]
+    env = dict(os.environ, ORION_APP_DATA_DIR=app_data_dir, ORION_APP_DATA_CACHE=cache_dir or 'off')
+    with open(os.path.join(run_dir, f"{name}.log"), 'w', encoding='utf-8') as log:
+        return run_measured(command, stdout=log, stderr=subprocess.STDOUT, env=env, cwd=run_dir)
+
+def growth_exponent(small, large):
+    """log(time ratio) / log(scale ratio) between two (scale, seconds) points."""
+    (small_scale, small_seconds), (large_scale, large_seconds) = small, large
+    if small_seconds <= 0 or large_scale == small_scale:
+        return None
+    return math.log(large_seconds / small_seconds) / math.log(large_scale / small_scale)
+
+def print_report(results, scales):
+    header = ''.join(f" {scale_label(scale):>17}" for scale in scales)
+    print("\n" + "=" * (30 + 18 * len(scales) + 14))
+    print("ANALYSIS BENCHMARK (wall seconds / peak RSS MB)")
+    print("=" * (30 + 18 * len(scales) + 14))
+    print(f"{'Analysis':<30}{header} {'Growth':>12}")
+    print("-" * (30 + 18 * len(scales) + 14))
+    flagged = []
+    for name, runs in results.items():
+        cells = []
+        for scale in scales:
+            run = runs.get(scale)
+            if run is None:
+                cells.append(f" {'-':>17}")
+            elif run['exit'] != 0:
+                cells.append(f" {'❌ exit ' + str(run['exit']):>16}")
+            else:
+                cells.append(f" {run['seconds']:>8.2f} / {format_mb(run['peak_mb'], 6, 0)}")
+        points = [(scale, runs[scale]['seconds']) for scale in scales
+                  if scale in runs and runs[scale]['exit'] == 0]
+        exponents = [growth_exponent(a, b) for a, b in zip(points, points[1:])]
+        worst = max((e for e in exponents if e is not None), default=None)
+        growth = f"{worst:>11.2f}" if worst is not None else f"{'-':>11}"
+        for (scale, seconds), exponent in zip(points[1:], exponents):
+            if exponent is not None and exponent > SUPERLINEAR and seconds >= MIN_FLAG_SECONDS:
+                flagged.append((name, scale, exponent))
+                growth += ' ⚠️'
+                break
+        print(f"{name:<30}{''.join(cells)} {growth}")
+
+    if flagged:
+        print(f"\n⚠️  Superlinear growth (exponent > {SUPERLINEAR}):")
+        for name, scale, exponent in flagged:
+            print(f"   {name}: time grows as scale^{exponent:.2f} up to {scale_label(scale)}")
+    else:
+        print(f"\n✅ No analysis grew faster than scale^{SUPERLINEAR}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis scripts against generated App_Data.")
+    parser.add_argument('--scales', default='1,10,100',
+                        help="Comma-separated multiples of the current App_Data volume (default: 1,10,100)")
+    parser.add_argument('--only', help=f"Comma-separated analyses to run (default: all of {', '.join(ANALYSES)})")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per analysis and scale; the fastest counts")
+    parser.add_argument('--warm', action='store_true', help="Use the snapshot cache (after one warm-up run)")
+    parser.add_argument('--scale-reference', action='store_true',
+                        help="Also grow the reference tables (clients, statuses, cert types) with the scale")
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR, help="Where generated data and logs are kept")
+    parser.add_argument('--regenerate', action='store_true', help="Regenerate cached App_Data")
+    parser.add_argument('--json', metavar='PATH', help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    scales = sorted(float(scale) for scale in args.scales.split(','))
+    names = args.only.split(',') if args.only else list(ANALYSES)
+    unknown = [name for name in names if name not in ANALYSES]
+    if unknown:
+        parser.error(f"unknown analysis: {', '.join(unknown)}")
+
+    results = {name: {} for name in names}
+    for scale in scales:
+        reference_scale = max(1, round(scale)) if args.scale_reference else 1
+        scale_dir = os.path.join(args.work_dir, scale_label(scale) + ('-reference' if reference_scale > 1 else ''))
+        app_data_dir = os.path.join(scale_dir, 'App_Data')
+        if args.regenerate or not os.path.exists(os.path.join(app_data_dir, 'pay_Operators.json')):
+            print(f"🏗️  Generating {scale_label(scale)} App_Data...")
+            generate(app_data_dir, scale, reference_scale=reference_scale)
+        cache_dir = os.path.join(scale_dir, 'cache') if args.warm else None
+        for name in names:
+            run_dir = os.path.join(scale_dir, 'runs', name)
+            if args.warm:
+                run_analysis(name, app_data_dir, run_dir, cache_dir)
+            runs = [run_analysis(name, app_data_dir, run_dir, cache_dir) for _ in range(max(1, args.repeat))]
+            seconds, peak_mb, exit_code = min(runs, key=lambda run: run[0])
+            results[name][scale] = {'seconds': seconds, 'peak_mb': peak_mb, 'exit': exit_code}
+            marker = '✅' if exit_code == 0 else f"❌ exit {exit_code} (see {run_dir}/{name}.log)"
+            print(f"⏱️  {scale_label(scale):>6} {name:<30} {seconds:>8.2f}s {format_mb(peak_mb, 8, 0)} MB {marker}")
+
+    print_report(results, scales)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({name: {scale_label(scale): run for scale, run in runs.items()}
+                       for name, runs in results.items()}, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+if __name__ == '__main__':
+    main()
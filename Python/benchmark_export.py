@@ -0,0 +1,119 @@
+"""
+Export Benchmark
+================
+Runs the full export_database_to_json.py export against SQLite stand-in
+databases (see build_sqlite_standin.py) at one or more scales and reports
+wall time, peak memory and per-table throughput.
+
+Each export runs in its own process, so peak RSS (from ``os.wait4``) covers
+just that run. Where os.wait4 is missing it comes from the resource module
+when that exists, and is reported as n/a otherwise (Windows). Databases are cached in the work directory and only rebuilt
+when missing or with ``--rebuild``; exported JSON goes to the work directory,
+never to the web app's App_Data.
+
+Usage:
+    python benchmark_export.py [--scales 10000,100000,1000000] [--workers 1]
+        [--work-dir export_benchmark] [--rebuild] [-- extra exporter args]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from build_sqlite_standin import build_database
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+EXPORTER = os.path.join(SCRIPT_DIR, 'export_database_to_json.py')
+DEFAULT_WORK_DIR = os.path.join(SCRIPT_DIR, 'export_benchmark')
+
+def peak_rss_mb(rusage):
+    """ru_maxrss in MB (Linux reports KB, macOS bytes)."""
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return rusage.ru_maxrss / divisor
+
+def run_measured(command, **popen_args):
+    """Run command to completion. Returns (wall seconds, peak RSS MB or None, exit code).
+
+    os.wait4 gives the child's own peak. Failing that, RUSAGE_CHILDREN holds
+    the largest peak of any child so far, which is this child's only if it
+    went up; otherwise, and without resource, the peak is None.
+    """
+    started = time.perf_counter()
+    if hasattr(os, 'wait4'):
+        process = subprocess.Popen(command, **popen_args)
+        _, status, rusage = os.wait4(process.pid, 0)
+        return time.perf_counter() - started, peak_rss_mb(rusage), os.waitstatus_to_exitcode(status)
+    before = resource.getrusage(resource.RUSAGE_CHILDREN) if resource else None
+    exit_code = subprocess.run(command, **popen_args).returncode
+    elapsed = time.perf_counter() - started
+    if before is None:
+        return elapsed, None, exit_code
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return elapsed, peak_rss_mb(after) if after.ru_maxrss > before.ru_maxrss else None, exit_code
+
+def format_mb(mb, width, decimals=1):
+    """A peak RSS report cell, n/a where it could not be measured."""
+    return f"{mb:>{width}.{decimals}f}" if mb is not None else f"{'n/a':>{width}}"
+
+def run_export(db_path, run_dir, workers, extra_args):
+    """Run one full export as a child process. Returns (wall seconds, peak RSS MB or None, metrics)."""
+    state_dir = os.path.join(run_dir, 'state')
+    command = [sys.executable, EXPORTER, '--sqlite', db_path,
+               '--output-dir', os.path.join(run_dir, 'out'), '--state-dir', state_dir,
+               '--restart', '--force', '--sampling', 'all', '--workers', str(workers), *extra_args]
+    elapsed, peak_mb, exit_code = run_measured(command, stdout=subprocess.DEVNULL)
+    if exit_code != 0:
+        raise RuntimeError(f"Export against {db_path} failed (exit {exit_code})")
+    with open(os.path.join(state_dir, 'metrics.json'), 'r', encoding='utf-8') as f:
+        metrics = json.load(f)
+    return elapsed, peak_mb, metrics
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the exporter against SQLite stand-in databases.")
+    parser.add_argument('--scales', default='10000,100000',
+                        help="Comma-separated pay_StatusTracker row counts (default: 10000,100000)")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR,
+                        help="Where databases and export output are kept")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild cached databases")
+    parser.add_argument('exporter_args', nargs='*', help="Extra arguments passed to the exporter (after --)")
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    os.makedirs(args.work_dir, exist_ok=True)
+
+    results = []
+    for scale in scales:
+        db_path = os.path.join(args.work_dir, f"standin_{scale}.sqlite")
+        if args.rebuild or not os.path.exists(db_path):
+            build_database(db_path, scale)
+        print(f"\n⏱️  Exporting {scale:,} tracker rows with {args.workers} worker(s)...")
+        elapsed, peak_mb, metrics = run_export(db_path, os.path.join(args.work_dir, f"run_{scale}"),
+                                               args.workers, args.exporter_args)
+        results.append((scale, elapsed, peak_mb, metrics))
+
+    print(f"\n{'Tracker rows':>12} {'Rows out':>10} {'MB out':>8} {'Wall (s)':>9} {'Rows/s':>10} {'Peak RSS MB':>12}")
+    print("-" * 66)
+    for scale, elapsed, peak_mb, metrics in results:
+        rows = sum(table['rows'] for table in metrics['tables'])
+        mb = sum(table['bytes'] for table in metrics['tables']) / (1024 * 1024)
+        print(f"{scale:>12,} {rows:>10,} {mb:>8.1f} {elapsed:>9.2f} {rows / elapsed:>10,.0f} {format_mb(peak_mb, 12)}")
+
+    scale, _, _, metrics = results[-1]
+    print(f"\nPer-table breakdown at {scale:,} tracker rows:")
+    print(f"{'Table':<22} {'Rows':>10} {'Query':>7} {'Fetch':>7} {'Convert':>8} {'Write':>7} {'Total':>7}")
+    for entry in metrics['tables']:
+        print(f"{entry['table']:<22} {entry['rows']:>10,} {entry['query_seconds']:>7.2f} "
+              f"{entry['fetch_seconds']:>7.2f} {entry['convert_seconds']:>8.2f} "
+              f"{entry['write_seconds']:>7.2f} {entry['wall_seconds']:>7.2f}")
+
+if __name__ == '__main__':
+    main()
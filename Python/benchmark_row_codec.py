@@ -0,0 +1,80 @@
+"""
+Row Conversion Microbenchmark
+=============================
+Compares the per-cell ``row_to_dict``/``convert_value`` path with the
+precompiled ``RowCodec`` used by export_database_to_json.py.
+
+Rows are synthetic and shaped like pay_StatusTracker (GUID strings,
+datetimes, NULLs, a Decimal), with a pyodbc-style ``cursor.description``.
+
+Usage:
+    python benchmark_row_codec.py [--rows 200000] [--batch-size 5000]
+"""
+
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from export_database_to_json import RowCodec, row_to_dict
+
+# (name, type_code) pairs as pyodbc reports them for pay_StatusTracker
+COLUMNS = [
+    ('ID', str), ('StatusID', str), ('OperatorID', str), ('Date', datetime),
+    ('RecordAt', datetime), ('RecordBy', str), ('UpdateAt', datetime), ('UpdateBy', str),
+    ('DivisionID', str), ('SequenceID', Decimal), ('ProviderID', str), ('FleetID', str),
+]
+
+class FakeCursor:
+    """Just enough of a DB-API cursor for row_to_dict."""
+
+    def __init__(self):
+        self.description = [(name, type_code, None, None, None, None, True) for name, type_code in COLUMNS]
+
+def make_rows(count):
+    """Build count synthetic tracker rows."""
+    status_ids = [str(uuid.uuid4()).upper() for _ in range(40)]
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        stamp = start + timedelta(minutes=i)
+        rows.append((
+            str(uuid.uuid4()).upper(), status_ids[i % len(status_ids)], str(uuid.uuid4()).upper(),
+            stamp, stamp, None, stamp if i % 3 else None, None,
+            f"{i % 12 + 1} - XX", Decimal(i % 7) if i % 5 else None, None, None,
+        ))
+    return rows
+
+def time_it(label, func, rows, batch_size):
+    """Run func over rows in batches and print rows/sec."""
+    started = time.perf_counter()
+    for start in range(0, len(rows), batch_size):
+        func(rows[start:start + batch_size])
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:>8.3f}s {len(rows) / elapsed:>14,.0f} rows/sec")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark row_to_dict against RowCodec.")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    cursor = FakeCursor()
+    rows = make_rows(args.rows)
+
+    # Both paths must agree before their speed is worth comparing
+    codec = RowCodec(cursor.description)
+    assert codec.convert_batch(rows[:1000]) == [row_to_dict(cursor, row) for row in rows[:1000]]
+
+    print(f"Converting {args.rows:,} rows in batches of {args.batch_size:,}\n")
+    before = time_it("row_to_dict (per cell)", lambda batch: [row_to_dict(cursor, row) for row in batch],
+                     rows, args.batch_size)
+    after = time_it("RowCodec.convert_batch",
+                    lambda batch: RowCodec(cursor.description).convert_batch(batch),
+                    rows, args.batch_size)
+    print(f"\nSpeed-up: {before / after:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""
+SQLite Stand-in Database Builder
+================================
+Builds a local SQLite database shaped like the production Azure SQL tables
+that export_database_to_json.py reads, so the exporter can be run and
+benchmarked offline (``export_database_to_json.py --sqlite PATH``).
+
+- pay_StatusTypes, pay_CertTypes, pay_PizzaStatus and pay_Clients are seeded
+  from the JSON files in App_Data, so divisions, statuses and cert types are
+  realistic.
+- pay_Operators, pay_StatusTracker and pay_Certifications are generated at
+  the requested scale. Generation is seeded, so the same arguments always
+  produce the same database.
+
+Dates are stored as ISO-8601 text and bit columns as 0/1, which is how they
+come back from SQLite.
+
+Usage:
+    python build_sqlite_standin.py standin.sqlite [--tracker-rows 100000]
+        [--operators N] [--certs-per-operator 5] [--seed 42]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Script directory and the App_Data the reference tables are seeded from
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DATA_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'OrionOperatorLifecycleWebApp', 'App_Data')
+
+# Reference table -> App_Data file it is seeded from
+REFERENCE_TABLES = {
+    'pay_StatusTypes': 'pay_StatusTypes.json',
+    'pay_CertTypes': 'pay_CertTypes.json',
+    'pay_PizzaStatus': 'pay_PizzaStatuses.json',
+    'pay_Clients': 'pay_Clients.json',
+}
+
+# Generated tables (columns as exported by export_database_to_json.py)
+GENERATED_TABLES = {
+    'pay_Operators': """
+        ID TEXT PRIMARY KEY, FirstName TEXT, LastName TEXT, Email TEXT, Mobile TEXT,
+        DivisionID TEXT, Status TEXT, StatusID TEXT, IsDeleted INTEGER,
+        RecordAt TEXT, RecordBy TEXT, UpdateAt TEXT, UpdateBy TEXT""",
+    'pay_StatusTracker': """
+        ID TEXT PRIMARY KEY, StatusID TEXT, OperatorID TEXT, Date TEXT,
+        RecordAt TEXT, RecordBy TEXT, UpdateAt TEXT, UpdateBy TEXT,
+        DivisionID TEXT, SequenceID INTEGER, ProviderID TEXT, FleetID TEXT""",
+    'pay_Certifications': """
+        CertificationID TEXT PRIMARY KEY, Cert TEXT, isApproved INTEGER, IsDeleted INTEGER,
+        DivisionID TEXT, CertTypeID TEXT, OperatorID TEXT, Date TEXT, RecordAt TEXT,
+        UpdateAt TEXT""",
+}
+
+INDEXES = [
+    "CREATE INDEX ix_operators_division_status ON pay_Operators (DivisionID, Status)",
+    "CREATE INDEX ix_tracker_operator ON pay_StatusTracker (OperatorID)",
+    "CREATE INDEX ix_certifications_operator ON pay_Certifications (OperatorID)",
+]
+
+FIRST_NAMES = ['James', 'Maria', 'Kaleb', 'Aisha', 'Wei', 'Carlos', 'Olivia', 'Dmitri', 'Fatima', 'Noah']
+LAST_NAMES = ['Lewis', 'Garcia', 'Chen', 'Okafor', 'Smith', 'Khan', 'Novak', 'Silva', 'Brown', 'Ito']
+
+INSERT_BATCH_SIZE = 10000
+
+def load_json_file(filename):
+    """Load a JSON file from App_Data."""
+    with open(os.path.join(APP_DATA_DIR, filename), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def to_sql_value(value):
+    """Convert a JSON value to what SQLite stores for it."""
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+def insert_rows(conn, table_name, columns, rows):
+    """Insert an iterable of row tuples in batches. Returns the row count."""
+    sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            conn.executemany(sql, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+def seed_reference_table(conn, table_name, filename):
+    """Create table_name with the columns of its App_Data file and copy the rows in."""
+    records = load_json_file(filename)
+    columns = list(records[0])
+    conn.execute(f"CREATE TABLE {table_name} ({', '.join(columns)})")
+    count = insert_rows(conn, table_name, columns,
+                        (tuple(to_sql_value(record.get(column)) for column in columns) for record in records))
+    print(f"   {table_name}: {count:,} rows from {filename}")
+    return records
+
+class Generator:
+    """Seeded source of GUIDs, timestamps and names."""
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.start = datetime(2024, 1, 1)
+
+    def guid(self):
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4)).upper()
+
+    def timestamp(self, after=None, max_days=30):
+        base = after or self.start
+        return base + timedelta(seconds=self.random.randrange(max_days * 86400))
+
+def build_workflows(status_types):
+    """Return {DivisionID: [status type, ...]} ordered by OrderID, skipping deleted types."""
+    workflows = {}
+    for status_type in status_types:
+        if status_type.get('isDeleted') or not status_type.get('DivisionID'):
+            continue
+        workflows.setdefault(status_type['DivisionID'], []).append(status_type)
+    for steps in workflows.values():
+        steps.sort(key=lambda s: float(s['OrderID']) if s.get('OrderID') not in (None, '') else float('inf'))
+    return workflows
+
+def generate_operators(gen, count, workflows):
+    """Yield (operator row, division steps, current step index) for count operators."""
+    divisions = sorted(workflows)
+    for i in range(count):
+        division = gen.random.choice(divisions)
+        steps = workflows[division]
+        step = gen.random.randrange(len(steps))
+        first, last = gen.random.choice(FIRST_NAMES), gen.random.choice(LAST_NAMES)
+        record_at = gen.timestamp(max_days=365)
+        update_at = gen.timestamp(after=record_at) if gen.random.random() < 0.8 else None
+        row = (gen.guid(), first, last, f"{first}.{last}{i}@example.com".lower(),
+               f"(555) {i // 10000 % 1000:03d}-{i % 10000:04d}", division,
+               steps[step]['Status'], steps[step]['Id'], int(gen.random.random() < 0.02),
+               record_at.isoformat(), None, update_at.isoformat() if update_at else None, None)
+        yield row, steps, step
+
+def build_database(path, tracker_rows, operators=None, certs_per_operator=5, seed=42):
+    """Build the stand-in database at path (replacing any existing file)."""
+    if os.path.exists(path):
+        os.remove(path)
+    operators = operators or max(1, tracker_rows // 8)
+    gen = Generator(seed)
+    started = time.perf_counter()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    print(f"🏗️  Building {path} ({operators:,} operators, {tracker_rows:,} tracker rows)")
+    reference = {table: seed_reference_table(conn, table, filename) for table, filename in REFERENCE_TABLES.items()}
+    for table_name, schema in GENERATED_TABLES.items():
+        conn.execute(f"CREATE TABLE {table_name} ({schema})")
+
+    workflows = build_workflows(reference['pay_StatusTypes'])
+    cert_types = [ct for ct in reference['pay_CertTypes'] if not ct.get('isDeleted')]
+    operator_columns = ['ID', 'FirstName', 'LastName', 'Email', 'Mobile', 'DivisionID', 'Status', 'StatusID',
+                        'IsDeleted', 'RecordAt', 'RecordBy', 'UpdateAt', 'UpdateBy']
+    tracker_columns = ['ID', 'StatusID', 'OperatorID', 'Date', 'RecordAt', 'RecordBy', 'UpdateAt', 'UpdateBy',
+                       'DivisionID', 'SequenceID', 'ProviderID', 'FleetID']
+    cert_columns = ['CertificationID', 'Cert', 'isApproved', 'IsDeleted', 'DivisionID', 'CertTypeID',
+                    'OperatorID', 'Date', 'RecordAt', 'UpdateAt']
+
+    operator_rows, tracker, certifications = [], [], []
+    # Spread tracker rows across operators, walking each one through its division's workflow
+    per_operator, extra = divmod(tracker_rows, operators)
+    for i, (row, steps, step) in enumerate(generate_operators(gen, operators, workflows)):
+        operator_rows.append(row)
+        operator_id, division = row[0], row[5]
+        stamp = datetime.fromisoformat(row[9])
+        for n in range(per_operator + (1 if i < extra else 0)):
+            status = steps[min(n, step) if n <= step else gen.random.randrange(len(steps))]
+            stamp = gen.timestamp(after=stamp, max_days=14)
+            tracker.append((gen.guid(), status['Id'], operator_id, stamp.isoformat(), stamp.isoformat(),
+                            None, None, None, division, n, None, None))
+        for cert_type in gen.random.sample(cert_types, min(certs_per_operator, len(cert_types))):
+            cert_date = gen.timestamp(after=stamp, max_days=60).isoformat()
+            certifications.append((gen.guid(), cert_type['Certification'], int(gen.random.random() < 0.7), 0,
+                                   division, cert_type['ID'], operator_id, cert_date, cert_date, None))
+        if len(tracker) >= INSERT_BATCH_SIZE:
+            insert_rows(conn, 'pay_StatusTracker', tracker_columns, tracker)
+            insert_rows(conn, 'pay_Certifications', cert_columns, certifications)
+            insert_rows(conn, 'pay_Operators', operator_columns, operator_rows)
+            operator_rows, tracker, certifications = [], [], []
+    insert_rows(conn, 'pay_StatusTracker', tracker_columns, tracker)
+    insert_rows(conn, 'pay_Certifications', cert_columns, certifications)
+    insert_rows(conn, 'pay_Operators', operator_columns, operator_rows)
+
+    for statement in INDEXES:
+        conn.execute(statement)
+    conn.commit()
+
+    for table_name in GENERATED_TABLES:
+        count = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+        print(f"   {table_name}: {count:,} rows generated")
+    conn.close()
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"✅ Built {path} ({size_mb:,.1f} MB) in {time.perf_counter() - started:.1f}s")
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a SQLite stand-in for the Orion export tables.")
+    parser.add_argument('path', help="SQLite file to create (replaced if it exists)")
+    parser.add_argument('--tracker-rows', type=int, default=100000,
+                        help="Number of pay_StatusTracker rows to generate (default: 100000)")
+    parser.add_argument('--operators', type=int,
+                        help="Number of operators (default: tracker rows / 8)")
+    parser.add_argument('--certs-per-operator', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    build_database(args.path, args.tracker_rows, args.operators, args.certs_per_operator, args.seed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Certification Bitsets
+=====================
+Represents sets of cert types as Python ints, one bit per CertType, so the
+"does this operator hold every required cert?" check is a single AND:
+
+    missing = required & ~held        # 0 when all requirements are met
+
+- Required certs come from pay_CertTypes: the non-deleted CertTypes for a
+  (DivisionID, PizzaStatusID) pair, as in the Requirements editor.
+- Held certs come from pay_Certifications: the approved, non-deleted
+  certifications of each operator.
+
+Both are built in one pass over their file. Shared by
+auto_advance_dry_run.py and the compliance report.
+"""
+
+class CertTypeBits:
+    """Assigns each CertType ID a bit position."""
+
+    def __init__(self, cert_types):
+        self.ids = []
+        self.positions = {}
+        self.names = {}
+        for cert_type in cert_types:
+            cert_type_id = cert_type.get('ID')
+            if cert_type_id and cert_type_id not in self.positions:
+                self.positions[cert_type_id] = len(self.ids)
+                self.ids.append(cert_type_id)
+                self.names[cert_type_id] = cert_type.get('Certification') or cert_type_id
+
+    def __len__(self):
+        return len(self.ids)
+
+    def bit(self, cert_type_id):
+        """Mask with the bit for cert_type_id set (0 for unknown cert types)."""
+        position = self.positions.get(cert_type_id)
+        return 0 if position is None else 1 << position
+
+    def mask(self, cert_type_ids):
+        """Mask with a bit set for each known ID in cert_type_ids."""
+        result = 0
+        for cert_type_id in cert_type_ids:
+            result |= self.bit(cert_type_id)
+        return result
+
+    def decode(self, mask):
+        """CertType IDs whose bits are set in mask, lowest bit first."""
+        ids = []
+        while mask:
+            low = mask & -mask
+            ids.append(self.ids[low.bit_length() - 1])
+            mask ^= low
+        return ids
+
+def is_true(value):
+    """True for JSON true (or 1, as bit columns come back from the SQLite stand-in)."""
+    return value is True or value == 1
+
+def is_deleted(record):
+    return is_true(record.get('isDeleted')) or is_true(record.get('IsDeleted'))
+
+def requirement_masks(cert_types, bits):
+    """{(DivisionID, PizzaStatusID): mask of required cert types}."""
+    masks = {}
+    for cert_type in cert_types:
+        if is_deleted(cert_type) or not cert_type.get('PizzaStatusID'):
+            continue
+        key = (cert_type.get('DivisionID'), cert_type['PizzaStatusID'])
+        masks[key] = masks.get(key, 0) | bits.bit(cert_type.get('ID'))
+    return masks
+
+def held_masks(certifications, bits):
+    """{OperatorID: mask of cert types held} from approved, non-deleted certifications."""
+    masks = {}
+    for cert in certifications:
+        if not is_true(cert.get('isApproved')) or is_deleted(cert):
+            continue
+        operator_id = cert.get('OperatorID')
+        bit = bits.bit(cert.get('CertTypeID'))
+        if operator_id and bit:
+            masks[operator_id] = masks.get(operator_id, 0) | bit
+    return masks
@@ -0,0 +1,231 @@
+"""
+Certification Compliance Report
+===============================
+Works out, for every operator, which certifications their current status
+requires and which of those they are missing. It then rolls the gaps up per
+division.
+
+The rules mirror RequirementsController.GetComplianceSummary:
+
+- The operator's workflow status is the StatusType matching their
+  (DivisionID, Status), falling back to a case-insensitive match. Only
+  StatusTypes in the operator workflow (workflow_graph.py) count: not
+  deleted, not Fleet or Providers, and linked to a PizzaStatus that
+  ``IsOperator``.
+- Required certs are the non-deleted CertTypes for (operator DivisionID,
+  StatusType PizzaStatusID).
+- Held certs are the operator's approved, non-deleted certifications.
+
+The operator x cert-type matrix is sparse: one held bitset and one required
+bitset per operator (cert_bitsets.py). Gaps are ``required & ~held`` and
+slot counts are popcounts, so all divisions are computed in one pass over
+operators. Missing cert names are only decoded once per distinct
+(division, status, gap) combination.
+
+Usage:
+    python cert_compliance.py [--division "10 - OR"] [--client CLIENT_ID]
+        [--gaps gaps.csv|gaps.json] [--matrix matrix.csv] [--top 10] [--app-data DIR]
+        [--profile] [--trace-memory]
+"""
+
+import argparse
+import csv
+import json
+import time
+from collections import Counter, defaultdict
+
+import profiling
+from app_data import APP_DATA_DIR, AppData
+from cert_bitsets import CertTypeBits, held_masks, requirement_masks
+from workflow_graph import WorkflowGraph
+
+class ComplianceRules:
+    """Workflow statuses and requirement masks, precomputed from App_Data."""
+
+    def __init__(self, store, client=None):
+        graph = WorkflowGraph.for_store(store)
+        pizza_statuses = {}
+        for pizza_status in store.pizza_statuses:
+            pizza_statuses.setdefault(pizza_status.get('ID'), pizza_status)
+
+        # (DivisionID, Status) -> StatusType, plus a case-insensitive fallback; first match wins
+        self.status_map = {}
+        self.status_map_lower = {}
+        for status_type in store.status_types:
+            if not graph.in_workflow(status_type.get('Id')):
+                continue
+            pizza_status = pizza_statuses[status_type['PizzaStatusID']]
+            if client and (pizza_status.get('ClientID') or '').lower() != client.lower():
+                continue
+            division, status = status_type.get('DivisionID'), status_type.get('Status') or ''
+            self.status_map.setdefault((division, status), status_type)
+            self.status_map_lower.setdefault(((division or '').lower(), status.lower()), status_type)
+
+        self.bits = CertTypeBits(store.cert_types)
+        self.required = requirement_masks(store.cert_types, self.bits)
+
+    def status_type(self, operator):
+        """The operator's workflow StatusType, or None."""
+        key = (operator.get('DivisionID'), operator.get('Status') or '')
+        status_type = self.status_map.get(key)
+        if status_type is None:
+            status_type = self.status_map_lower.get(((key[0] or '').lower(), key[1].lower()))
+        return status_type
+
+    def required_mask(self, operator):
+        """(StatusType, required cert mask) for the operator; the mask is 0 when nothing applies."""
+        status_type = self.status_type(operator)
+        if status_type is None:
+            return None, 0
+        return status_type, self.required.get((operator.get('DivisionID'), status_type['PizzaStatusID']), 0)
+
+def compute(store, division=None, client=None):
+    """Evaluate every operator with requirements.
+
+    Returns (rules, rows) where each row is
+    (operator, StatusType, required mask, held mask, missing mask).
+    """
+    rules = ComplianceRules(store, client)
+    if store.has('pay_Certifications.json'):
+        held = held_masks(store.certifications, rules.bits)
+    else:
+        print("⚠️  pay_Certifications.json not found; operators are treated as holding no certs")
+        held = {}
+
+    rows = []
+    for operator in store.operators:
+        operator_id = operator.get('ID')
+        if not operator_id or not operator.get('DivisionID') or not operator.get('Status'):
+            continue
+        if division and operator.get('DivisionID') != division:
+            continue
+        status_type, required = rules.required_mask(operator)
+        if not required:
+            continue
+        held_mask = held.get(operator_id, 0)
+        rows.append((operator, status_type, required, held_mask, required & ~held_mask))
+    return rules, rows
+
+def division_summary(rows):
+    """{DivisionID: {'operators', 'compliant', 'required', 'fulfilled', 'missing': Counter of masks}}"""
+    summary = defaultdict(lambda: {'operators': 0, 'compliant': 0, 'required': 0, 'fulfilled': 0,
+                                   'missing': Counter()})
+    for operator, _, required, _, missing in rows:
+        entry = summary[operator.get('DivisionID')]
+        entry['operators'] += 1
+        required_slots = required.bit_count()
+        entry['required'] += required_slots
+        entry['fulfilled'] += required_slots - missing.bit_count()
+        if missing:
+            entry['missing'][missing] += 1
+        else:
+            entry['compliant'] += 1
+    return summary
+
+def missing_by_cert_type(missing_masks, bits):
+    """Counter of cert type ID -> operators missing it, from a Counter of missing masks."""
+    counts = Counter()
+    for mask, operators in missing_masks.items():
+        for cert_type_id in bits.decode(mask):
+            counts[cert_type_id] += operators
+    return counts
+
+def percent(part, whole):
+    """Rounded percentage, 0 when whole is 0 (as in GetComplianceSummary)."""
+    return round(part / whole * 100) if whole else 0
+
+def print_summary(summary, bits, top):
+    print("\n" + "=" * 100)
+    print("CERTIFICATION COMPLIANCE BY DIVISION")
+    print("=" * 100)
+    print(f"{'Division':<26} {'Operators':>10} {'Compliant':>10} {'Required':>10} {'Fulfilled':>10} {'Percent':>8}")
+    print("-" * 100)
+    totals = Counter()
+    for division in sorted(summary, key=lambda d: d or ''):
+        entry = summary[division]
+        totals.update({key: entry[key] for key in ('operators', 'compliant', 'required', 'fulfilled')})
+        print(f"{(division or 'Unknown')[:26]:<26} {entry['operators']:>10} {entry['compliant']:>10} "
+              f"{entry['required']:>10} {entry['fulfilled']:>10} {percent(entry['fulfilled'], entry['required']):>7}%")
+    print("-" * 100)
+    print(f"{'Total':<26} {totals['operators']:>10} {totals['compliant']:>10} {totals['required']:>10} "
+          f"{totals['fulfilled']:>10} {percent(totals['fulfilled'], totals['required']):>7}%")
+
+    for division in sorted(summary, key=lambda d: d or ''):
+        gaps = missing_by_cert_type(summary[division]['missing'], bits)
+        if not gaps:
+            continue
+        print(f"\n📍 {division or 'Unknown'}: most commonly missing")
+        for cert_type_id, count in gaps.most_common(top):
+            print(f"   {count:>6}  {bits.names[cert_type_id]}")
+
+def write_gaps(path, rows, bits):
+    """Write one row per operator with requirements (CSV or JSON by extension)."""
+    names = {}
+    output = []
+    for operator, status_type, required, held, missing in rows:
+        key = (operator.get('DivisionID'), status_type['PizzaStatusID'], missing)
+        if key not in names:
+            names[key] = [bits.names[cert_type_id] for cert_type_id in bits.decode(missing)]
+        output.append({
+            'OperatorID': operator.get('ID'),
+            'Name': f"{operator.get('FirstName') or ''} {operator.get('LastName') or ''}".strip(),
+            'DivisionID': operator.get('DivisionID'),
+            'Status': status_type.get('Status'),
+            'PizzaStatusID': status_type['PizzaStatusID'],
+            'Required': required.bit_count(),
+            'Fulfilled': (required & held).bit_count(),
+            'Missing': names[key],
+        })
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        else:
+            writer = csv.DictWriter(f, fieldnames=['OperatorID', 'Name', 'DivisionID', 'Status', 'PizzaStatusID',
+                                                   'Required', 'Fulfilled', 'Missing'])
+            writer.writeheader()
+            for row in output:
+                writer.writerow({**row, 'Missing': '; '.join(row['Missing'])})
+    print(f"\n💾 Wrote gaps for {len(output)} operators to {path}")
+
+def write_matrix(path, rows, bits):
+    """Write the sparse operator x required-cert matrix: one CSV row per required cert."""
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['OperatorID', 'DivisionID', 'CertTypeID', 'Certification', 'Held'])
+        for operator, _, required, held, _ in rows:
+            for cert_type_id in bits.decode(required):
+                writer.writerow([operator.get('ID'), operator.get('DivisionID'), cert_type_id,
+                                 bits.names[cert_type_id], bool(bits.bit(cert_type_id) & held)])
+                count += 1
+    print(f"💾 Wrote {count} matrix cells to {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Required-certification gaps per operator and division.")
+    parser.add_argument('--division', help="Only evaluate this DivisionID")
+    parser.add_argument('--client', help="Only count statuses whose PizzaStatus belongs to this ClientID")
+    parser.add_argument('--gaps', metavar='PATH', help="Write per-operator gaps to a .csv or .json file")
+    parser.add_argument('--matrix', metavar='PATH', help="Write the operator x required-cert matrix as CSV")
+    parser.add_argument('--top', type=int, default=10, help="Missing cert types listed per division (default: 10)")
+    parser.add_argument('--app-data', default=APP_DATA_DIR, help="App_Data directory to read")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'cert_compliance', args.gaps or args.matrix)
+
+    started = time.perf_counter()
+    with profiling.phase('compute'):
+        rules, rows = compute(AppData(args.app_data), args.division, args.client)
+        summary = division_summary(rows)
+    elapsed = time.perf_counter() - started
+    print(f"📊 {len(rows):,} operators with requirements across {len(summary)} divisions "
+          f"({len(rules.bits)} cert types) in {elapsed:.2f}s")
+    with profiling.phase('render'):
+        print_summary(summary, rules.bits, args.top)
+    with profiling.phase('write'):
+        if args.gaps:
+            write_gaps(args.gaps, rows, rules.bits)
+        if args.matrix:
+            write_matrix(args.matrix, rows, rules.bits)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+App_Data Referential Integrity Check
+====================================
+Validates every foreign key between the App_Data tables and reports
+dangling references with counts and sample values:
+
+    pay_PizzaStatuses.ClientID       -> pay_Clients.ID
+    pay_StatusTypes.PizzaStatusID    -> pay_PizzaStatuses.ID
+    pay_CertTypes.PizzaStatusID      -> pay_PizzaStatuses.ID
+    pay_Operators.StatusID           -> pay_StatusTypes.Id
+    pay_Certifications.OperatorID    -> pay_Operators.ID
+    pay_StatusTracker.StatusID       -> pay_StatusTypes.Id
+    pay_StatusTracker.OperatorID     -> pay_Operators.ID
+
+It also lists PizzaStatuses that no StatusType references.
+
+Each table is streamed once, parents before children. While a table is
+read, its primary keys go into a set, and its foreign keys are probed
+against the key sets of tables already read, so every check is a hash
+join. Keys compare case-insensitively, as SQL Server compares GUIDs. Empty
+foreign keys are counted separately and do not fail the check.
+
+The exit status is 1 when any reference dangles, so the check can gate an
+export (export_database_to_json.py --check-integrity runs it after every
+successful export).
+
+Usage:
+    python check_integrity.py [--samples 5] [--json report.json] [--warn-only] [--app-data DIR]
+        [--profile] [--trace-memory]
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+
+import profiling
+from app_data import APP_DATA_DIR, AppData, record_id
+
+# Tables in read order: every referenced table comes before the tables referencing it
+TABLES = (
+    'pay_Clients.json',
+    'pay_PizzaStatuses.json',
+    'pay_StatusTypes.json',
+    'pay_CertTypes.json',
+    'pay_Operators.json',
+    'pay_Certifications.json',
+    'pay_StatusTracker.json',
+)
+
+# (table, foreign key field, referenced table)
+RELATIONSHIPS = (
+    ('pay_PizzaStatuses.json', 'ClientID', 'pay_Clients.json'),
+    ('pay_StatusTypes.json', 'PizzaStatusID', 'pay_PizzaStatuses.json'),
+    ('pay_CertTypes.json', 'PizzaStatusID', 'pay_PizzaStatuses.json'),
+    ('pay_Operators.json', 'StatusID', 'pay_StatusTypes.json'),
+    ('pay_Certifications.json', 'OperatorID', 'pay_Operators.json'),
+    ('pay_StatusTracker.json', 'StatusID', 'pay_StatusTypes.json'),
+    ('pay_StatusTracker.json', 'OperatorID', 'pay_Operators.json'),
+)
+
+# Distinct dangling values kept per relationship for the report
+DEFAULT_SAMPLES = 5
+
+def normalize(value):
+    """Comparable form of a key; None when it is empty."""
+    if value is None:
+        return None
+    key = str(value).strip().lower()
+    return key or None
+
+def table_name(filename):
+    return filename[:-len('.json')]
+
+class Relationship:
+    """Counts for one foreign key."""
+
+    def __init__(self, table, field, parent):
+        self.table, self.field, self.parent = table, field, parent
+        self.checked = 0
+        self.empty = 0
+        self.dangling = Counter()      # raw value -> rows
+        self.skipped = None            # reason, when a file is missing
+
+    @property
+    def label(self):
+        return f"{table_name(self.table)}.{self.field} → {table_name(self.parent)}"
+
+    @property
+    def dangling_rows(self):
+        return sum(self.dangling.values())
+
+    def to_dict(self, samples):
+        return {
+            'table': self.table, 'field': self.field, 'references': self.parent,
+            'checked': self.checked, 'empty': self.empty,
+            'danglingRows': self.dangling_rows, 'danglingValues': len(self.dangling),
+            'samples': [{'value': value, 'rows': rows} for value, rows in self.dangling.most_common(samples)],
+            'skipped': self.skipped,
+        }
+
+def check(store):
+    """Stream every table once. Returns (relationships, unreferenced PizzaStatuses, row counts)."""
+    relationships = [Relationship(*relationship) for relationship in RELATIONSHIPS]
+    by_table = {}
+    for relationship in relationships:
+        by_table.setdefault(relationship.table, []).append(relationship)
+    parents = {relationship.parent for relationship in relationships}
+
+    keys = {}                  # parent table -> set of normalized primary keys
+    rows = {}
+    pizza_statuses = {}        # normalized ID -> PizzaStatus, for the unreferenced check
+    referenced_pizza_statuses = set()
+    for filename in TABLES:
+        if not store.has(filename):
+            for relationship in relationships:
+                if filename in (relationship.table, relationship.parent) and relationship.skipped is None:
+                    relationship.skipped = f"{filename} not found"
+            continue
+        checks = [(relationship, relationship.field, keys[relationship.parent])
+                  for relationship in by_table.get(filename, ()) if relationship.skipped is None]
+        table_keys = set() if filename in parents else None
+        count = 0
+        for record in store.stream(filename):
+            count += 1
+            if table_keys is not None:
+                key = normalize(record_id(record))
+                if key:
+                    table_keys.add(key)
+            for relationship, field, parent_keys in checks:
+                value = record.get(field)
+                key = normalize(value)
+                if key is None:
+                    relationship.empty += 1
+                elif key not in parent_keys:
+                    relationship.dangling[value] += 1
+            if filename == 'pay_PizzaStatuses.json':
+                pizza_statuses.setdefault(normalize(record.get('ID')), record)
+            elif filename == 'pay_StatusTypes.json':
+                referenced_pizza_statuses.add(normalize(record.get('PizzaStatusID')))
+        for relationship, _, _ in checks:
+            relationship.checked = count
+        rows[filename] = count
+        if table_keys is not None:
+            keys[filename] = table_keys
+
+    unreferenced = [pizza_status for key, pizza_status in pizza_statuses.items()
+                    if key and key not in referenced_pizza_statuses] if 'pay_StatusTypes.json' in rows else []
+    return relationships, unreferenced, rows
+
+def print_report(relationships, unreferenced, rows, samples):
+    print("\n" + "=" * 100)
+    print("REFERENTIAL INTEGRITY")
+    print("=" * 100)
+    print(f"{'Relationship':<52} {'Rows':>10} {'Empty':>9} {'Dangling':>10} {'Values':>8}")
+    print("-" * 100)
+    for relationship in relationships:
+        if relationship.skipped:
+            print(f"{relationship.label:<52} {'skipped: ' + relationship.skipped:>39}")
+            continue
+        marker = '❌' if relationship.dangling else '✅'
+        print(f"{relationship.label:<52} {relationship.checked:>10,} {relationship.empty:>9,} "
+              f"{relationship.dangling_rows:>10,} {len(relationship.dangling):>8,} {marker}")
+
+    for relationship in relationships:
+        if not relationship.dangling:
+            continue
+        print(f"\n❌ {relationship.label}: {relationship.dangling_rows:,} rows reference "
+              f"{len(relationship.dangling):,} missing {table_name(relationship.parent)} keys")
+        for value, count in relationship.dangling.most_common(samples):
+            print(f"   {count:>8,}  {value}")
+        if len(relationship.dangling) > samples:
+            print(f"   ... and {len(relationship.dangling) - samples:,} more")
+
+    if unreferenced:
+        print(f"\n⚠️  PizzaStatuses not referenced by any StatusType: {len(unreferenced)}")
+        for pizza_status in unreferenced[:samples]:
+            print(f"   • {pizza_status.get('Status', 'Unknown')} (ID: {pizza_status.get('ID')})")
+        if len(unreferenced) > samples:
+            print(f"   ... and {len(unreferenced) - samples} more")
+
+def write_json(path, relationships, unreferenced, rows, samples):
+    report = {
+        'rows': rows,
+        'relationships': [relationship.to_dict(samples) for relationship in relationships],
+        'unreferencedPizzaStatuses': [{'ID': ps.get('ID'), 'Status': ps.get('Status'),
+                                       'ClientID': ps.get('ClientID')} for ps in unreferenced],
+        'ok': not any(relationship.dangling for relationship in relationships),
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Report written to {path}")
+
+def run(app_data_dir=APP_DATA_DIR, samples=DEFAULT_SAMPLES, json_path=None):
+    """Check app_data_dir and print the report. Returns True when no reference dangles."""
+    started = time.perf_counter()
+    # Nothing is loaded into memory or the snapshot cache; every table is streamed
+    with profiling.phase('compute'):
+        relationships, unreferenced, rows = check(AppData(app_data_dir, cache_dir=None))
+    elapsed = time.perf_counter() - started
+    with profiling.phase('render'):
+        print_report(relationships, unreferenced, rows, samples)
+    if json_path:
+        with profiling.phase('write'):
+            write_json(json_path, relationships, unreferenced, rows, samples)
+    ok = not any(relationship.dangling for relationship in relationships)
+    print(f"\n⏱️  Checked {sum(rows.values()):,} rows in {len(rows)} tables in {elapsed:.2f}s")
+    print("✅ No dangling references" if ok else "❌ Dangling references found")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Check foreign keys between the App_Data tables.")
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES,
+                        help=f"Dangling values listed per relationship (default: {DEFAULT_SAMPLES})")
+    parser.add_argument('--json', metavar='PATH', help="Also write the report as JSON")
+    parser.add_argument('--warn-only', action='store_true', help="Exit 0 even when references dangle")
+    parser.add_argument('--app-data', default=APP_DATA_DIR, help="App_Data directory to check")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'check_integrity', args.json)
+
+    ok = run(args.app_data, args.samples, args.json)
+    if not ok and not args.warn_only:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,48 +1,32 @@
-import json
-import os
-from collections import defaultdict
+import argparse
+
+import profiling
+from app_data import AppData
 
 def check_certs():
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    app_data_dir = os.path.join(base_dir, 'OrionOperatorLifecycleWebApp', 'App_Data')
-    
-    operators_path = os.path.join(app_data_dir, 'pay_Operators.json')
-    certs_path = os.path.join(app_data_dir, 'pay_Certifications.json')
+    store = AppData()
     
-    print(f"Checking data in: {app_data_dir}")
+    print(f"Checking data in: {store.app_data_dir}")
     
     try:
-        with open(operators_path, 'r', encoding='utf-8') as f:
-            operators = json.load(f)
+        operators = store.operators
         print(f"✅ Loaded {len(operators)} operators.")
     except Exception as e:
         print(f"❌ Error loading operators: {e}")
         return
 
     try:
-        with open(certs_path, 'r', encoding='utf-8') as f:
-            certs_data = json.load(f)
-            # Handle potential wrappers if file format varies
-            if isinstance(certs_data, dict) and 'certifications' in certs_data:
-                certs = certs_data['certifications']
-            elif isinstance(certs_data, list):
-                certs = certs_data
-            else:
-                certs = []
+        # The loader also unwraps older {"certifications": [...]} exports
+        certs = store.certifications
         print(f"✅ Loaded {len(certs)} certifications.")
     except Exception as e:
         print(f"❌ Error loading certifications: {e}")
         return
 
     # Map certs to operators
-    operator_cert_counts = defaultdict(int)
-    cert_operator_ids = set()
-    
-    for cert in certs:
-        op_id = cert.get('OperatorID') or cert.get('OperatorId')
-        if op_id:
-            operator_cert_counts[op_id] += 1
-            cert_operator_ids.add(op_id)
+    certs_by_operator = certs.index('OperatorID', 'OperatorId')
+    operator_cert_counts = {op_id: len(op_certs) for op_id, op_certs in certs_by_operator.items()}
+    cert_operator_ids = set(certs_by_operator)
             
     # Analyze
     operators_with_certs = 0
@@ -82,5 +66,13 @@ def check_certs():
             if count >= 5:
                 break
 
+def main():
+    parser = argparse.ArgumentParser(description="Count operators with and without certifications.")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'check_operator_certs')
+    with profiling.phase('compute'):
+        check_certs()
+
 if __name__ == "__main__":
-    check_certs()
+    main()
@@ -1,30 +1,64 @@
-import json
-import os
+"""
+Compare Contracting CertTypes
+=============================
+Side-by-side list of the active CertTypes required by two PizzaStatuses in
+one division (by default the two 'APPROVED FOR CONTRACTING' statuses in
+10-OR). A thin wrapper over query_app_data.select().
 
-json_path = os.path.join(os.path.dirname(__file__), '..', 'OrionOperatorLifecycleWebApp', 'App_Data', 'pay_CertTypes.json')
+Usage:
+    python compare_contracting_certs.py [--division "10 - OR"] [--pizza-status-id GUID[=LABEL] ...]
+        [--profile] [--trace-memory]
+"""
 
-with open(json_path, 'r', encoding='utf-8') as f:
-    cert_types = json.load(f)
+import argparse
+
+import profiling
+from app_data import AppData
+from query_app_data import select
 
 # Both PizzaStatusIDs for comparison
-ps1 = '0F3DDDE2-1920-4E71-A40A-7610F5C58FAC'  # Operator Contracting (Order 13)
-ps2 = 'FCCFFEDC-F7AB-4730-B3A6-C1E7B3FE8295'  # Provider Contracting (Order 4)
-division = '10 - OR'
-
-print("\n" + "="*100)
-print("COMPARISON: Two 'APPROVED FOR CONTRACTING' statuses in Division 10-OR")
-print("="*100)
-
-for ps_id, label in [(ps1, "Operator Contracting (Order 13)"), (ps2, "Provider Contracting (Order 4)")]:
-    results = [ct for ct in cert_types if ct.get('PizzaStatusID') == ps_id and ct.get('DivisionID') == division and not ct.get('isDeleted')]
-    print(f"\n📋 {label}")
-    print(f"   PizzaStatusID: {ps_id}")
-    print(f"   Found {len(results)} active CertType(s):\n")
-    
-    if results:
-        for i, ct in enumerate(results, 1):
-            print(f"   {i}. {ct.get('Certification', 'N/A')}")
-            print(f"      ID: {ct.get('ID', 'N/A')}")
+DEFAULT_PIZZA_STATUSES = [
+    ('0F3DDDE2-1920-4E71-A40A-7610F5C58FAC', "Operator Contracting (Order 13)"),
+    ('FCCFFEDC-F7AB-4730-B3A6-C1E7B3FE8295', "Provider Contracting (Order 4)"),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the active CertTypes of PizzaStatuses in a division.")
+    parser.add_argument('--division', default='10 - OR')
+    parser.add_argument('--pizza-status-id', action='append', metavar='GUID[=LABEL]',
+                        help="PizzaStatus to compare (repeatable)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'compare_contracting_certs')
+    division = args.division
+    pizza_statuses = DEFAULT_PIZZA_STATUSES
+    if args.pizza_status_id:
+        pizza_statuses = [(ps_id, label or ps_id) for ps_id, _, label in
+                          (item.partition('=') for item in args.pizza_status_id)]
+
+    store = AppData()
+    print("\n" + "="*100)
+    if args.pizza_status_id or division != '10 - OR':
+        print(f"COMPARISON: {len(pizza_statuses)} PizzaStatuses in Division {division}")
     else:
-        print("   ❌ No active certs found")
-    print()
+        print("COMPARISON: Two 'APPROVED FOR CONTRACTING' statuses in Division 10-OR")
+    print("="*100)
+
+    for ps_id, label in pizza_statuses:
+        with profiling.phase('compute'):
+            results, _ = select(store, 'cert_types', where={'PizzaStatusID': ps_id, 'DivisionID': division})
+            results = [ct for ct in results if not ct.get('isDeleted')]
+        print(f"\n📋 {label}")
+        print(f"   PizzaStatusID: {ps_id}")
+        print(f"   Found {len(results)} active CertType(s):\n")
+
+        if results:
+            for i, ct in enumerate(results, 1):
+                print(f"   {i}. {ct.get('Certification', 'N/A')}")
+                print(f"      ID: {ct.get('ID', 'N/A')}")
+        else:
+            print("   ❌ No active certs found")
+        print()
+
+if __name__ == '__main__':
+    main()
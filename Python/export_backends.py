@@ -0,0 +1,95 @@
+"""
+Database Backends for the Exporter
+==================================
+export_database_to_json.py talks to plain DB-API connections. The few places
+where SQL differs between engines go through a dialect, found on the
+connection itself (``conn.dialect``); connections without one are treated as
+SQL Server, so a bare ``pyodbc`` connection keeps working.
+
+Two backends are provided:
+
+- SQL Server via ``pyodbc`` (the production Azure SQL database).
+- SQLite via the standard library, for the local stand-in database built by
+  build_sqlite_standin.py, so the exporter can be run and benchmarked offline.
+"""
+
+import sqlite3
+
+class SqlServerDialect:
+    """SQL used against SQL Server / Azure SQL."""
+
+    name = 'sqlserver'
+    random_order = 'NEWID()'
+    id_table = '#ExportOperatorIDs'
+
+    def stage_ids(self, cursor, ids, batch_size):
+        """Create the session temp table id_table and load ids into it."""
+        cursor.execute(f"""
+            IF OBJECT_ID('tempdb..{self.id_table}') IS NOT NULL DROP TABLE {self.id_table};
+            CREATE TABLE {self.id_table} (OperatorID UNIQUEIDENTIFIER PRIMARY KEY);
+        """)
+        cursor.fast_executemany = True
+        for start in range(0, len(ids), batch_size):
+            cursor.executemany(f"INSERT INTO {self.id_table} (OperatorID) VALUES (?)",
+                               [(operator_id,) for operator_id in ids[start:start + batch_size]])
+
+    def drop_ids(self, cursor):
+        cursor.execute(f"IF OBJECT_ID('tempdb..{self.id_table}') IS NOT NULL DROP TABLE {self.id_table}")
+
+    def checksum_query(self, query):
+        """SQL returning (row count, aggregate checksum) of query, or None if unsupported."""
+        return f"SELECT COUNT_BIG(*), CHECKSUM_AGG(BINARY_CHECKSUM(*)) FROM ({query}) AS q"
+
+    def datetime_param(self, value):
+        """Bind value for comparing against a datetime column."""
+        return value
+
+class SqliteDialect:
+    """SQL used against the local SQLite stand-in database."""
+
+    name = 'sqlite'
+    random_order = 'RANDOM()'
+    id_table = 'temp.export_operator_ids'
+
+    def stage_ids(self, cursor, ids, batch_size):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.id_table}")
+        cursor.execute(f"CREATE TABLE {self.id_table} (OperatorID TEXT PRIMARY KEY)")
+        for start in range(0, len(ids), batch_size):
+            cursor.executemany(f"INSERT INTO {self.id_table} (OperatorID) VALUES (?)",
+                               [(operator_id,) for operator_id in ids[start:start + batch_size]])
+
+    def drop_ids(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.id_table}")
+
+    def checksum_query(self, query):
+        # SQLite has no aggregate row checksum, so reference tables are always re-exported
+        return None
+
+    def datetime_param(self, value):
+        # Dates are stored as ISO-8601 text, which compares correctly as a string
+        return value.isoformat()
+
+SQL_SERVER = SqlServerDialect()
+SQLITE = SqliteDialect()
+
+class SqliteConnection(sqlite3.Connection):
+    """sqlite3 connection that carries the SQLite dialect."""
+
+    dialect = SQLITE
+
+def dialect_for(conn):
+    """Return the dialect for a connection (SQL Server unless it says otherwise)."""
+    return getattr(conn, 'dialect', SQL_SERVER)
+
+def connect_sql_server(connection_string):
+    """Open a pyodbc connection; pyodbc is only needed when this backend is used."""
+    import pyodbc
+    return pyodbc.connect(connection_string)
+
+def connect_sqlite(path):
+    """Open the SQLite stand-in database at path.
+
+    The connection may be handed between pool threads (one at a time), so
+    sqlite3's same-thread check is disabled.
+    """
+    return sqlite3.connect(path, factory=SqliteConnection, check_same_thread=False)
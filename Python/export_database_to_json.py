@@ -2,13 +2,74 @@
 Export SQL Database to JSON Files
 ==================================
 Exports data from the Orion SQL database to JSON files for the ASP.NET app.
+
+Rows are read with ``fetchmany`` in batches and written to the output JSON
+array as they arrive, so peak memory is bounded by the batch size rather than
+the size of the table.
+
+With ``--incremental``, pay_Operators, pay_StatusTracker and pay_StatusTypes
+only pull rows whose UpdateAt/RecordAt is newer than the watermark stored by
+the previous run and merge them into the existing files by ID. Each merge
+is also appended to ``export_state/changes.jsonl`` so derived aggregates
+(operator_aggregates.py) can be updated from the delta alone.
+
+Every output file is recorded in a manifest (row count, SHA-256, export time,
+source query). Reference tables (CertTypes, PizzaStatus, Clients, StatusTypes)
+are checksummed server-side first and skipped entirely when the checksum and
+row count match the manifest and the file on disk is intact; ``--force``
+re-exports them regardless.
+
+Files are written to ``<name>.tmp`` and atomically renamed into place, so
+App_Data never holds a half-written export. Completed tables (and completed
+ID chunks of the operator-linked tables) are checkpointed; re-running after a
+failure resumes from the checkpoint, ``--restart`` discards it.
+
+With ``--workers N`` tables are exported concurrently over a pool of at most N
+connections: reference tables start straight away, and the operator-linked
+tables start as soon as the operator sample (and so operator_ids) is known.
+
+Each run records per-table query, fetch, conversion and write times, row
+counts, rows/sec and output bytes to ``export_state/metrics.json`` (and
+appends them to ``metrics_history.jsonl``); ``--summary`` also prints them.
+
+``--sqlite PATH`` exports from a local SQLite stand-in (see
+build_sqlite_standin.py) instead of SQL Server; ``--output-dir`` and
+``--state-dir`` keep such runs away from the real App_Data.
+
+``--check-integrity`` runs check_integrity.py over the output once the export
+succeeds and exits with status 1 if any foreign key dangles.
+
+``--profile`` / ``--trace-memory`` (see profiling.py) write
+``export_database_to_json.profile.txt`` next to the metrics file. The CPU
+profile includes the table threads, and the query, fetch, convert and write
+times of all tables are added up as phases.
+
+Usage:
+    python export_database_to_json.py [--sqlite PATH] [--output-dir DIR] [--state-dir DIR]
+        [--batch-size 5000]
+        [--max-per-division-status 10] [--sampling recent|random|all]
+        [--id-filter auto|chunks|temp-table] [--incremental] [--force] [--restart]
+        [--workers 1] [--metrics-file PATH] [--summary] [--check-integrity]
+        [--profile] [--trace-memory]
 """
 
-import pyodbc
+import argparse
+import hashlib
 import json
 import os
-from datetime import datetime
+import queue
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from time import perf_counter
+from datetime import date, datetime, time, timezone
 from decimal import Decimal
+from itertools import chain
+
+import profiling
+from check_integrity import run as run_integrity_check
+from export_backends import SQL_SERVER, connect_sql_server, connect_sqlite, dialect_for
 
 # Database connection details
 SERVER = 'oriontcms.database.windows.net'
@@ -20,14 +81,59 @@ PASSWORD = 'Fouru2nvu9'
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'OrionOperatorLifecycleWebApp', 'App_Data')
 
+# Number of rows pulled per fetchmany() round-trip
+BATCH_SIZE = 5000
+
+# Operator IDs per IN (...) query; SQL Server caps a statement at 2100 parameters
+ID_CHUNK_SIZE = 1000
+
+# Above this many operator IDs, stage them in a temp table instead of chunking
+TEMP_TABLE_THRESHOLD = 20000
+
+# Exporter state (watermarks etc.) lives next to the script, not in App_Data
+STATE_DIR = os.path.join(SCRIPT_DIR, 'export_state')
+WATERMARK_FILE = os.path.join(STATE_DIR, 'watermarks.json')
+MANIFEST_FILE = os.path.join(STATE_DIR, 'manifest.json')
+CHECKPOINT_FILE = os.path.join(STATE_DIR, 'checkpoint.json')
+METRICS_FILE = os.path.join(STATE_DIR, 'metrics.json')
+METRICS_HISTORY_FILE = os.path.join(STATE_DIR, 'metrics_history.jsonl')
+CHANGE_LOG_FILE = os.path.join(STATE_DIR, 'changes.jsonl')
+
+# Tables with RecordAt/UpdateAt that --incremental can pull as deltas
+INCREMENTAL_TABLES = {
+    'pay_Operators': 'pay_Operators.json',
+    'pay_StatusTracker': 'pay_StatusTracker.json',
+    'pay_StatusTypes': 'pay_StatusTypes.json',
+}
+
+# Rows created or updated after a watermark (bind the watermark twice)
+CHANGED_SINCE_CLAUSE = "UpdateAt > ? OR RecordAt > ?"
+
+# Operator columns exported to pay_Operators.json
+OPERATOR_COLUMNS = """ID, FirstName, LastName, Email, Mobile, DivisionID,
+                Status, StatusID, IsDeleted, RecordAt, RecordBy, UpdateAt, UpdateBy"""
+
+# Operator sampling strategies -> ORDER BY used to rank operators within each
+# (DivisionID, Status) group (None: the dialect's random ordering).
+# 'all' ignores max_per_division_status.
+SAMPLING_STRATEGIES = {
+    'recent': 'UpdateAt DESC, RecordAt DESC',
+    'random': None,
+    'all': 'UpdateAt DESC, RecordAt DESC',
+}
+
 # Connection string
 CONNECTION_STRING = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={SERVER};DATABASE={DATABASE};UID={USERNAME};PWD={PASSWORD}'
 
-def connect_to_database():
-    """Establish connection to SQL Server database."""
+def connect_to_database(sqlite_path=None):
+    """Establish connection to SQL Server database (or the SQLite stand-in at sqlite_path)."""
     try:
-        conn = pyodbc.connect(CONNECTION_STRING)
-        print(f"✅ Connected to database: {DATABASE}")
+        if sqlite_path:
+            conn = connect_sqlite(sqlite_path)
+            print(f"✅ Connected to SQLite stand-in: {sqlite_path}")
+        else:
+            conn = connect_sql_server(CONNECTION_STRING)
+            print(f"✅ Connected to database: {DATABASE}")
         return conn
     except Exception as e:
         print(f"❌ Error connecting to database: {e}")
@@ -50,89 +156,531 @@ def row_to_dict(cursor, row):
     columns = [column[0] for column in cursor.description]
     return {col: convert_value(val) for col, val in zip(columns, row)}
 
-def export_operators(conn, max_per_division_status=10):
-    """Export operators with sampling strategy."""
-    cursor = conn.cursor()
-    print("\n📊 Analyzing operator distribution...")
-    
-    cursor.execute("""
-        SELECT DivisionID, Status, COUNT(*) as OperatorCount
-        FROM pay_Operators
-        WHERE (IsDeleted = 0 OR IsDeleted IS NULL)
-        GROUP BY DivisionID, Status
-        ORDER BY DivisionID, Status
-    """)
-    
-    combinations = cursor.fetchall()
-    sampled_operators = []
-    operator_ids = set()
-    
-    for combo in combinations:
-        division, status, count = combo
-        cursor.execute(f"""
-            SELECT TOP {max_per_division_status}
-                ID, FirstName, LastName, Email, Mobile, DivisionID,
-                Status, StatusID, IsDeleted, RecordAt, RecordBy, UpdateAt, UpdateBy
-            FROM pay_Operators
-            WHERE DivisionID = ? AND Status = ? AND (IsDeleted = 0 OR IsDeleted IS NULL)
-            ORDER BY UpdateAt DESC, RecordAt DESC
-        """, (division, status))
+class TableMetrics:
+    """Timings and volumes for one exported table.
+
+    Time is split into phases: ``query`` (execute until the first row is
+    ready), ``fetch`` (fetchmany round-trips), ``convert`` (row -> dict) and
+    ``write`` (JSON serialization and disk writes).
+    """
+
+    PHASES = ('query', 'fetch', 'convert', 'write')
+
+    def __init__(self, table_name):
+        self.table_name = table_name
+        self.seconds = dict.fromkeys(self.PHASES, 0.0)
+        self.wall_seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.status = 'ok'
+
+    @contextmanager
+    def phase(self, name):
+        """Add the time spent in a with-block to the named phase."""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += perf_counter() - started
+
+    def as_dict(self):
+        return {
+            'table': self.table_name,
+            'status': self.status,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'rows_per_sec': round(self.rows / self.wall_seconds, 1) if self.wall_seconds else None,
+            **{f"{name}_seconds": round(value, 4) for name, value in self.seconds.items()},
+        }
+
+class ExportMetrics:
+    """Per-table TableMetrics for one export run."""
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.tables = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, table_name):
+        """Make table_name's metrics current for this thread while the block runs."""
+        metrics = TableMetrics(table_name)
+        with self._lock:
+            self.tables[table_name] = metrics
+        _current.metrics = metrics
+        started = perf_counter()
+        try:
+            yield metrics
+        except BaseException:
+            metrics.status = 'failed'
+            raise
+        finally:
+            metrics.wall_seconds = perf_counter() - started
+            _current.metrics = None
+
+    def as_dict(self):
+        return {
+            'started_at': self.started_at,
+            'tables': [metrics.as_dict() for metrics in self.tables.values()],
+        }
+
+    def write(self, path, history_path=None):
+        """Write this run's metrics to path and append them to history_path (NDJSON)."""
+        report = self.as_dict()
+        write_json_atomic(path, report)
+        if history_path:
+            os.makedirs(os.path.dirname(history_path), exist_ok=True)
+            with open(history_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(report) + '\n')
+
+    def print_summary(self):
+        """Print a per-table summary table."""
+        print(f"\n{'Table':<22} {'Rows':>9} {'Rows/s':>10} {'MB':>8} "
+              f"{'Query':>7} {'Fetch':>7} {'Convert':>8} {'Write':>7} {'Total':>7}")
+        print("-" * 94)
+        for metrics in self.tables.values():
+            rate = metrics.rows / metrics.wall_seconds if metrics.wall_seconds else 0
+            seconds = metrics.seconds
+            print(f"{metrics.table_name:<22} {metrics.rows:>9} {rate:>10,.0f} {metrics.bytes / 1e6:>8.2f} "
+                  f"{seconds['query']:>7.2f} {seconds['fetch']:>7.2f} {seconds['convert']:>8.2f} "
+                  f"{seconds['write']:>7.2f} {metrics.wall_seconds:>7.2f}")
+
+# Metrics of the table being exported on the current thread
+_current = threading.local()
+
+# Sink for work done outside any tracked table (e.g. watermark queries)
+_UNTRACKED = TableMetrics(None)
+
+def current_metrics():
+    """Return the TableMetrics being recorded on this thread."""
+    return getattr(_current, 'metrics', None) or _UNTRACKED
+
+def decode_bytes(value):
+    """Decode a binary column value the same way convert_value does."""
+    return bytes(value).decode('utf-8', errors='ignore')
+
+# cursor.description type_code -> converter applied to non-NULL values
+TYPE_CONVERTERS = {
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    time: time.isoformat,
+    Decimal: float,
+    bytes: decode_bytes,
+    bytearray: decode_bytes,
+}
+
+# Type codes whose values are already JSON-compatible
+PASSTHROUGH_TYPES = (str, int, float, bool)
+
+class RowCodec:
+    """Converts raw cursor rows to JSON-ready dicts.
+
+    Compiled once per result set from ``cursor.description``: each column gets
+    a direct converter chosen from its type code, and columns that need no
+    conversion are copied as-is. Drivers that do not report a usable type code
+    (e.g. sqlite3) fall back to convert_value for that column.
+    """
+
+    def __init__(self, description):
+        self.columns = [column[0] for column in description]
+        self.converters = []
+        for index, column in enumerate(description):
+            type_code = column[1]
+            if type_code in PASSTHROUGH_TYPES:
+                continue
+            self.converters.append((index, TYPE_CONVERTERS.get(type_code, convert_value)))
+
+    def convert(self, row):
+        """Convert a single row to a dict."""
+        values = list(row)
+        for index, converter in self.converters:
+            if values[index] is not None:
+                values[index] = converter(values[index])
+        return dict(zip(self.columns, values))
+
+    def convert_batch(self, rows):
+        """Convert a batch of rows (as returned by fetchmany) to a list of dicts.
+
+        Works column-wise: each converted column is rebuilt in one pass, then
+        the columns are zipped back into records.
+        """
+        columns = self.columns
+        if not self.converters or not rows:
+            return [dict(zip(columns, row)) for row in rows]
         
-        rows = cursor.fetchall()
-        for row in rows:
-            operator = row_to_dict(cursor, row)
-            sampled_operators.append(operator)
-            operator_ids.add(operator['ID'])
+        values = list(zip(*rows))
+        for index, converter in self.converters:
+            values[index] = [None if value is None else converter(value) for value in values[index]]
+        return [dict(zip(columns, record)) for record in zip(*values)]
+
+def execute(cursor, query, params=()):
+    """cursor.execute, timed as the current table's query latency."""
+    with current_metrics().phase('query'):
+        if params:
+            return cursor.execute(query, params)
+        return cursor.execute(query)
+
+def fetch_batches(cursor, batch_size=BATCH_SIZE):
+    """Yield rows from an executed cursor in batches of at most batch_size."""
+    metrics = current_metrics()
+    while True:
+        with metrics.phase('fetch'):
+            rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        metrics.rows += len(rows)
+        yield rows
+
+def fetch_record_batches(cursor, batch_size=BATCH_SIZE):
+    """Yield lists of converted row dicts from an executed cursor."""
+    codec = RowCodec(cursor.description)
+    metrics = current_metrics()
+    for rows in fetch_batches(cursor, batch_size):
+        with metrics.phase('convert'):
+            records = codec.convert_batch(rows)
+        yield records
+
+class JsonArrayWriter:
+    """Write a JSON array to disk one element at a time.
+
+    The output is byte-for-byte what ``json.dump(rows, f, indent=2,
+    ensure_ascii=False)`` would produce for the same rows. Rows go to
+    ``<path>.tmp``, which only replaces ``path`` once the array is complete, so
+    readers never see a half-written file.
+
+    ``resume`` (``{'rows': n, 'offset': bytes}`` as returned by flush())
+    reopens an interrupted temp file at that point and keeps appending. With
+    ``keep_partial`` the temp file is left behind on failure so it can be
+    resumed; otherwise it is removed.
+    """
+
+    def __init__(self, path, resume=None, keep_partial=False):
+        self.path = path
+        self.temp_path = path + '.tmp'
+        self.count = 0
+        self.keep_partial = keep_partial
+        self._resume = resume
+        self._file = None
+        self._metrics = current_metrics()
+
+    def __enter__(self):
+        if self._resume:
+            self._file = open(self.temp_path, 'r+b')
+            self._file.truncate(self._resume['offset'])
+            self._file.seek(self._resume['offset'])
+            self.count = self._resume['rows']
+        else:
+            self._file = open(self.temp_path, 'wb')
+            self._file.write(b'[')
+        return self
+
+    def write(self, row):
+        """Append a single element to the array (not timed; see write_batch)."""
+        text = json.dumps(row, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+        self._file.write((('\n  ' if self.count == 0 else ',\n  ') + text).encode('utf-8'))
+        self.count += 1
+
+    def write_batch(self, rows):
+        """Append every row, timed once for the whole batch as the table's write phase."""
+        with self._metrics.phase('write'):
+            for row in rows:
+                self.write(row)
+
+    def flush(self):
+        """Force written rows to disk; returns the resume point for this writer."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {'rows': self.count, 'offset': self._file.tell()}
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._file.close()
+            if not self.keep_partial:
+                os.remove(self.temp_path)
+            return False
         
-        print(f"   {division} - {status}: Selected {len(rows)} of {count} operators")
+        with self._metrics.phase('write'):
+            self._file.write(b'\n]' if self.count else b']')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._metrics.bytes += self._file.tell()
+            self._file.close()
+            os.replace(self.temp_path, self.path)
+        return False
+
+def write_json_atomic(path, data):
+    """json.dump data to path via a temp file and an atomic rename."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+def stream_query_to_file(cursor, output_filename, batch_size=BATCH_SIZE):
+    """Stream the result set of an executed cursor into OUTPUT_DIR/output_filename.
+
+    Returns the number of rows written.
+    """
+    output_file = os.path.join(OUTPUT_DIR, output_filename)
+    with JsonArrayWriter(output_file) as writer:
+        write_rows(cursor, writer, batch_size)
+    return writer.count
+
+def write_rows(cursor, writer, batch_size=BATCH_SIZE):
+    """Append every row of an executed cursor to an open JsonArrayWriter."""
+    for records in fetch_record_batches(cursor, batch_size):
+        writer.write_batch(records)
+
+def build_operator_sample_query(max_per_division_status=10, sampling='recent', dialect=SQL_SERVER):
+    """Build the single windowed query that samples operators per (DivisionID, Status).
+
+    Every row carries ``GroupTotal``, the size of its (DivisionID, Status)
+    group, so the caller can report "selected X of Y" without a second query.
+    Returns ``(query, params)``.
+    """
+    if sampling not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown sampling strategy: {sampling}")
     
+    order_by = SAMPLING_STRATEGIES[sampling] or dialect.random_order
+    query = f"""
+        WITH ranked AS (
+            SELECT {OPERATOR_COLUMNS},
+                ROW_NUMBER() OVER (PARTITION BY DivisionID, Status ORDER BY {order_by}) AS SampleRank,
+                COUNT(*) OVER (PARTITION BY DivisionID, Status) AS GroupTotal
+            FROM pay_Operators
+            WHERE (IsDeleted = 0 OR IsDeleted IS NULL)
+        )
+        SELECT {OPERATOR_COLUMNS}, GroupTotal
+        FROM ranked
+    """
+    params = []
+    if sampling != 'all' and max_per_division_status is not None:
+        query += "    WHERE SampleRank <= ?\n"
+        params.append(max_per_division_status)
+    query += "        ORDER BY DivisionID, Status, SampleRank\n"
+    return query, params
+
+def export_operators(conn, max_per_division_status=10, sampling='recent', batch_size=BATCH_SIZE,
+                     manifest=None):
+    """Export operators, sampling up to max_per_division_status per (DivisionID, Status).
+
+    ``sampling`` picks which operators are kept in each group: ``recent``
+    (latest UpdateAt/RecordAt first), ``random`` or ``all``.
+    """
+    cursor = conn.cursor()
     output_file = os.path.join(OUTPUT_DIR, 'pay_Operators.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(sampled_operators, f, indent=2, ensure_ascii=False)
+    print(f"\n📊 Sampling operators (strategy: {sampling})...")
+    
+    query, params = build_operator_sample_query(max_per_division_status, sampling, dialect_for(conn))
+    execute(cursor, query, params)
+    
+    operator_ids = set()
+    group_counts = {}
+    
+    with JsonArrayWriter(output_file) as writer:
+        for operators in fetch_record_batches(cursor, batch_size):
+            for operator in operators:
+                total = operator.pop('GroupTotal')
+                operator_ids.add(operator['ID'])
+                
+                key = (operator['DivisionID'], operator['Status'])
+                if key in group_counts:
+                    group_counts[key][0] += 1
+                else:
+                    group_counts[key] = [1, total]
+            writer.write_batch(operators)
     
+    for (division, status), (selected, total) in group_counts.items():
+        print(f"   {division} - {status}: Selected {selected} of {total} operators")
+    
+    if manifest is not None:
+        manifest.record('pay_Operators.json', query, writer.count)
     return list(operator_ids)
 
-def export_related_data(conn, table_name, operator_ids, output_filename):
-    """Helper to export records filtered by OperatorID list."""
-    if not operator_ids:
-        return
+def unique_ids(ids):
+    """De-duplicate GUID strings case-insensitively, in a stable sorted order."""
+    return sorted({str(i).upper() for i in ids if i})
+
+def chunked(items, size):
+    """Yield consecutive slices of items with at most size elements each."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def iter_rows_by_ids(conn, table_name, ids, id_column='OperatorID', columns='*', where_clause="",
+                     params=(), id_filter='auto', batch_size=BATCH_SIZE, id_chunk_size=ID_CHUNK_SIZE):
+    """Yield rows (as dicts) of table_name whose id_column is in ids; see iter_record_batches_by_ids."""
+    for records in iter_record_batches_by_ids(conn, table_name, ids, id_column, columns, where_clause, params,
+                                              id_filter, batch_size, id_chunk_size):
+        yield from records
+
+def iter_record_batches_by_ids(conn, table_name, ids, id_column='OperatorID', columns='*', where_clause="",
+                               params=(), id_filter='auto', batch_size=BATCH_SIZE,
+                               id_chunk_size=ID_CHUNK_SIZE):
+    """Yield lists of row dicts (one per fetch batch) of table_name whose id_column is in ids.
+
+    ``id_filter`` chooses how the ID list reaches SQL Server:
+
+    - ``chunks``: one ``IN (...)`` query per id_chunk_size IDs, keeping every
+      statement well under SQL Server's 2100-parameter limit.
+    - ``temp-table``: stage the IDs in a temp table (``#ExportOperatorIDs`` on
+      SQL Server) and join once.
+    - ``auto``: chunks up to TEMP_TABLE_THRESHOLD IDs, temp table beyond.
+
+    IDs are de-duplicated up front, so the chunks are disjoint and no row is
+    yielded twice. ``params`` binds any placeholders in where_clause.
+    """
+    ids = unique_ids(ids)
+    if id_filter == 'auto':
+        id_filter = 'temp-table' if len(ids) > TEMP_TABLE_THRESHOLD else 'chunks'
     
     cursor = conn.cursor()
-    # SQL Server has a limit on parameters, but for ~100-200 IDs this is fine
-    placeholders = ','.join(['?' for _ in operator_ids])
-    query = f"SELECT * FROM {table_name} WHERE OperatorID IN ({placeholders})"
-    
-    print(f"\n🔗 Exporting {table_name} for sampled operators...")
-    cursor.execute(query, operator_ids)
-    rows = [row_to_dict(cursor, row) for row in cursor.fetchall()]
+    extra_filter = f" AND ({where_clause})" if where_clause else ""
     
+    if id_filter == 'temp-table':
+        dialect = dialect_for(conn)
+        try:
+            with current_metrics().phase('query'):
+                dialect.stage_ids(cursor, ids, batch_size)
+            select_columns = ', '.join(f"t.{c.strip()}" for c in columns.split(','))
+            execute(cursor, f"""
+                SELECT {select_columns} FROM {table_name} t
+                INNER JOIN {dialect.id_table} ids ON ids.OperatorID = t.{id_column}
+                WHERE 1 = 1{extra_filter}
+            """, list(params))
+            yield from fetch_record_batches(cursor, batch_size)
+        finally:
+            # Also on failure or early close, so the pooled connection goes back without the temp
+            # table. The select's cursor is closed first, as it may still hold unread rows
+            cursor.close()
+            dialect.drop_ids(conn.cursor())
+    elif id_filter == 'chunks':
+        for chunk in chunked(ids, id_chunk_size):
+            placeholders = ','.join(['?' for _ in chunk])
+            execute(
+                cursor, f"SELECT {columns} FROM {table_name} WHERE {id_column} IN ({placeholders}){extra_filter}",
+                chunk + list(params))
+            yield from fetch_record_batches(cursor, batch_size)
+    else:
+        raise ValueError(f"Unknown id_filter: {id_filter}")
+
+def export_by_operator_ids(conn, table_name, operator_ids, output_filename, where_clause="",
+                           id_filter='auto', batch_size=BATCH_SIZE, id_chunk_size=ID_CHUNK_SIZE,
+                           checkpoint=None):
+    """Stream every row of table_name whose OperatorID is in operator_ids to one file.
+
+    See iter_rows_by_ids for the id_filter strategies. With a checkpoint and
+    chunked filtering, progress is recorded after every chunk, and an
+    interrupted export of the same ID list resumes after the last completed
+    chunk instead of starting over. Returns the number of rows written.
+    """
+    operator_ids = unique_ids(operator_ids)
+    if id_filter == 'auto':
+        id_filter = 'temp-table' if len(operator_ids) > TEMP_TABLE_THRESHOLD else 'chunks'
     output_file = os.path.join(OUTPUT_DIR, output_filename)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(rows, f, indent=2, ensure_ascii=False)
-    print(f"✅ Exported {len(rows)} records to {output_filename}")
+    
+    if checkpoint is None or id_filter != 'chunks':
+        with JsonArrayWriter(output_file) as writer:
+            for records in iter_record_batches_by_ids(conn, table_name, operator_ids,
+                                                      where_clause=where_clause,
+                                                      id_filter=id_filter, batch_size=batch_size,
+                                                      id_chunk_size=id_chunk_size):
+                writer.write_batch(records)
+        return writer.count
+    
+    chunks = list(chunked(operator_ids, id_chunk_size))
+    fingerprint = hashlib.sha256(f"{id_chunk_size}:{','.join(operator_ids)}".encode('utf-8')).hexdigest()
+    progress = checkpoint.chunk_progress(table_name, fingerprint)
+    if progress and not (os.path.exists(output_file + '.tmp')
+                         and os.path.getsize(output_file + '.tmp') >= progress['offset']):
+        progress = None
+    start = progress['chunks'] if progress else 0
+    if start:
+        print(f"   ♻️  Resuming {table_name} at chunk {start + 1} of {len(chunks)}")
+    
+    with JsonArrayWriter(output_file, resume=progress, keep_partial=True) as writer:
+        for index in range(start, len(chunks)):
+            for records in iter_record_batches_by_ids(conn, table_name, chunks[index],
+                                                      where_clause=where_clause,
+                                                      id_filter='chunks', batch_size=batch_size,
+                                                      id_chunk_size=id_chunk_size):
+                writer.write_batch(records)
+            checkpoint.record_chunk(table_name, fingerprint, index + 1, writer.flush())
+    return writer.count
+
+def export_related_data(conn, table_name, operator_ids, output_filename, id_filter='auto',
+                        batch_size=BATCH_SIZE, manifest=None, checkpoint=None):
+    """Helper to export records filtered by OperatorID list."""
+    if not operator_ids:
+        return
+    
+    print(f"\n🔗 Exporting {table_name} for {len(operator_ids)} sampled operators...")
+    count = export_by_operator_ids(conn, table_name, operator_ids, output_filename,
+                                   id_filter=id_filter, batch_size=batch_size, checkpoint=checkpoint)
+    if manifest is not None:
+        manifest.record(output_filename,
+                        f"SELECT * FROM {table_name} WHERE OperatorID IN (<{len(operator_ids)} operator IDs>)",
+                        count)
+    print(f"✅ Exported {count} records to {output_filename}")
 
-def export_certifications(conn, operator_ids):
+def export_certifications(conn, operator_ids, id_filter='auto', batch_size=BATCH_SIZE, manifest=None,
+                          checkpoint=None):
     """Export pay_Certifications for sampled operators, filtering for isApproved=1."""
     if not operator_ids:
         return
     
-    cursor = conn.cursor()
-    placeholders = ','.join(['?' for _ in operator_ids])
+    print(f"\n🔗 Exporting pay_Certifications (isApproved=1) for {len(operator_ids)} sampled operators...")
     # Filter for approved certifications
-    query = f"SELECT * FROM pay_Certifications WHERE isApproved = 1 AND OperatorID IN ({placeholders})"
-    
-    print(f"\n🔗 Exporting pay_Certifications (isApproved=1) for sampled operators...")
-    cursor.execute(query, operator_ids)
-    rows = [row_to_dict(cursor, row) for row in cursor.fetchall()]
+    count = export_by_operator_ids(conn, 'pay_Certifications', operator_ids, 'pay_Certifications.json',
+                                   where_clause="isApproved = 1", id_filter=id_filter,
+                                   batch_size=batch_size, checkpoint=checkpoint)
+    if manifest is not None:
+        manifest.record('pay_Certifications.json',
+                        "SELECT * FROM pay_Certifications WHERE isApproved = 1 "
+                        f"AND OperatorID IN (<{len(operator_ids)} operator IDs>)",
+                        count)
+    print(f"✅ Exported {count} approved certifications to pay_Certifications.json")
+
+def query_checksum(conn, query):
+    """Return (row count, CHECKSUM_AGG(BINARY_CHECKSUM(*))) of a query, computed server-side.
+
+    Only two numbers cross the wire, so this is far cheaper than pulling the
+    rows. The query must not have an ORDER BY. Returns (None, None) on
+    backends without an aggregate checksum.
+    """
+    checksum_query = dialect_for(conn).checksum_query(query)
+    if checksum_query is None:
+        return None, None
+    cursor = conn.cursor()
+    execute(cursor, checksum_query)
+    row_count, checksum = cursor.fetchone()
+    return row_count, checksum
+
+def export_reference_query(conn, query, order_by, output_filename, batch_size=BATCH_SIZE,
+                           manifest=None, force=False):
+    """Export a reference-table query, skipping it when its server checksum is unchanged.
+
+    With a manifest, the query's row count and checksum are compared with the
+    last export of output_filename; if both match and the file on disk still
+    has the recorded content hash, nothing is downloaded or rewritten. Returns
+    the number of rows exported, or None when the table was skipped.
+    """
+    row_count = checksum = None
+    if manifest is not None:
+        row_count, checksum = query_checksum(conn, query)
+        if not force and manifest.is_current(output_filename, row_count, checksum):
+            print(f"⏭️  {output_filename} unchanged ({row_count} rows, checksum {checksum}), skipped")
+            return None
     
-    output_file = os.path.join(OUTPUT_DIR, 'pay_Certifications.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(rows, f, indent=2, ensure_ascii=False)
-    print(f"✅ Exported {len(rows)} approved certifications to pay_Certifications.json")
+    cursor = conn.cursor()
+    execute(cursor, f"{query} {order_by}")
+    count = stream_query_to_file(cursor, output_filename, batch_size)
+    if manifest is not None:
+        manifest.record(output_filename, query, count, source_checksum=checksum)
+    return count
 
-def export_cert_types(conn):
+def export_cert_types(conn, batch_size=BATCH_SIZE, manifest=None, force=False):
     """Export pay_CertTypes with specific required fields."""
-    cursor = conn.cursor()
     print("\n📜 Exporting pay_CertTypes (Specific Fields)...")
     
     # Query updated to include your requested fields
@@ -150,19 +698,14 @@ def export_cert_types(conn):
             DocumentTypeID
         FROM pay_CertTypes
         WHERE (isDeleted = 0 OR isDeleted IS NULL)
-        ORDER BY DivisionID, MobileAppOrder
     """
-    cursor.execute(query)
-    rows = [row_to_dict(cursor, row) for row in cursor.fetchall()]
-    
-    output_file = os.path.join(OUTPUT_DIR, 'pay_CertTypes.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(rows, f, indent=2, ensure_ascii=False)
-    print(f"✅ Exported {len(rows)} CertTypes")
+    count = export_reference_query(conn, query, "ORDER BY DivisionID, MobileAppOrder", 'pay_CertTypes.json',
+                                   batch_size, manifest=manifest, force=force)
+    if count is not None:
+        print(f"✅ Exported {count} CertTypes")
 
-def export_pizza_statuses(conn):
+def export_pizza_statuses(conn, batch_size=BATCH_SIZE, manifest=None, force=False):
     """Export pay_PizzaStatus with specific required fields."""
-    cursor = conn.cursor()
     print("\n🍕 Exporting pay_PizzaStatus (Specific Fields)...")
     
     query = """
@@ -179,58 +722,514 @@ def export_pizza_statuses(conn):
             NounID,
             SubNounID
         FROM pay_PizzaStatus
-        ORDER BY ClientID, MobileAppOrder
     """
-    cursor.execute(query)
-    rows = [row_to_dict(cursor, row) for row in cursor.fetchall()]
-    
-    output_file = os.path.join(OUTPUT_DIR, 'pay_PizzaStatuses.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(rows, f, indent=2, ensure_ascii=False)
-    print(f"✅ Exported {len(rows)} PizzaStatuses")
+    count = export_reference_query(conn, query, "ORDER BY ClientID, MobileAppOrder", 'pay_PizzaStatuses.json',
+                                   batch_size, manifest=manifest, force=force)
+    if count is not None:
+        print(f"✅ Exported {count} PizzaStatuses")
 
-def export_table(conn, table_name, output_filename, where_clause=""):
+def export_table(conn, table_name, output_filename, where_clause="", batch_size=BATCH_SIZE,
+                 manifest=None, force=False):
     """Export a complete table to JSON."""
-    cursor = conn.cursor()
     query = f"SELECT * FROM {table_name}"
     if where_clause:
         query += f" WHERE {where_clause}"
     
     print(f"\n📋 Exporting {table_name}...")
-    cursor.execute(query)
-    rows = [row_to_dict(cursor, row) for row in cursor.fetchall()]
-    
+    count = export_reference_query(conn, query, "", output_filename, batch_size,
+                                   manifest=manifest, force=force)
+    if count is not None:
+        print(f"✅ Exported {count} records")
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ExportManifest:
+    """Record of every output file: row count, checksums, export time and source query.
+
+    Saved to MANIFEST_FILE after each recorded table, so it always describes
+    the files actually on disk. Safe to share between export threads.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or MANIFEST_FILE
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def is_current(self, output_filename, row_count, source_checksum):
+        """True if output_filename was exported from identical source data and is intact."""
+        entry = self.entries.get(output_filename)
+        output_file = os.path.join(OUTPUT_DIR, output_filename)
+        return (
+            entry is not None
+            and source_checksum is not None
+            and entry.get('source_checksum') == source_checksum
+            and entry.get('rows') == row_count
+            and os.path.exists(output_file)
+            and file_sha256(output_file) == entry.get('sha256')
+        )
+
+    def record(self, output_filename, query, row_count, source_checksum=None):
+        """Record a freshly written output file and save the manifest."""
+        output_file = os.path.join(OUTPUT_DIR, output_filename)
+        entry = {
+            'rows': row_count,
+            'bytes': os.path.getsize(output_file),
+            'sha256': file_sha256(output_file),
+            'source_checksum': source_checksum,
+            'exported_at': datetime.now(timezone.utc).isoformat(),
+            'query': ' '.join(query.split()),
+        }
+        with self._lock:
+            self.entries[output_filename] = entry
+            write_json_atomic(self.path, self.entries)
+
+class ExportCheckpoint:
+    """Progress of an export run, so an interrupted run resumes instead of starting over.
+
+    Tracks completed tables and, for chunked operator-linked tables, how many
+    ID chunks have been written to the table's temp file. Also pins the
+    watermarks captured when the run started. Saved to CHECKPOINT_FILE after
+    every update and deleted once the run completes.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or CHECKPOINT_FILE
+        self._lock = threading.Lock()
+        self.state = {'tables': [], 'chunks': {}, 'watermarks': None}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    @property
+    def resuming(self):
+        """True if a previous run left progress behind."""
+        return bool(self.state['tables'] or self.state['chunks'])
+
+    def is_done(self, table_name):
+        return table_name in self.state['tables']
+
+    def mark_done(self, table_name):
+        """Record a fully exported table."""
+        with self._lock:
+            if table_name not in self.state['tables']:
+                self.state['tables'].append(table_name)
+            self.state['chunks'].pop(table_name, None)
+            self._save()
+
+    def chunk_progress(self, table_name, fingerprint):
+        """Return the saved chunk progress for table_name, if it is for the same ID list."""
+        progress = self.state['chunks'].get(table_name)
+        if progress and progress['fingerprint'] == fingerprint:
+            return progress
+        return None
+
+    def record_chunk(self, table_name, fingerprint, chunks_done, position):
+        """Record that chunks_done ID chunks of table_name are safely on disk."""
+        with self._lock:
+            self.state['chunks'][table_name] = {'fingerprint': fingerprint, 'chunks': chunks_done, **position}
+            self._save()
+
+    def pin_watermarks(self, watermarks):
+        """Keep the watermarks of the original run across resumes; returns the pinned set."""
+        with self._lock:
+            if self.state['watermarks'] is None:
+                self.state['watermarks'] = watermarks
+                self._save()
+            return self.state['watermarks']
+
+    def clear(self):
+        """Forget all progress."""
+        with self._lock:
+            self.state = {'tables': [], 'chunks': {}, 'watermarks': None}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _save(self):
+        write_json_atomic(self.path, self.state)
+
+def load_watermarks():
+    """Load the per-table high-water marks recorded by the last successful run."""
+    if not os.path.exists(WATERMARK_FILE):
+        return {}
+    with open(WATERMARK_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_watermarks(watermarks):
+    """Persist per-table high-water marks for the next --incremental run."""
+    write_json_atomic(WATERMARK_FILE, watermarks)
+
+def query_watermark(conn, table_name):
+    """Return the latest UpdateAt/RecordAt in table_name as an ISO string (or None).
+
+    Read *before* pulling a table, so rows changed while the export runs are
+    picked up again next time rather than missed.
+    """
+    cursor = conn.cursor()
+    execute(cursor, f"SELECT MAX(UpdateAt), MAX(RecordAt) FROM {table_name}")
+    stamps = [convert_value(value) for value in cursor.fetchone() if value is not None]
+    return max(stamps) if stamps else None
+
+def watermark_params(conn, since):
+    """Bind values for CHANGED_SINCE_CLAUSE from a stored ISO watermark."""
+    since = dialect_for(conn).datetime_param(datetime.fromisoformat(since))
+    return (since, since)
+
+def merge_rows_into_file(output_filename, key, changed_rows, deleted_column=None, insert_new=True, keep=None):
+    """Merge changed rows into an existing JSON export, matching on key.
+
+    Rows whose deleted_column is truthy are removed, as are rows for which
+    ``keep(row)`` is false. With insert_new=False, rows not already present
+    in the file are ignored. The rows written, the keys removed and the
+    previous version of every row overwritten or removed are appended to the
+    change log. Returns ``(updated, inserted, removed, total)`` counts.
+    """
     output_file = os.path.join(OUTPUT_DIR, output_filename)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(rows, f, indent=2, ensure_ascii=False)
-    print(f"✅ Exported {len(rows)} records")
+    previous = file_signature(output_file)
+    changes = {str(row[key]).upper(): row for row in changed_rows}
+    updated = inserted = removed = 0
+    upserts, removed_keys, replaced = [], [], []
+    
+    with open(output_file, 'r', encoding='utf-8') as f:
+        existing = json.load(f)
+    
+    # The changed rows are pulled from the database before any row is written,
+    # so the whole merge loop is write time
+    with JsonArrayWriter(output_file) as writer, current_metrics().phase('write'):
+        for row in existing:
+            change = changes.pop(str(row.get(key)).upper(), None)
+            if ((change is not None and deleted_column and change.get(deleted_column))
+                    or (keep is not None and not keep(row if change is None else change))):
+                removed_keys.append(row.get(key))
+                replaced.append(row)
+                removed += 1
+            elif change is None:
+                writer.write(row)
+            else:
+                writer.write(change)
+                upserts.append(change)
+                replaced.append(row)
+                updated += 1
+        
+        if insert_new:
+            for row in changes.values():
+                if (deleted_column and row.get(deleted_column)) or (keep is not None and not keep(row)):
+                    continue
+                writer.write(row)
+                upserts.append(row)
+                inserted += 1
+    
+    append_change_log(output_filename, upserts, removed_keys, replaced, previous)
+    return updated, inserted, removed, writer.count
+
+def file_signature(path):
+    """``[size, mtime_ns]`` of path."""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def append_change_log(output_filename, upserts, removed_keys, replaced, previous):
+    """Record one merge in CHANGE_LOG_FILE, for consumers that maintain derived data.
 
-def main():
+    Each merge is a single JSON line: the file, the rows written, the keys
+    removed, the rows as they were before being overwritten or removed
+    (``replaced``, so a consumer can take them back out of its counts without
+    keeping its own copy), and the file's signature before and after the
+    merge. A consumer applies the entry only if it last saw the file at
+    ``previous``, and knows the file has changed without a log entry if it no
+    longer matches ``signature``.
+    """
+    entry = {'file': output_filename, 'upsert': upserts, 'remove': removed_keys, 'replaced': replaced,
+             'previous': previous, 'signature': file_signature(os.path.join(OUTPUT_DIR, output_filename))}
+    os.makedirs(os.path.dirname(CHANGE_LOG_FILE), exist_ok=True)
+    with open(CHANGE_LOG_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+def read_exported_ids(output_filename, key):
+    """Return the key values of every row in an existing export file."""
+    with open(os.path.join(OUTPUT_DIR, output_filename), 'r', encoding='utf-8') as f:
+        return [row[key] for row in json.load(f)]
+
+def sync_operators(conn, since, id_filter='auto', batch_size=BATCH_SIZE, manifest=None):
+    """Refresh the existing operator sample with rows changed since the watermark.
+
+    Only operators already in pay_Operators.json are updated (deleted ones are
+    dropped); a full run is needed to re-sample. Returns the sampled IDs, which
+    no longer include the dropped operators.
+    """
+    print(f"\n📊 Syncing sampled operators changed since {since}...")
+    operator_ids = read_exported_ids('pay_Operators.json', 'ID')
+    changed = iter_rows_by_ids(conn, 'pay_Operators', operator_ids, id_column='ID',
+                               columns=OPERATOR_COLUMNS, where_clause=CHANGED_SINCE_CLAUSE,
+                               params=watermark_params(conn, since), id_filter=id_filter, batch_size=batch_size)
+    updated, inserted, removed, total = merge_rows_into_file('pay_Operators.json', 'ID', changed,
+                                                             deleted_column='IsDeleted', insert_new=False)
+    if manifest is not None:
+        manifest.record('pay_Operators.json',
+                        f"MERGE pay_Operators WHERE {CHANGED_SINCE_CLAUSE} (since {since})", total)
+    print(f"✅ pay_Operators.json: {updated} updated, {removed} removed")
+    return read_exported_ids('pay_Operators.json', 'ID')
+
+def sync_related_data(conn, table_name, operator_ids, output_filename, since, key='ID',
+                      id_filter='auto', batch_size=BATCH_SIZE, manifest=None):
+    """Merge rows of an OperatorID-linked table changed since the watermark.
+
+    Changed rows are fetched both by OperatorID (rows of sampled operators)
+    and by key for the rows already in the file, so a row moved to another
+    operator is seen too. Rows whose operator is not in operator_ids (moved
+    out of the sample, or dropped by sync_operators) are removed, so the file
+    never references an operator that is not exported.
+    """
+    print(f"\n🔗 Syncing {table_name} changes since {since}...")
+    sampled = {str(operator_id).upper() for operator_id in operator_ids}
+    params = watermark_params(conn, since)
+    changed = chain(
+        iter_rows_by_ids(conn, table_name, operator_ids, where_clause=CHANGED_SINCE_CLAUSE, params=params,
+                         id_filter=id_filter, batch_size=batch_size),
+        iter_rows_by_ids(conn, table_name, read_exported_ids(output_filename, key), id_column=key,
+                         where_clause=CHANGED_SINCE_CLAUSE, params=params, id_filter=id_filter,
+                         batch_size=batch_size))
+    updated, inserted, removed, total = merge_rows_into_file(
+        output_filename, key, changed, keep=lambda row: str(row.get('OperatorID')).upper() in sampled)
+    if manifest is not None:
+        manifest.record(output_filename, f"MERGE {table_name} WHERE {CHANGED_SINCE_CLAUSE} (since {since}) "
+                        f"AND (OperatorID IN (<{len(operator_ids)} operator IDs>) OR {key} IN (<exported>))",
+                        total)
+    print(f"✅ {output_filename}: {updated} updated, {inserted} inserted, {removed} removed")
+
+def sync_table(conn, table_name, output_filename, since, key, deleted_column=None,
+               batch_size=BATCH_SIZE, manifest=None):
+    """Merge every row of table_name changed since the watermark into its export."""
+    print(f"\n📋 Syncing {table_name} changes since {since}...")
+    cursor = conn.cursor()
+    execute(cursor, f"SELECT * FROM {table_name} WHERE {CHANGED_SINCE_CLAUSE}", watermark_params(conn, since))
+    changed = (record for records in fetch_record_batches(cursor, batch_size) for record in records)
+    updated, inserted, removed, total = merge_rows_into_file(output_filename, key, changed,
+                                                             deleted_column=deleted_column)
+    if manifest is not None:
+        manifest.record(output_filename, f"MERGE {table_name} WHERE {CHANGED_SINCE_CLAUSE} (since {since})",
+                        total)
+    print(f"✅ {output_filename}: {updated} updated, {inserted} inserted, {removed} removed")
+
+class ConnectionPool:
+    """A bounded pool of database connections shared by export worker threads.
+
+    Connections are opened lazily, at most ``size`` are ever open, and each is
+    used by one thread at a time.
+    """
+
+    def __init__(self, size, connect=connect_to_database):
+        self._connect = connect
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._opened = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with-block."""
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+                with self._lock:
+                    self._opened.append(conn)
+            try:
+                yield conn
+            finally:
+                self._idle.put(conn)
+
+    def close(self):
+        """Close every connection the pool has opened."""
+        with self._lock:
+            for conn in self._opened:
+                conn.close()
+            self._opened.clear()
+
+def run_with_connection(pool, task, *args, **kwargs):
+    """Run task(conn, *args, **kwargs) on a connection borrowed from pool."""
+    with pool.connection() as conn:
+        return task(conn, *args, **kwargs)
+
+def wait_for_tasks(futures, until=None):
+    """Wait on {future: table_name}; on the first failure cancel the rest and re-raise.
+
+    With ``until``, return as soon as that future has finished successfully.
+    """
+    pending = set(futures)
+    while pending and not (until is not None and until.done()):
+        return_when = FIRST_COMPLETED if until is not None else FIRST_EXCEPTION
+        done, pending = wait(pending, return_when=return_when)
+        for future in done:
+            if not future.cancelled() and future.exception() is not None:
+                for other in futures:
+                    other.cancel()
+                raise RuntimeError(f"{futures[future]} export failed: {future.exception()}") \
+                    from future.exception()
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Export the Orion SQL database to App_Data JSON files.")
+    parser.add_argument('--sqlite', metavar='PATH',
+                        help="Export from a local SQLite stand-in database instead of SQL Server")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR,
+                        help="Directory the JSON files are written to (default: the web app's App_Data)")
+    parser.add_argument('--state-dir', default=STATE_DIR,
+                        help="Directory for watermarks, manifest, checkpoint and metrics")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f"Rows fetched per round-trip and held in memory at once (default: {BATCH_SIZE})")
+    parser.add_argument('--max-per-division-status', type=int, default=10,
+                        help="Operators sampled per (DivisionID, Status) combination (default: 10)")
+    parser.add_argument('--sampling', choices=sorted(SAMPLING_STRATEGIES), default='recent',
+                        help="Which operators to keep in each combination (default: recent)")
+    parser.add_argument('--id-filter', choices=['auto', 'chunks', 'temp-table'], default='auto',
+                        help="How operator IDs are passed to SQL for child tables (default: auto)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Merge rows changed since the last run instead of re-exporting")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-export reference tables even if their checksum is unchanged")
+    parser.add_argument('--restart', action='store_true',
+                        help="Discard the checkpoint of an interrupted run and start over")
+    parser.add_argument('--metrics-file',
+                        help="Where to write per-table timings and volumes as JSON "
+                             "(default: export_state/metrics.json)")
+    parser.add_argument('--summary', action='store_true',
+                        help="Print a per-table timing summary at the end")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Tables exported concurrently, one connection each (default: 1)")
+    parser.add_argument('--check-integrity', action='store_true',
+                        help="Check foreign keys across the exported files; exit 1 if any dangle")
+    profiling.add_arguments(parser)
+    return parser.parse_args(argv)
+
+def configure_paths(output_dir, state_dir):
+    """Point the exporter at a different output and/or state directory."""
+    global OUTPUT_DIR, STATE_DIR, WATERMARK_FILE, MANIFEST_FILE, CHECKPOINT_FILE
+    global METRICS_FILE, METRICS_HISTORY_FILE, CHANGE_LOG_FILE
+    OUTPUT_DIR = output_dir
+    STATE_DIR = state_dir
+    WATERMARK_FILE = os.path.join(STATE_DIR, 'watermarks.json')
+    MANIFEST_FILE = os.path.join(STATE_DIR, 'manifest.json')
+    CHECKPOINT_FILE = os.path.join(STATE_DIR, 'checkpoint.json')
+    METRICS_FILE = os.path.join(STATE_DIR, 'metrics.json')
+    METRICS_HISTORY_FILE = os.path.join(STATE_DIR, 'metrics_history.jsonl')
+    CHANGE_LOG_FILE = os.path.join(STATE_DIR, 'changes.jsonl')
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_paths(args.output_dir, args.state_dir)
+    metrics_file = args.metrics_file or METRICS_FILE
+    profiling.start(args, 'export_database_to_json', metrics_file)
+    batch_size = args.batch_size
+    id_filter = args.id_filter
+    
     print("=" * 60)
     print("SQL Database to JSON Export")
     print("=" * 60)
     
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    conn = connect_to_database()
+    pool = ConnectionPool(max(1, args.workers), connect=lambda: connect_to_database(args.sqlite))
+    manifest = ExportManifest()
+    checkpoint = ExportCheckpoint()
+    metrics = ExportMetrics()
+    if args.restart:
+        checkpoint.clear()
+    elif checkpoint.resuming:
+        print(f"♻️  Resuming interrupted export ({len(checkpoint.state['tables'])} tables already done)")
     
     try:
-        # 1. Export Operators (Sampled)
-        operator_ids = export_operators(conn, max_per_division_status=10)
-        
-        # 2. Export Related Child Data
-        export_certifications(conn, operator_ids)
-        # export_related_data(conn, 'pay_Certifications', operator_ids, 'pay_Certifications.json')
-        export_related_data(conn, 'pay_StatusTracker', operator_ids, 'pay_StatusTracker.json')
+        previous_marks = load_watermarks() if args.incremental else {}
+        since = {
+            table: previous_marks[table]
+            for table, output_filename in INCREMENTAL_TABLES.items()
+            if previous_marks.get(table) and os.path.exists(os.path.join(OUTPUT_DIR, output_filename))
+        }
+        # Captured before any rows are pulled (by the original run when resuming);
+        # saved only once the run succeeds
+        watermarks = checkpoint.state['watermarks']
+        if watermarks is None:
+            with pool.connection() as conn:
+                watermarks = checkpoint.pin_watermarks(
+                    {table: query_watermark(conn, table) for table in INCREMENTAL_TABLES})
         
-        # 3. Export Reference Tables
-        # Updated CertTypes function with your specific fields
-        export_cert_types(conn)
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            def run_table(table_name, task, *task_args, **task_kwargs):
+                with profiling.thread(), metrics.track(table_name):
+                    result = run_with_connection(pool, task, *task_args, **task_kwargs)
+                checkpoint.mark_done(table_name)
+                return result
+            
+            def submit(table_name, task, *task_args, **task_kwargs):
+                if checkpoint.is_done(table_name):
+                    print(f"\n⏭️  {table_name} already exported before the interruption, skipped")
+                    return None
+                future = executor.submit(run_table, table_name, task, *task_args, **task_kwargs)
+                futures[future] = table_name
+                return future
+            
+            futures = {}
+            
+            # 1. Export Operators (Sampled)
+            if 'pay_Operators' in since:
+                operators = submit('pay_Operators', sync_operators, since['pay_Operators'],
+                                   id_filter=id_filter, batch_size=batch_size, manifest=manifest)
+            else:
+                operators = submit('pay_Operators', export_operators,
+                                   max_per_division_status=args.max_per_division_status,
+                                   sampling=args.sampling, batch_size=batch_size, manifest=manifest)
+            
+            # 2. Export Reference Tables (independent of the operator sample)
+            # Updated CertTypes function with your specific fields
+            submit('pay_CertTypes', export_cert_types, batch_size=batch_size, manifest=manifest,
+                   force=args.force)
+            
+            if 'pay_StatusTypes' in since:
+                submit('pay_StatusTypes', sync_table, 'pay_StatusTypes', 'pay_StatusTypes.json',
+                       since['pay_StatusTypes'], key='Id', deleted_column='isDeleted',
+                       batch_size=batch_size, manifest=manifest)
+            else:
+                submit('pay_StatusTypes', export_table, 'pay_StatusTypes', 'pay_StatusTypes.json',
+                       "(isDeleted = 0 OR isDeleted IS NULL)", batch_size=batch_size,
+                       manifest=manifest, force=args.force)
+            
+            submit('pay_PizzaStatus', export_pizza_statuses, batch_size=batch_size, manifest=manifest,
+                   force=args.force)
+            submit('pay_Clients', export_table, 'pay_Clients', 'pay_Clients.json', batch_size=batch_size,
+                   manifest=manifest, force=args.force)
+            
+            # 3. Export Related Child Data once operator_ids is known
+            if operators is None:
+                operator_ids = read_exported_ids('pay_Operators.json', 'ID')
+            else:
+                wait_for_tasks(futures, until=operators)
+                operator_ids = operators.result()
+            
+            submit('pay_Certifications', export_certifications, operator_ids,
+                   id_filter=id_filter, batch_size=batch_size, manifest=manifest,
+                   checkpoint=checkpoint)
+            # export_related_data(conn, 'pay_Certifications', operator_ids, 'pay_Certifications.json')
+            # A re-sampled operator set invalidates the tracker file, so only sync it alongside operators
+            if 'pay_Operators' in since and 'pay_StatusTracker' in since:
+                submit('pay_StatusTracker', sync_related_data, 'pay_StatusTracker', operator_ids,
+                       'pay_StatusTracker.json', since['pay_StatusTracker'], id_filter=id_filter,
+                       batch_size=batch_size, manifest=manifest)
+            else:
+                submit('pay_StatusTracker', export_related_data, 'pay_StatusTracker', operator_ids,
+                       'pay_StatusTracker.json', id_filter=id_filter, batch_size=batch_size,
+                       manifest=manifest, checkpoint=checkpoint)
+            
+            wait_for_tasks(futures)
         
-        export_table(conn, 'pay_StatusTypes', 'pay_StatusTypes.json', 
-                     "(isDeleted = 0 OR isDeleted IS NULL)")
-        
-        export_pizza_statuses(conn)
-        export_table(conn, 'pay_Clients', 'pay_Clients.json')
+        save_watermarks(watermarks)
+        checkpoint.clear()
         
         print("\n" + "=" * 60)
         print("✅ Export completed successfully!")
@@ -238,9 +1237,20 @@ def main():
         
     except Exception as e:
         print(f"\n❌ Error during export: {e}")
+        print("   Completed tables are checkpointed; re-run to resume (--restart to start over).")
         raise
     finally:
-        conn.close()
+        pool.close()
+        metrics.write(metrics_file, METRICS_HISTORY_FILE)
+        for table_metrics in metrics.tables.values():
+            for name, seconds in table_metrics.seconds.items():
+                profiling.add_time(name, seconds)
+        if args.summary:
+            metrics.print_summary()
+        print(f"📈 Metrics written to {metrics_file}")
+    
+    if args.check_integrity and not run_integrity_check(OUTPUT_DIR):
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,21 +1,42 @@
-import json
-import os
+"""
+Find Contracting Statuses
+=========================
+Lists the StatusTypes of a division whose Status contains a text
+(case-insensitive). A thin wrapper over query_app_data.select().
 
-json_path = os.path.join(os.path.dirname(__file__), '..', 'OrionOperatorLifecycleWebApp', 'App_Data', 'pay_StatusTypes.json')
+Usage:
+    python find_contracting_status.py [--division "10 - OR"] [--text contracting] [--profile] [--trace-memory]
+"""
 
-with open(json_path, 'r', encoding='utf-8') as f:
-    status_types = json.load(f)
+import argparse
 
-# Find statuses containing "CONTRACTING" or "Contracting" for division 10 - OR
-results = [st for st in status_types if st.get('DivisionID') == '10 - OR' and 'contracting' in st.get('Status', '').lower()]
+import profiling
+from app_data import AppData
+from query_app_data import select
 
-print(f"\n📊 StatusTypes for '10 - OR' with 'Contracting' in Status:\n")
-print(f"=" * 100)
+def main():
+    parser = argparse.ArgumentParser(description="Find StatusTypes by division and status text.")
+    parser.add_argument('--division', default='10 - OR')
+    parser.add_argument('--text', default='contracting')
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'find_contracting_status')
 
-for st in results:
-    print(f"\nStatus: {st.get('Status', 'N/A')}")
-    print(f"  ID: {st.get('Id', st.get('ID', 'N/A'))}")
-    print(f"  PizzaStatusID: {st.get('PizzaStatusID', 'N/A')}")
-    print(f"  DivisionID: {st.get('DivisionID', 'N/A')}")
-    print(f"  OrderID: {st.get('OrderID', 'N/A')}")
-    print(f"  isDeleted: {st.get('isDeleted', 'N/A')}")
+    # Find statuses containing the text (any case) for the division
+    with profiling.phase('compute'):
+        results, _ = select(AppData(), 'status_types', where={'DivisionID': args.division},
+                            contains={'Status': args.text})
+
+    print(f"\n📊 StatusTypes for '{args.division}' with '{args.text.capitalize()}' in Status:\n")
+    print(f"=" * 100)
+
+    for st in results:
+        print(f"\nStatus: {st.get('Status', 'N/A')}")
+        print(f"  ID: {st.get('Id', st.get('ID', 'N/A'))}")
+        print(f"  PizzaStatusID: {st.get('PizzaStatusID', 'N/A')}")
+        print(f"  DivisionID: {st.get('DivisionID', 'N/A')}")
+        print(f"  OrderID: {st.get('OrderID', 'N/A')}")
+        print(f"  isDeleted: {st.get('isDeleted', 'N/A')}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Synthetic App_Data Generator
+============================
+Writes a complete App_Data directory at a multiple of the current volume,
+so the analysis scripts can be run against 10x or 1000x today's data (see
+benchmark_analysis.py).
+
+- pay_StatusTypes, pay_CertTypes, pay_PizzaStatuses and pay_Clients are
+  copied unchanged. They are configuration, and their size does not grow
+  with the number of operators. ``--reference-scale N`` adds N - 1 copies of
+  every client, each with its own copies of the client's PizzaStatuses and of
+  the StatusTypes and CertTypes that reference them. All copies get new
+  GUIDs and have their foreign keys remapped.
+- pay_Operators gets ``scale`` times as many operators. Each one is cloned
+  from a randomly chosen source operator, with a fresh GUID, name, email
+  and phone number. Division, status, StatusID, deletion flag and dates
+  therefore follow the joint distribution of the source file.
+- pay_StatusTracker gives every generated operator a copy of its source
+  operator's history (new row GUIDs, same statuses and dates). The number of
+  events per operator follows the source distribution too.
+- pay_Certifications copies the source operator's certifications when the
+  source has the file. Otherwise each operator gets 0 to
+  2 x ``--certs-per-operator`` certs, picked from the non-deleted CertTypes
+  of its division (or with no division), 70% approved.
+
+Files are written in the exporter's format (JsonArrayWriter) one record at a
+time, so memory does not grow with the scale. Generation is seeded, so the
+same arguments always produce the same files.
+
+Usage:
+    python generate_app_data.py OUTPUT_DIR [--scale 10] [--certs-per-operator 5]
+        [--reference-scale 1] [--seed 42] [--source DIR]
+"""
+
+import argparse
+import os
+import shutil
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from app_data import APP_DATA_DIR, AppData
+from build_sqlite_standin import FIRST_NAMES, LAST_NAMES, Generator
+from export_database_to_json import JsonArrayWriter
+
+REFERENCE_FILES = ('pay_StatusTypes.json', 'pay_CertTypes.json', 'pay_PizzaStatuses.json', 'pay_Clients.json')
+
+OPERATORS = 'pay_Operators.json'
+STATUS_TRACKER = 'pay_StatusTracker.json'
+CERTIFICATIONS = 'pay_Certifications.json'
+
+# Share of synthesized certifications that are approved
+APPROVED_RATE = 0.7
+
+def reference_copies(source, copies, gen):
+    """{filename: records} for the reference tables with copies - 1 remapped clones of each client."""
+    tables = {filename: list(source.table(filename)) for filename in REFERENCE_FILES}
+    originals = {filename: list(records) for filename, records in tables.items()}
+    for copy in range(1, copies):
+        client_ids, pizza_ids = {}, {}
+        for client in originals['pay_Clients.json']:
+            client_ids[client.get('ID')] = gen.guid()
+            tables['pay_Clients.json'].append(dict(client, ID=client_ids[client.get('ID')],
+                                                   Description=f"{client.get('Description')} #{copy}"))
+        for pizza_status in originals['pay_PizzaStatuses.json']:
+            pizza_ids[pizza_status.get('ID')] = gen.guid()
+            client_id = pizza_status.get('ClientID')
+            tables['pay_PizzaStatuses.json'].append(dict(pizza_status, ID=pizza_ids[pizza_status.get('ID')],
+                                                         ClientID=client_ids.get(client_id, client_id)))
+        for status_type in originals['pay_StatusTypes.json']:
+            if status_type.get('PizzaStatusID') in pizza_ids:
+                tables['pay_StatusTypes.json'].append(dict(status_type, Id=gen.guid(),
+                                                           PizzaStatusID=pizza_ids[status_type['PizzaStatusID']]))
+        for cert_type in originals['pay_CertTypes.json']:
+            if cert_type.get('PizzaStatusID') in pizza_ids:
+                tables['pay_CertTypes.json'].append(dict(cert_type, ID=gen.guid(),
+                                                         PizzaStatusID=pizza_ids[cert_type['PizzaStatusID']]))
+    return tables
+
+def cert_type_pool(cert_types):
+    """{DivisionID: [CertType, ...]} of non-deleted CertTypes, each division including the division-less ones."""
+    shared, by_division = [], defaultdict(list)
+    for cert_type in cert_types:
+        if cert_type.get('isDeleted'):
+            continue
+        if cert_type.get('DivisionID'):
+            by_division[cert_type['DivisionID']].append(cert_type)
+        else:
+            shared.append(cert_type)
+    return defaultdict(lambda: shared, {division: types + shared for division, types in by_division.items()})
+
+def synthesize_certifications(gen, operator, pool, certs_per_operator):
+    """Certification records for one generated operator."""
+    cert_types = pool[operator.get('DivisionID')]
+    count = min(gen.random.randint(0, 2 * certs_per_operator), len(cert_types))
+    after = datetime.fromisoformat(operator['RecordAt']) if operator.get('RecordAt') else None
+    certifications = []
+    for cert_type in gen.random.sample(cert_types, count):
+        cert_date = gen.timestamp(after=after, max_days=60).isoformat()
+        certifications.append({
+            'CertificationID': gen.guid(), 'Cert': cert_type.get('Certification'),
+            'isApproved': int(gen.random.random() < APPROVED_RATE), 'IsDeleted': 0,
+            'DivisionID': operator.get('DivisionID'), 'CertTypeID': cert_type.get('ID'),
+            'OperatorID': operator['ID'], 'Date': cert_date, 'RecordAt': cert_date, 'UpdateAt': None,
+        })
+    return certifications
+
+def generate(output_dir, scale, certs_per_operator=5, seed=42, source_dir=APP_DATA_DIR, reference_scale=1):
+    """Write a generated App_Data to output_dir. Returns {filename: records written}."""
+    if os.path.isdir(output_dir) and os.path.samefile(output_dir, source_dir):
+        raise ValueError("Refusing to overwrite the source App_Data")
+    source = AppData(source_dir, cache_dir=None)
+    gen = Generator(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    counts = {}
+
+    if reference_scale > 1:
+        for filename, records in reference_copies(source, reference_scale, gen).items():
+            with JsonArrayWriter(os.path.join(output_dir, filename)) as writer:
+                for record in records:
+                    writer.write(record)
+            counts[filename] = writer.count
+    else:
+        for filename in REFERENCE_FILES:
+            shutil.copyfile(source.path(filename), os.path.join(output_dir, filename))
+            counts[filename] = len(source.table(filename))
+
+    templates = list(source.operators)
+    history = source.status_tracker.index('OperatorID') if source.has(STATUS_TRACKER) else {}
+    source_certs = source.certifications.index('OperatorID') if source.has(CERTIFICATIONS) else None
+    pool = cert_type_pool(source.cert_types)
+    target = max(1, round(len(templates) * scale))
+
+    with JsonArrayWriter(os.path.join(output_dir, OPERATORS)) as operators, \
+            JsonArrayWriter(os.path.join(output_dir, STATUS_TRACKER)) as tracker, \
+            JsonArrayWriter(os.path.join(output_dir, CERTIFICATIONS)) as certifications:
+        for i in range(target):
+            template = gen.random.choice(templates)
+            first, last = gen.random.choice(FIRST_NAMES), gen.random.choice(LAST_NAMES)
+            operator = dict(template, ID=gen.guid(), FirstName=first, LastName=last,
+                            Email=f"{first}.{last}{i}@example.com".lower(),
+                            Mobile=f"(555) {i // 10000 % 1000:03d}-{i % 10000:04d}")
+            operators.write(operator)
+            for event in history.get(template.get('ID'), ()):
+                tracker.write(dict(event, ID=gen.guid(), OperatorID=operator['ID']))
+            if source_certs is not None:
+                for cert in source_certs.get(template.get('ID'), ()):
+                    key = 'CertificationID' if 'CertificationID' in cert else 'ID'
+                    certifications.write({**cert, key: gen.guid(), 'OperatorID': operator['ID']})
+            else:
+                for cert in synthesize_certifications(gen, operator, pool, certs_per_operator):
+                    certifications.write(cert)
+        counts[OPERATORS], counts[STATUS_TRACKER], counts[CERTIFICATIONS] = \
+            operators.count, tracker.count, certifications.count
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic App_Data at a multiple of the current volume.")
+    parser.add_argument('output_dir', help="Directory to write the App_Data files to")
+    parser.add_argument('--scale', type=float, default=10, help="Operators relative to the source (default: 10)")
+    parser.add_argument('--certs-per-operator', type=int, default=5,
+                        help="Mean certifications per operator when the source has none (default: 5)")
+    parser.add_argument('--reference-scale', type=int, default=1,
+                        help="Copies of each client and its statuses and cert types (default: 1, unchanged)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--source', default=APP_DATA_DIR, help="App_Data the distributions are taken from")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    print(f"🏗️  Generating {args.scale:g}x App_Data from {args.source}")
+    counts = generate(args.output_dir, args.scale, args.certs_per_operator, args.seed, args.source,
+                      args.reference_scale)
+    for filename, count in counts.items():
+        size_mb = os.path.getsize(os.path.join(args.output_dir, filename)) / (1024 * 1024)
+        print(f"   {filename:<26} {count:>12,} records {size_mb:>10,.1f} MB")
+    print(f"✅ Wrote {args.output_dir} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == '__main__':
+    main()
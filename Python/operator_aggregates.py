@@ -0,0 +1,335 @@
+"""
+Operator Aggregates
+===================
+A persistent store of the counts behind analyze_operators.py, kept up to
+date by applying changes rather than recounting every file:
+
+- operators per division, per status and per (division, status)
+- certifications per operator and per Cert name
+- status tracker records per operator
+
+Only the counters are kept, in one marshal file in the App_Data cache
+directory, so the store's size follows the number of operators, not the
+number of records. A change log entry carries the previous version of each
+row it overwrites or removes (``replaced``), and that is what is taken back
+out of the counts. A refresh therefore costs time in proportion to the
+change rather than to the dataset.
+
+refresh() brings the store up to date:
+
+1. Entries the exporter has appended to its change log
+   (export_state/changes.jsonl, written by ``--incremental`` runs) since the
+   last refresh are applied as deltas. An entry is only applied if the
+   store last saw the file in the state the merge started from.
+2. Any table whose file no longer matches the size/mtime the store last saw
+   (a full export, a hand edit) is recounted from its file, on its own.
+
+``--verify`` recounts every table from scratch afterwards and exits with
+status 1 if any counter differs from the refreshed store.
+
+Usage:
+    python operator_aggregates.py [--rebuild] [--verify] [--change-log PATH] [--app-data DIR]
+        [--profile] [--trace-memory]
+"""
+
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import sys
+import time
+from collections import Counter
+
+import profiling
+from app_data import APP_DATA_DIR, CACHE_DIR, SCRIPT_DIR, AppData, ndjson_name
+
+# Change log written by export_database_to_json.py --incremental
+CHANGE_LOG = os.path.join(SCRIPT_DIR, 'export_state', 'changes.jsonl')
+
+# Bump when the stored layout changes
+AGGREGATES_VERSION = 2
+
+OPERATORS = 'pay_Operators.json'
+CERTIFICATIONS = 'pay_Certifications.json'
+STATUS_TRACKER = 'pay_StatusTracker.json'
+TABLES = (OPERATORS, CERTIFICATIONS, STATUS_TRACKER)
+
+def operator_fields(record):
+    return (record.get('DivisionID') or 'Unknown', record.get('Status') or 'None')
+
+def certification_fields(record):
+    return (record.get('OperatorID'), record.get('Cert') or 'Unknown')
+
+def tracker_fields(record):
+    return record.get('OperatorID')
+
+# What is counted per record, i.e. what has to be un-counted when it changes
+FIELDS = {OPERATORS: operator_fields, CERTIFICATIONS: certification_fields, STATUS_TRACKER: tracker_fields}
+
+# The key the exporter merges each table on
+KEYS = {OPERATORS: 'ID', CERTIFICATIONS: 'CertificationID', STATUS_TRACKER: 'ID'}
+
+COUNTERS = ('by_division', 'by_status', 'by_division_status', 'certs_by_operator', 'cert_types',
+            'tracker_by_operator')
+
+# Counters with an entry per operator are plain dicts, so loading them does not copy them into a Counter
+PER_OPERATOR = ('certs_by_operator', 'tracker_by_operator')
+
+def normalize_key(value):
+    return str(value).upper() if value is not None else None
+
+def adjust(counter, key, amount):
+    """Add amount to counter[key], dropping keys that reach zero."""
+    value = counter.get(key, 0) + amount
+    if value:
+        counter[key] = value
+    else:
+        del counter[key]
+
+class OperatorAggregates:
+    """Counts over pay_Operators, pay_Certifications and pay_StatusTracker."""
+
+    def __init__(self, app_data_dir=APP_DATA_DIR, cache_dir=CACHE_DIR):
+        self.store = AppData(app_data_dir, cache_dir)
+        self.cache_dir = cache_dir
+        self.by_division = Counter()
+        self.by_status = Counter()
+        self.by_division_status = Counter()       # (division, status) -> operators
+        self.certs_by_operator = {}
+        self.cert_types = Counter()
+        self.tracker_by_operator = {}
+        self.tracker_records = 0
+        # Per table: the [size, mtime_ns] of the file the counts reflect
+        self.sources = {}
+        self.change_log = None
+        self.change_log_offset = 0
+        self._dirty = True      # Not saved since the last change (an opened store is clean)
+
+    @property
+    def operator_count(self):
+        return sum(self.by_division.values())
+
+    @property
+    def certification_count(self):
+        return sum(self.cert_types.values())
+
+    # --- Persistence ------------------------------------------------------
+
+    def _path(self, suffix):
+        digest = hashlib.sha1(os.path.abspath(self.store.app_data_dir).encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f"operator_aggregates.{digest}{suffix}.marshal")
+
+    def _key(self):
+        return (AGGREGATES_VERSION, sys.implementation.cache_tag, os.path.abspath(self.store.app_data_dir))
+
+    @classmethod
+    def open(cls, app_data_dir=APP_DATA_DIR, cache_dir=CACHE_DIR):
+        """The saved store for app_data_dir, or an empty one (every table is then counted on refresh)."""
+        aggregates = cls(app_data_dir, cache_dir)
+        if cache_dir is None:
+            return aggregates
+        try:
+            with open(aggregates._path(''), 'rb') as f:
+                key, state = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return aggregates
+        if key != aggregates._key():
+            return aggregates
+        try:
+            counters = {name: state[name] if name in PER_OPERATOR else Counter(state[name]) for name in COUNTERS}
+            change_log, change_log_offset = state['change_log']
+            tracker_records, sources = state['tracker_records'], state['sources']
+        except (KeyError, TypeError, ValueError):
+            return aggregates
+        for name, counter in counters.items():
+            setattr(aggregates, name, counter)
+        aggregates.tracker_records = tracker_records
+        aggregates.sources = sources
+        aggregates.change_log, aggregates.change_log_offset = change_log, change_log_offset
+        aggregates._dirty = False
+        return aggregates
+
+    def save(self):
+        """Write the counters if they changed (no-op without a cache directory)."""
+        if self.cache_dir is None or not self._dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Operator IDs key two counters; shared strings are written (and loaded) once
+        memo = {}
+        state = {name: {memo.setdefault(key, key): value for key, value in getattr(self, name).items()}
+                 for name in COUNTERS}
+        state.update(tracker_records=self.tracker_records, sources=self.sources,
+                     change_log=(self.change_log, self.change_log_offset))
+        self._write(self._path(''), (self._key(), state))
+        # Per-record maps written by version 1
+        for filename in TABLES:
+            if os.path.exists(self._path('.' + filename)):
+                os.remove(self._path('.' + filename))
+        self._dirty = False
+
+    @staticmethod
+    def _write(path, data):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            marshal.dump(data, f)
+        os.replace(temp_path, path)
+
+    # --- Counting ---------------------------------------------------------
+
+    def _count(self, filename, fields, amount):
+        if filename == OPERATORS:
+            division, status = fields
+            adjust(self.by_division, division, amount)
+            adjust(self.by_status, status, amount)
+            adjust(self.by_division_status, fields, amount)
+        elif filename == CERTIFICATIONS:
+            operator_id, cert = fields
+            if operator_id:
+                adjust(self.certs_by_operator, operator_id, amount)
+            adjust(self.cert_types, cert, amount)
+        else:
+            self.tracker_records += amount
+            if fields:
+                adjust(self.tracker_by_operator, fields, amount)
+
+    def _reset(self, filename):
+        if filename == OPERATORS:
+            self.by_division, self.by_status, self.by_division_status = Counter(), Counter(), Counter()
+        elif filename == CERTIFICATIONS:
+            self.certs_by_operator, self.cert_types = {}, Counter()
+        else:
+            self.tracker_by_operator, self.tracker_records = {}, 0
+
+    def signature(self, filename):
+        """[size, mtime_ns] of the table's file (or its NDJSON variant), None if there is neither."""
+        for path in (self.store.path(filename), self.store.path(ndjson_name(filename))):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                return [stat.st_size, stat.st_mtime_ns]
+        return None
+
+    def rebuild(self, filename):
+        """Recount one table from its file."""
+        self._reset(filename)
+        fields_of = FIELDS[filename]
+        signature = self.signature(filename)
+        if signature is not None:
+            for record in self.store.stream(filename):
+                self._count(filename, fields_of(record), 1)
+        self.sources[filename] = signature
+        self._dirty = True
+
+    def apply(self, filename, upserts=(), removes=(), replaced=None):
+        """Apply a delta to one table: records added or changed, IDs removed, and the
+        previous version of every changed or removed record.
+
+        Returns False (and changes nothing) if the delta cannot be applied exactly:
+        there is no ``replaced`` list (a log written before it existed), or it does
+        not hold exactly the previous versions of the removed and changed records.
+        """
+        if replaced is None:
+            return False
+        key_field, fields_of = KEYS[filename], FIELDS[filename]
+        previous = {normalize_key(record.get(key_field)): record for record in replaced}
+        if None in previous or len(previous) != len(replaced):
+            return False
+        removed = {normalize_key(key) for key in removes}
+        changed = {normalize_key(record.get(key_field)) for record in upserts} & previous.keys()
+        if not removed <= previous.keys() or removed | changed != previous.keys():
+            return False
+        for record in replaced:
+            self._count(filename, fields_of(record), -1)
+        for record in upserts:
+            self._count(filename, fields_of(record), 1)
+        self._dirty = True
+        return True
+
+    def verify(self):
+        """Names of the counters that differ from a recount of every table from scratch."""
+        fresh = OperatorAggregates(self.store.app_data_dir, cache_dir=None)
+        for filename in TABLES:
+            fresh.rebuild(filename)
+        return [name for name in COUNTERS + ('tracker_records',) if getattr(self, name) != getattr(fresh, name)]
+
+    def refresh(self, change_log=CHANGE_LOG):
+        """Bring the counts up to date with App_Data. Returns (change log entries applied, tables recounted)."""
+        stale = set()
+        change_log = os.path.abspath(change_log) if change_log else None
+        log_size = os.path.getsize(change_log) if change_log and os.path.exists(change_log) else 0
+        if change_log != self.change_log or log_size < self.change_log_offset:
+            # A different or replaced log: our offset means nothing in it, so recount
+            if self.sources:
+                stale.update(TABLES)
+            self.change_log, self.change_log_offset = change_log, log_size
+            self._dirty = True
+
+        applied = 0
+        if log_size > self.change_log_offset:
+            with open(change_log, 'rb') as f:
+                f.seek(self.change_log_offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Still being written
+                    self.change_log_offset += len(line)
+                    self._dirty = True
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        stale.update(TABLES)
+                        continue
+                    filename = entry.get('file')
+                    if filename not in FIELDS or filename in stale:
+                        continue
+                    if (self.sources.get(filename) is None or entry.get('previous') != self.sources[filename]
+                            or not self.apply(filename, entry.get('upsert', ()), entry.get('remove', ()),
+                                              entry.get('replaced'))):
+                        stale.add(filename)
+                        continue
+                    self.sources[filename] = entry.get('signature')
+                    applied += 1
+
+        rebuilt = [filename for filename in TABLES
+                   if filename in stale or self.sources.get(filename) != self.signature(filename)]
+        for filename in rebuilt:
+            self.rebuild(filename)
+        return applied, rebuilt
+
+def load(app_data_dir=APP_DATA_DIR, cache_dir=CACHE_DIR, change_log=CHANGE_LOG, rebuild=False):
+    """Open, refresh and save the aggregates for app_data_dir. Returns (aggregates, applied, rebuilt)."""
+    aggregates = OperatorAggregates(app_data_dir, cache_dir) if rebuild \
+        else OperatorAggregates.open(app_data_dir, cache_dir)
+    applied, rebuilt = aggregates.refresh(change_log)
+    aggregates.save()
+    return aggregates, applied, rebuilt
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the stored operator aggregates.")
+    parser.add_argument('--rebuild', action='store_true', help="Recount every table from scratch")
+    parser.add_argument('--verify', action='store_true',
+                        help="Check the refreshed counts against a full recount; exit 1 if they differ")
+    parser.add_argument('--change-log', default=CHANGE_LOG, help="Exporter change log to apply")
+    parser.add_argument('--app-data', default=APP_DATA_DIR, help="App_Data directory to read")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'operator_aggregates')
+
+    if CACHE_DIR is None:
+        print("⚠️  Cache is disabled (ORION_APP_DATA_CACHE); aggregates are not saved")
+    started = time.perf_counter()
+    with profiling.phase('compute'):
+        aggregates, applied, rebuilt = load(args.app_data, change_log=args.change_log, rebuild=args.rebuild)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Refreshed in {elapsed * 1000:.1f} ms: {applied} change log entries applied, "
+          f"{len(rebuilt)} tables recounted{' (' + ', '.join(rebuilt) + ')' if rebuilt else ''}")
+    print(f"📊 {aggregates.operator_count} operators, {aggregates.certification_count} certifications, "
+          f"{aggregates.tracker_records} status tracker records")
+    if args.verify:
+        mismatched = aggregates.verify()
+        if mismatched:
+            print(f"❌ Counts differ from a full recount: {', '.join(mismatched)}")
+            sys.exit(1)
+        print("✅ Counts match a full recount")
+
+if __name__ == '__main__':
+    main()
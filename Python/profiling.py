@@ -0,0 +1,300 @@
+"""
+Profiling Switches
+==================
+Common ``--profile`` / ``--trace-memory`` options for the exporter and the
+analysis scripts, so a slow run can be diagnosed from that one run:
+
+    parser = argparse.ArgumentParser(...)
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'cert_compliance', args.gaps)
+
+    with profiling.phase('compute'):
+        ...
+
+- ``--profile`` runs the tool under cProfile and records the time spent in
+  each phase (load, index, compute, render, write). App_Data loads and index
+  builds are counted as ``load`` and ``index`` by app_data.py itself. Phase
+  times are exclusive: time in a nested phase is not counted again in the
+  phase around it.
+- ``--trace-memory`` traces allocations with tracemalloc: the overall peak,
+  the peak while each phase was open, and the top allocation sites at the
+  end of the phase that left the most memory allocated.
+
+When the tool exits, the report goes to ``<tool>.profile.txt`` next to the
+tool's normal output (or to ``--profile-report PATH``). With ``--profile``
+the raw cProfile data is also written alongside as ``<tool>.prof``, for
+pstats or snakeviz. Both names are in .gitignore.
+
+The CPU profile covers the main thread plus any thread whose work is
+wrapped in ``profiling.thread()`` (the exporter's table threads, the query
+daemon's executor). Up to Python 3.11 each such thread gets its own
+profiler, merged into the report. From 3.12 cProfile runs on
+sys.monitoring, which allows one profiler per process, but that profiler
+sees every thread, so ``thread()`` does nothing there and the calls of all
+threads are interleaved in one profile. Worker processes are not in it; run
+with ``--workers 1`` to profile that work.
+Without either switch, ``phase()`` and ``thread()`` do nothing.
+
+Usage:
+    python <tool>.py ... --profile [--trace-memory] [--profile-report PATH]
+"""
+
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Rows of each pstats listing in the report
+TOP_FUNCTIONS = 30
+
+# Allocation sites listed in the report
+TOP_ALLOCATIONS = 15
+
+# Python 3.12+ allows a single active cProfile profiler, which then covers all threads
+PER_THREAD_PROFILERS = sys.version_info < (3, 12)
+SHARED_PROFILE_NOTE = ("Python 3.12+ allows one profiler per process; "
+                       "worker thread calls are interleaved with the main thread's in the CPU profile")
+
+# A new allocation snapshot is only taken once traced memory exceeds the last one by this factor
+SNAPSHOT_GROWTH = 1.1
+
+MB = 1024 * 1024
+
+# The active session, if --profile or --trace-memory was given
+_session = None
+
+def add_arguments(parser):
+    """Add --profile, --trace-memory and --profile-report to an argparse parser."""
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', action='store_true',
+                       help="Write a CPU profile and per-phase timings to a report file")
+    group.add_argument('--trace-memory', action='store_true',
+                       help="Trace allocations (tracemalloc) and add peaks and top allocations to the report")
+    group.add_argument('--profile-report', metavar='PATH',
+                       help="Report file (default: <tool>.profile.txt next to the output)")
+
+class Session:
+    """Phase timings, CPU profile and memory trace for one run."""
+
+    def __init__(self, tool, report_path, cpu=True, memory=False):
+        self.tool = tool
+        self.report_path = report_path
+        self.profiler = cProfile.Profile() if cpu else None
+        self.thread_profilers = []
+        self.shared_thread_profile = False   # Other threads' calls are in self.profiler (3.12+)
+        self.memory = memory
+        self.phases = {}            # name -> [seconds, calls, peak traced bytes]
+        self.peak = 0
+        self.snapshot = None
+        self.snapshot_bytes = 0
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def begin(self):
+        if self.memory:
+            tracemalloc.start()
+        if self.profiler:
+            self.profiler.enable()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _fold_peak(self, stack):
+        """Fold tracemalloc's peak since the last reset into the open phases, then reset it."""
+        if not self.memory or not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        self.peak = max(self.peak, peak)
+        for entry in stack:
+            entry[2] = max(entry[2], peak)
+        tracemalloc.reset_peak()
+
+    def _add(self, entry, now, calls=0):
+        with self._lock:
+            totals = self.phases.setdefault(entry[0], [0.0, 0, 0])
+            totals[0] += now - entry[1]
+            totals[1] += calls
+            totals[2] = max(totals[2], entry[2])
+        entry[1] = now
+
+    @contextmanager
+    def phase(self, name):
+        stack = self._stack()
+        self._fold_peak(stack)
+        now = time.perf_counter()
+        if stack:
+            self._add(stack[-1], now)  # The enclosing phase is paused until this one ends
+        entry = [name, now, 0]
+        stack.append(entry)
+        try:
+            yield
+        finally:
+            self._fold_peak(stack)
+            now = time.perf_counter()
+            stack.pop()
+            self._add(entry, now, calls=1)
+            if stack:
+                stack[-1][1] = now
+            if self.memory:
+                self._maybe_snapshot()
+
+    def _maybe_snapshot(self):
+        if not tracemalloc.is_tracing():
+            return
+        current = tracemalloc.get_traced_memory()[0]
+        if current > self.snapshot_bytes * SNAPSHOT_GROWTH:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_bytes = current
+
+    @contextmanager
+    def thread(self):
+        """Profile the calling worker thread while the block runs.
+
+        Each thread has one profiler, re-enabled for every block, so a thread
+        pool running many short tasks does not pile up profilers.
+        """
+        if (self.profiler is None or threading.current_thread() is threading.main_thread()
+                or getattr(self._local, 'profiling', False)):
+            yield
+            return
+        if not PER_THREAD_PROFILERS:
+            self.shared_thread_profile = True
+            yield
+            return
+        profiler = getattr(self._local, 'profiler', None)
+        if profiler is None:
+            profiler = self._local.profiler = cProfile.Profile()
+            with self._lock:
+                self.thread_profilers.append(profiler)
+        self._local.profiling = True
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._local.profiling = False
+
+    def stats(self, stream=None):
+        """pstats.Stats of the main thread and every profiled thread."""
+        stats = pstats.Stats(self.profiler, stream=stream)
+        with self._lock:
+            for profiler in self.thread_profilers:
+                stats.add(profiler)
+        return stats
+
+    def add_time(self, name, seconds, calls=1):
+        with self._lock:
+            totals = self.phases.setdefault(name, [0.0, 0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+
+    def finish(self):
+        """Stop profiling and write the report (and the .prof file)."""
+        wall = time.perf_counter() - self.started
+        if self.profiler:
+            self.profiler.disable()
+        if self.memory:
+            self._fold_peak([])
+            self._maybe_snapshot()
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+        os.makedirs(os.path.dirname(os.path.abspath(self.report_path)), exist_ok=True)
+        with open(self.report_path, 'w', encoding='utf-8') as f:
+            f.write(self.render(wall))
+        print(f"📈 Profile report written to {self.report_path}")
+        if self.shared_thread_profile:
+            print(f"⚠️  {SHARED_PROFILE_NOTE}")
+        if self.profiler:
+            self.stats().dump_stats(self.stats_path)
+            print(f"📈 CPU profile written to {self.stats_path}")
+
+    @property
+    def stats_path(self):
+        return os.path.splitext(self.report_path)[0].removesuffix('.profile') + '.prof'
+
+    def render(self, wall):
+        lines = [
+            "=" * 100,
+            f"PROFILE: {self.tool}",
+            "=" * 100,
+            f"Command:  {' '.join([os.path.basename(sys.executable)] + sys.argv)}",
+            f"Started:  {self.started_at.isoformat(timespec='seconds')}",
+            f"Wall:     {wall:.3f}s",
+        ]
+        if self.memory:
+            lines.append(f"Peak traced memory: {self.peak / MB:,.1f} MB")
+
+        lines += ["", "PHASES (exclusive wall time)", "-" * 100,
+                  f"{'Phase':<20} {'Seconds':>10} {'Share':>7} {'Calls':>8}"
+                  + (f" {'Peak MB':>10}" if self.memory else '')]
+        phased = 0.0
+        for name, (seconds, calls, peak) in sorted(self.phases.items(), key=lambda item: -item[1][0]):
+            phased += seconds
+            lines.append(f"{name:<20} {seconds:>10.3f} {seconds / wall * 100 if wall else 0:>6.1f}% {calls:>8}"
+                         + ((f" {peak / MB:>10,.1f}" if peak else f" {'-':>10}") if self.memory else ''))
+        lines.append(f"{'(outside phases)':<20} {max(wall - phased, 0):>10.3f}")
+
+        if self.snapshot is not None:
+            lines += ["", f"TOP ALLOCATIONS (at {self.snapshot_bytes / MB:,.1f} MB traced)", "-" * 100]
+            for stat in self.snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+                frame = stat.traceback[0]
+                lines.append(f"{stat.size / MB:>10,.1f} MB {stat.count:>10,} blocks  {frame.filename}:{frame.lineno}")
+
+        if self.profiler:
+            threads = f", main + {len(self.thread_profilers)} threads" if self.thread_profilers else ''
+            if self.shared_thread_profile:
+                lines += ["", f"Note: {SHARED_PROFILE_NOTE}"]
+            for sort, title in (('cumulative', f'CPU PROFILE (by cumulative time{threads})'),
+                                ('tottime', f'CPU PROFILE (by own time{threads})')):
+                buffer = io.StringIO()
+                self.stats(buffer).strip_dirs().sort_stats(sort).print_stats(TOP_FUNCTIONS)
+                lines += ["", title, "-" * 100, buffer.getvalue().strip('\n')]
+        return '\n'.join(lines) + '\n'
+
+def report_dir(output_path):
+    """Directory of a tool's output (a file or a directory); the current directory if it has none."""
+    if not output_path:
+        return os.getcwd()
+    if os.path.isdir(output_path):
+        return output_path
+    return os.path.dirname(os.path.abspath(output_path))
+
+def start(args, tool, output_path=None):
+    """Start profiling if args asks for it; the report is written when the process exits.
+
+    output_path is the tool's main output file or directory; the report is written next to it.
+    """
+    global _session
+    if not (getattr(args, 'profile', False) or getattr(args, 'trace_memory', False)):
+        return None
+    report_path = args.profile_report or os.path.join(report_dir(output_path), f"{tool}.profile.txt")
+    _session = Session(tool, report_path, cpu=args.profile, memory=args.trace_memory)
+    atexit.register(_session.finish)
+    _session.begin()
+    return _session
+
+def phase(name):
+    """Context manager timing a phase of the run (no-op unless profiling)."""
+    return _session.phase(name) if _session else nullcontext()
+
+def thread():
+    """Context manager adding a worker thread's work to the CPU profile (no-op unless profiling)."""
+    return _session.thread() if _session else nullcontext()
+
+def add_time(name, seconds, calls=1):
+    """Add time measured elsewhere (e.g. the exporter's per-table metrics) to a phase."""
+    if _session:
+        _session.add_time(name, seconds, calls)
@@ -0,0 +1,247 @@
+"""
+Query App_Data
+==============
+Ad hoc filters and projections over the App_Data JSON files, answered from
+the indexes in app_data.py instead of a fresh linear scan per question.
+
+Filters (each may be repeated; all must match):
+    --where FIELD=VALUE      exact match (true/false/null are parsed)
+    --ieq FIELD=VALUE        case-insensitive match
+    --contains FIELD=TEXT    case-insensitive substring
+
+Equality filters pick the cheapest index: a composite index such as
+(DivisionID, PizzaStatusID) on pay_CertTypes or (DivisionID, Status) on
+pay_StatusTypes when every field of it is filtered on, otherwise the most
+selective single-field index. Remaining filters run over that candidate
+list only.
+
+``--batch FILE`` runs one query per line (same arguments, ``-`` for stdin)
+in a single process, so files are parsed and indexes built once for all of
+them. ``--server URL`` sends the query to a running query_daemon.py
+instead, which already has everything loaded.
+
+Usage:
+    python query_app_data.py cert_types --where DivisionID="10 - OR" \\
+        --where PizzaStatusID=0F3DDDE2-1920-4E71-A40A-7610F5C58FAC --fields ID,Certification
+    python query_app_data.py status_types --where DivisionID="10 - OR" --contains Status=contracting
+    python query_app_data.py --batch queries.txt [--profile] [--trace-memory]
+"""
+
+import argparse
+import csv
+import json
+import shlex
+import sys
+import time
+import urllib.error
+import urllib.request
+from itertools import product
+
+import profiling
+from app_data import COMPOSITE_INDEXES, FILES, AppData
+
+FORMATS = ('records', 'table', 'json', 'csv')
+
+def parse_value(text):
+    """Command-line value -> the JSON value it stands for."""
+    lowered = text.lower()
+    if lowered == 'null':
+        return None
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    return text
+
+def value_variants(value):
+    """Values a filter should match: numeric text also matches the number (MobileAppOrder is an int)."""
+    if isinstance(value, str) and value.lstrip('-').isdigit():
+        return [value, int(value)]
+    return [value]
+
+def resolve_table(name):
+    """'cert_types', 'pay_CertTypes' or 'pay_CertTypes.json' -> 'pay_CertTypes.json'."""
+    if name in FILES:
+        return FILES[name]
+    filename = name if name.endswith('.json') else f"{name}.json"
+    if filename in FILES.values():
+        return filename
+    raise ValueError(f"Unknown table '{name}' (choose from: {', '.join(FILES)})")
+
+def split_filter(text):
+    field, sep, value = text.partition('=')
+    if not sep or not field:
+        raise ValueError(f"Expected FIELD=VALUE, got '{text}'")
+    return field.strip(), value
+
+def candidates(table, filename, equals):
+    """Smallest record list guaranteed to contain every match of the equality filters.
+
+    Returns (records, description of the access path).
+    """
+    if not equals:
+        return table.records, 'scan'
+    for fields in COMPOSITE_INDEXES.get(filename, ()):
+        if all(field in equals for field in fields):
+            index = table.composite_index(*fields)
+            records = []
+            for key in product(*(value_variants(equals[field]) for field in fields)):
+                records.extend(index.get(key, ()))
+            return records, f"composite index ({', '.join(fields)})"
+    best = None
+    for field, value in equals.items():
+        # Single-field indexes leave out empty values, so they can only answer truthy lookups
+        # ('0' also matches the number 0, which is not indexed)
+        variants = value_variants(value)
+        if not all(variants):
+            continue
+        index = table.index(field)
+        records = [record for variant in variants for record in index.get(variant, ())]
+        if best is None or len(records) < len(best[0]):
+            best = (records, f"index ({field})")
+    return best or (table.records, 'scan')
+
+def matches(record, equals, iequals, contains):
+    for field, value in equals.items():
+        if record.get(field) not in value_variants(value):
+            return False
+    for field, value in iequals.items():
+        if str(record.get(field) or '').lower() != value.lower():
+            return False
+    for field, text in contains.items():
+        if text.lower() not in str(record.get(field) or '').lower():
+            return False
+    return True
+
+def select(store, table_name, where=None, ieq=None, contains=None, fields=None, order_by=None, limit=None):
+    """Run one query; returns (rows, access path). Filters are {field: value} dicts."""
+    filename = resolve_table(table_name)
+    table = store.table(filename)
+    equals, iequals, contains = dict(where or {}), dict(ieq or {}), dict(contains or {})
+    records, access_path = candidates(table, filename, equals)
+    rows = [record for record in records if matches(record, equals, iequals, contains)]
+    if order_by:
+        rows.sort(key=lambda record: tuple((record.get(f) is None, str(record.get(f))) for f in order_by))
+    if limit is not None:
+        rows = rows[:limit]
+    if fields:
+        rows = [{field: record.get(field) for field in fields} for record in rows]
+    return rows, access_path
+
+def remote_select(server, table_name, where=None, ieq=None, contains=None, fields=None, order_by=None,
+                  limit=None):
+    """select() answered by a query_daemon.py at server (e.g. http://127.0.0.1:8765)."""
+    query = {'table': table_name, 'where': where, 'ieq': ieq, 'contains': contains, 'fields': fields,
+             'order_by': order_by, 'limit': limit}
+    request = urllib.request.Request(server.rstrip('/') + '/query', data=json.dumps(query).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            result = json.load(response)
+    except urllib.error.HTTPError as e:
+        raise ValueError(json.load(e).get('error', str(e)))
+    except urllib.error.URLError as e:
+        raise ValueError(f"Cannot reach {server}: {e.reason}")
+    return result['rows'], f"{result['access_path']} on {server}"
+
+def print_rows(rows, output_format, out=sys.stdout):
+    if output_format == 'json':
+        json.dump(rows, out, indent=2, ensure_ascii=False, default=str)
+        out.write('\n')
+    elif output_format == 'csv':
+        columns = list(rows[0]) if rows else []
+        writer = csv.DictWriter(out, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    elif output_format == 'table':
+        columns = list(rows[0]) if rows else []
+        widths = {c: min(40, max([len(c)] + [len(str(row.get(c))) for row in rows])) for c in columns}
+        print('  '.join(f"{c:<{widths[c]}}" for c in columns), file=out)
+        print('  '.join('-' * widths[c] for c in columns), file=out)
+        for row in rows:
+            print('  '.join(f"{str(row.get(c))[:widths[c]]:<{widths[c]}}" for c in columns), file=out)
+    else:
+        for i, row in enumerate(rows, 1):
+            items = list(row.items())
+            first_field, first_value = items[0] if items else ('', '')
+            print(f"{i}. {first_field}: {first_value}", file=out)
+            for field, value in items[1:]:
+                print(f"   {field}: {value}", file=out)
+            print(file=out)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Filter and project App_Data JSON files.")
+    parser.add_argument('table', nargs='?', help=f"Table to query: {', '.join(FILES)}")
+    parser.add_argument('--where', action='append', default=[], metavar='FIELD=VALUE')
+    parser.add_argument('--ieq', action='append', default=[], metavar='FIELD=VALUE')
+    parser.add_argument('--contains', action='append', default=[], metavar='FIELD=TEXT')
+    parser.add_argument('--fields', help="Comma-separated fields to output (default: all)")
+    parser.add_argument('--order-by', help="Comma-separated fields to sort by")
+    parser.add_argument('--limit', type=int)
+    parser.add_argument('--format', choices=FORMATS, default='records')
+    parser.add_argument('--count', action='store_true', help="Only print the number of matches")
+    parser.add_argument('--explain', action='store_true', help="Print the access path used")
+    parser.add_argument('--batch', metavar='FILE', help="Run one query per line of FILE ('-' for stdin)")
+    parser.add_argument('--server', metavar='URL', help="Ask a running query_daemon.py instead of loading files")
+    return parser
+
+def run(store, args):
+    """Run the query described by parsed args and print it."""
+    if not args.table:
+        raise ValueError("A table is required")
+    split = lambda items: dict(split_filter(item) for item in items)
+    where = {field: parse_value(value) for field, value in split(args.where).items()}
+    fields = [f.strip() for f in args.fields.split(',')] if args.fields else None
+    order_by = [f.strip() for f in args.order_by.split(',')] if args.order_by else None
+    with profiling.phase('compute'):
+        if args.server:
+            rows, access_path = remote_select(args.server, args.table, where, split(args.ieq),
+                                              split(args.contains), fields, order_by, args.limit)
+        else:
+            rows, access_path = select(store, args.table, where, split(args.ieq), split(args.contains),
+                                       fields, order_by, args.limit)
+    with profiling.phase('render'):
+        if args.explain:
+            print(f"🔎 {resolve_table(args.table)} via {access_path}")
+        if args.count:
+            print(len(rows))
+        else:
+            print_rows(rows, args.format)
+    return rows
+
+def run_batch(store, parser, path, server=None):
+    """Run every query line in path (against server, if given); returns the number of queries run."""
+    handle = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    count = 0
+    started = time.perf_counter()
+    with handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            print(f"\n▶ {line}")
+            try:
+                line_args = parser.parse_args(shlex.split(line))
+                line_args.server = line_args.server or server
+                run(store, line_args)
+            except (ValueError, SystemExit) as e:
+                print(f"❌ {e}")
+            count += 1
+    print(f"\n✅ {count} queries in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return count
+
+def main(argv=None):
+    parser = build_parser()
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.start(args, 'query_app_data')
+    store = AppData()
+    try:
+        if args.batch:
+            run_batch(store, parser, args.batch, args.server)
+        else:
+            run(store, args)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+"""
+App_Data Query Daemon
+=====================
+A long-running localhost service that loads every App_Data file once,
+keeps its indexes built, and answers query_app_data.py queries over
+HTTP/JSON. A batch of lookups then costs one load in total instead of one
+per script run.
+
+- Files are loaded (from the snapshot cache where possible) and the common
+  indexes are built before the first request is served.
+- A watcher polls the files' size/mtime. When export_database_to_json.py
+  rewrites them and they have been stable for one poll interval, a new
+  store is loaded in a background thread and swapped in with a single
+  assignment. Requests in progress finish on the old store; nothing ever
+  sees a half-loaded one. If the reload fails, the old store stays in
+  service and the error is reported by /status.
+- Connections are handled by asyncio, so many clients can be connected at
+  once (HTTP/1.1 keep-alive is supported). Queries run in a thread pool, so
+  a slow one does not hold up /health or other connections meanwhile.
+- ``--profile`` / ``--trace-memory`` (see profiling.py) cover the whole
+  session, reloads included; the report is written when the daemon stops.
+
+Endpoints:
+    GET  /health                 {"status": "ok", "generation": n}
+    GET  /status                 load time, file signatures, record counts, reloads
+    GET  /query/<table>?where=FIELD=VALUE&ieq=...&contains=...&fields=A,B&order_by=A&limit=N&count=1
+    POST /query                  {"table", "where": {}, "ieq": {}, "contains": {}, "fields": [],
+                                  "order_by": [], "limit": N, "count": false}
+    POST /batch                  {"queries": [query, ...]} -> {"results": [...]}
+    POST /reload                 reload now, without waiting for the watcher
+
+Usage:
+    python query_daemon.py [--host 127.0.0.1] [--port 8765] [--poll 1.0] [--app-data DIR]
+        [--profile] [--trace-memory]
+    curl 'http://127.0.0.1:8765/query/cert_types?where=DivisionID=10%20-%20OR&fields=ID,Certification'
+    python query_app_data.py status_types --contains Status=contracting --server http://127.0.0.1:8765
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import profiling
+from app_data import APP_DATA_DIR, CACHE_DIR, COMPOSITE_INDEXES, FILES, AppData
+from query_app_data import parse_value, resolve_table, select, split_filter
+
+HOST = '127.0.0.1'
+PORT = 8765
+
+# Seconds between checks of the App_Data files
+POLL_INTERVAL = 1.0
+
+# Largest request body accepted (bytes)
+MAX_BODY = 1 << 20
+
+# Single-field indexes built at load time, besides the composite ones
+WARM_INDEXES = {
+    'pay_Certifications.json': ['OperatorID'],
+    'pay_CertTypes.json': ['DivisionID', 'PizzaStatusID'],
+    'pay_StatusTypes.json': ['DivisionID', 'PizzaStatusID'],
+    'pay_PizzaStatuses.json': ['ClientID'],
+    'pay_Operators.json': ['DivisionID', 'StatusID'],
+}
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def file_signatures(app_data_dir):
+    """{filename: (size, mtime_ns) or None} for every App_Data file."""
+    signatures = {}
+    for filename in FILES.values():
+        try:
+            stat = os.stat(os.path.join(app_data_dir, filename))
+            signatures[filename] = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            signatures[filename] = None
+    return signatures
+
+def load_store(app_data_dir, cache_dir=CACHE_DIR):
+    """A fully loaded AppData with its indexes built."""
+    store = AppData(app_data_dir, cache_dir)
+    for filename in FILES.values():
+        if not os.path.exists(store.path(filename)):
+            continue
+        table = store.table(filename)
+        for fields in COMPOSITE_INDEXES.get(filename, ()):
+            table.composite_index(*fields)
+        for field in WARM_INDEXES.get(filename, ()):
+            table.index(field)
+    return store
+
+class Snapshot:
+    """A loaded store and the file signatures it was loaded from."""
+
+    def __init__(self, store, signatures, generation, load_seconds):
+        self.store = store
+        self.signatures = signatures
+        self.generation = generation
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+
+def split_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()] if value else None
+
+def query_from_params(table, params):
+    """Query dict from /query/<table> URL parameters (same syntax as the command line)."""
+    split = lambda name: dict(split_filter(item) for item in params.get(name, []))
+    limit = params.get('limit', [None])[-1]
+    return {
+        'table': table,
+        'where': {field: parse_value(value) for field, value in split('where').items()},
+        'ieq': split('ieq'),
+        'contains': split('contains'),
+        'fields': split_list(params.get('fields', [None])[-1]),
+        'order_by': split_list(params.get('order_by', [None])[-1]),
+        'limit': int(limit) if limit else None,
+        'count': params.get('count', ['0'])[-1].lower() in ('1', 'true', 'yes'),
+    }
+
+def run_query(store, query):
+    """Answer one query dict against store."""
+    if not isinstance(query, dict) or not query.get('table'):
+        raise HttpError(400, "A query needs a 'table'")
+    started = time.perf_counter()
+    try:
+        with profiling.phase('compute'):
+            rows, access_path = select(store, query['table'], query.get('where'), query.get('ieq'),
+                                       query.get('contains'), query.get('fields'), query.get('order_by'),
+                                       query.get('limit'))
+    except FileNotFoundError as e:
+        raise HttpError(404, str(e))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HttpError(400, str(e))
+    result = {'table': resolve_table(query['table']), 'access_path': access_path, 'count': len(rows)}
+    if not query.get('count'):
+        result['rows'] = rows
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+def run_batch(store, queries):
+    """Answer a list of query dicts; a failing query gets an error entry instead of failing the batch."""
+    results = []
+    for query in queries:
+        try:
+            results.append(run_query(store, query))
+        except HttpError as e:
+            results.append({'error': str(e), 'status': e.status})
+    return results
+
+class QueryService:
+    """Holds the current Snapshot, reloads it when App_Data changes, and serves HTTP."""
+
+    def __init__(self, app_data_dir=APP_DATA_DIR, cache_dir=CACHE_DIR, poll_interval=POLL_INTERVAL):
+        self.app_data_dir = app_data_dir
+        self.cache_dir = cache_dir
+        self.poll_interval = poll_interval
+        self.snapshot = None
+        self.reloads = 0
+        self.last_error = None
+        self.requests = 0
+        self._reload_lock = asyncio.Lock()
+
+    def _load(self, generation):
+        started = time.perf_counter()
+        signatures = file_signatures(self.app_data_dir)
+        # Runs in an executor thread
+        with profiling.thread():
+            store = load_store(self.app_data_dir, self.cache_dir)
+        return Snapshot(store, signatures, generation, time.perf_counter() - started)
+
+    @staticmethod
+    def _compute(function, *args):
+        # Runs in an executor thread
+        with profiling.thread():
+            return function(*args)
+
+    async def compute(self, function, *args):
+        """function(*args) in a worker thread, leaving the event loop free for other connections."""
+        return await asyncio.get_running_loop().run_in_executor(None, self._compute, function, *args)
+
+    async def reload(self):
+        """Load a new snapshot in a worker thread and swap it in; the old one serves until then."""
+        async with self._reload_lock:
+            generation = self.snapshot.generation + 1 if self.snapshot else 1
+            try:
+                snapshot = await asyncio.get_running_loop().run_in_executor(None, self._load, generation)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"❌ Reload failed, still serving generation {generation - 1}: {self.last_error}")
+                if self.snapshot is None:
+                    raise
+                return False
+            self.snapshot = snapshot
+            self.last_error = None
+            if generation > 1:
+                self.reloads += 1
+            print(f"✅ Loaded App_Data generation {generation} in {snapshot.load_seconds:.2f}s")
+            return True
+
+    async def watch(self):
+        """Reload once changed files have been stable for one poll interval.
+
+        Files that failed to load are not retried until they change again.
+        """
+        pending = failed = None
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            signatures = file_signatures(self.app_data_dir)
+            if signatures == self.snapshot.signatures or signatures == failed:
+                pending = None
+            elif signatures != pending:
+                pending = signatures
+            else:
+                changed = [name for name in signatures if signatures[name] != self.snapshot.signatures.get(name)]
+                print(f"🔄 App_Data changed ({', '.join(changed)}), reloading")
+                failed = None if await self.reload() else signatures
+                pending = None
+
+    def status(self):
+        snapshot = self.snapshot
+        return {
+            'app_data_dir': self.app_data_dir,
+            'generation': snapshot.generation,
+            'loaded_at': snapshot.loaded_at,
+            'load_seconds': round(snapshot.load_seconds, 3),
+            'reloads': self.reloads,
+            'requests': self.requests,
+            'last_error': self.last_error,
+            'files': {filename: {'signature': signature,
+                                 'records': len(snapshot.store.table(filename)) if signature else None}
+                      for filename, signature in snapshot.signatures.items()},
+        }
+
+    async def route(self, method, target, body):
+        """(status, JSON-able result) for one request."""
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        store = self.snapshot.store  # one snapshot for the whole request
+        if path == '/health':
+            return 200, {'status': 'ok', 'generation': self.snapshot.generation}
+        if path == '/status':
+            return 200, self.status()
+        if path.startswith('/query/') and method == 'GET':
+            try:
+                query = query_from_params(unquote(path[len('/query/'):]), parse_qs(url.query))
+            except ValueError as e:
+                raise HttpError(400, str(e))
+            return 200, await self.compute(run_query, store, query)
+        if path in ('/query', '/batch', '/reload'):
+            if method != 'POST':
+                raise HttpError(405, f"{path} expects POST")
+            if path == '/reload':
+                reloaded = await self.reload()
+                return 200, {'reloaded': reloaded, 'generation': self.snapshot.generation}
+            try:
+                payload = json.loads(body or b'{}')
+            except ValueError as e:
+                raise HttpError(400, f"Invalid JSON: {e}")
+            if path == '/query':
+                return 200, await self.compute(run_query, store, payload)
+            queries = payload.get('queries') if isinstance(payload, dict) else None
+            if not isinstance(queries, list):
+                raise HttpError(400, "Expected {\"queries\": [...]}")
+            return 200, {'results': await self.compute(run_batch, store, queries)}
+        raise HttpError(404, f"No route for {method} {path}")
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client closes it or asks to."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.respond(writer, 400, {'error': 'Malformed request line'}, keep_alive=False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version.upper() == 'HTTP/1.1')
+
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {'error': f"Body over {MAX_BODY} bytes"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                self.requests += 1
+                try:
+                    status, result = await self.route(method.upper(), target, body)
+                except HttpError as e:
+                    status, result = e.status, {'error': str(e)}
+                except Exception as e:
+                    status, result = 500, {'error': f"{type(e).__name__}: {e}"}
+                await self.respond(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer, status, result, keep_alive=True):
+        with profiling.phase('render'):
+            payload = json.dumps(result, ensure_ascii=False, default=str).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+    async def serve(self, host=HOST, port=PORT):
+        await self.reload()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        watcher = asyncio.create_task(self.watch())
+        print(f"🚀 Serving {self.app_data_dir} on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve App_Data queries over HTTP from memory.")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--poll', type=float, default=POLL_INTERVAL, help="Seconds between file checks")
+    parser.add_argument('--app-data', default=APP_DATA_DIR, help="App_Data directory to serve")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'query_daemon')
+
+    service = QueryService(args.app_data, poll_interval=args.poll)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+
+if __name__ == '__main__':
+    main()
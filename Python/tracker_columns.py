@@ -0,0 +1,249 @@
+"""
+Columnar StatusTracker History
+==============================
+Holds pay_StatusTracker events as parallel typed arrays instead of one dict
+per event:
+
+- ``operator``, ``status``, ``division``: int32 codes into interned value
+  tables (each distinct GUID / DivisionID string is stored once).
+- ``date``: int64 microseconds since the Unix epoch (``Date`` read as UTC).
+
+Missing values are ``MISSING`` (-1) for codes and ``NO_DATE`` for dates. A
+million events take about 20 MB this way versus well over 1 GB as dicts,
+and group-by counts run through C-level loops (``Counter`` over an array)
+rather than per-record Python code.
+
+Columns can be saved to and loaded from a single binary file, so the JSON
+only has to be converted once.
+
+Usage:
+    python tracker_columns.py [--input pay_StatusTracker.json] [--save tracker.columns]
+        [--profile] [--trace-memory]
+"""
+
+import argparse
+import marshal
+import os
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+
+import profiling
+from app_data import AppData, iter_records
+
+MISSING = -1
+NO_DATE = -(1 << 63)
+EPOCH = datetime(1970, 1, 1)
+EPOCH_UTC = EPOCH.replace(tzinfo=timezone.utc)
+
+# Bump when the saved file layout changes
+COLUMNS_VERSION = 1
+
+class Interner:
+    """Two-way mapping between values and dense integer codes."""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        """Code for value, assigning the next free one if it is new (MISSING for empty values)."""
+        if not value:
+            return MISSING
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value):
+        """Code for value, or MISSING if it has never been seen."""
+        return self.codes.get(value, MISSING)
+
+    def value(self, code):
+        return None if code == MISSING else self.values[code]
+
+def to_timestamp(value):
+    """ISO date string -> int64 microseconds since the epoch (naive dates are UTC)."""
+    if not value:
+        return NO_DATE
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        delta = moment - EPOCH
+    else:
+        delta = moment - EPOCH_UTC
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+def from_timestamp(value):
+    """int64 microseconds since the epoch -> naive UTC datetime."""
+    if value == NO_DATE:
+        return None
+    return datetime.fromtimestamp(value / 1000000, tz=timezone.utc).replace(tzinfo=None)
+
+class TrackerColumns:
+    """pay_StatusTracker events as interned, columnar arrays."""
+
+    def __init__(self):
+        self.operators = Interner()
+        self.statuses = Interner()
+        self.divisions = Interner()
+        self.operator = array('i')
+        self.status = array('i')
+        self.division = array('i')
+        self.date = array('q')
+
+    def __len__(self):
+        return len(self.operator)
+
+    @property
+    def nbytes(self):
+        """Bytes used by the column arrays (interned values not included)."""
+        return sum(len(column) * column.itemsize
+                   for column in (self.operator, self.status, self.division, self.date))
+
+    @property
+    def interned_nbytes(self):
+        """Approximate bytes used by the interned value tables."""
+        return sum(sys.getsizeof(interner.values) + sys.getsizeof(interner.codes)
+                   + sum(sys.getsizeof(value) for value in interner.values)
+                   for interner in (self.operators, self.statuses, self.divisions))
+
+    def interner(self, column):
+        """The Interner behind a code column."""
+        return {'operator': self.operators, 'status': self.statuses, 'division': self.divisions}[column]
+
+    def append(self, record):
+        """Add one tracker record (a dict as exported to pay_StatusTracker.json)."""
+        self.operator.append(self.operators.code(record.get('OperatorID')))
+        self.status.append(self.statuses.code(record.get('StatusID')))
+        self.division.append(self.divisions.code(record.get('DivisionID')))
+        self.date.append(to_timestamp(record.get('Date')))
+
+    def extend(self, records):
+        """Add records from any iterable (e.g. a streaming reader)."""
+        for record in records:
+            self.append(record)
+        return self
+
+    @classmethod
+    def from_records(cls, records):
+        return cls().extend(records)
+
+    @classmethod
+    def from_file(cls, filepath):
+        """Convert a pay_StatusTracker JSON array or NDJSON file, one record at a time."""
+        return cls().extend(iter_records(filepath))
+
+    @classmethod
+    def from_app_data(cls, store=None):
+        """Convert pay_StatusTracker from App_Data."""
+        store = store or AppData()
+        return cls().extend(store.stream('pay_StatusTracker.json'))
+
+    def count_codes(self, column):
+        """{code: number of events} for a code column."""
+        return Counter(getattr(self, column))
+
+    def count_by(self, column):
+        """{value: number of events} for a code column; events without a value are left out."""
+        interner = self.interner(column)
+        return {interner.values[code]: count
+                for code, count in self.count_codes(column).items() if code != MISSING}
+
+    def count_by_pair(self, first, second):
+        """{(first value, second value): number of events}, e.g. ('division', 'status')."""
+        first_interner, second_interner = self.interner(first), self.interner(second)
+        counts = Counter(zip(getattr(self, first), getattr(self, second)))
+        return {(first_interner.value(a), second_interner.value(b)): count
+                for (a, b), count in counts.items()}
+
+    def save(self, path):
+        """Write the columns to path (atomically)."""
+        data = {
+            'version': COLUMNS_VERSION,
+            'operators': self.operators.values,
+            'statuses': self.statuses.values,
+            'divisions': self.divisions.values,
+            'columns': {name: (column.typecode, column.tobytes())
+                        for name, column in (('operator', self.operator), ('status', self.status),
+                                             ('division', self.division), ('date', self.date))},
+        }
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            marshal.dump(data, f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read columns written by save()."""
+        with open(path, 'rb') as f:
+            data = marshal.loads(f.read())
+        if data.get('version') != COLUMNS_VERSION:
+            raise ValueError(f"{path} was written by an incompatible version")
+        columns = cls()
+        columns.operators = Interner(data['operators'])
+        columns.statuses = Interner(data['statuses'])
+        columns.divisions = Interner(data['divisions'])
+        for name, (typecode, raw) in data['columns'].items():
+            column = array(typecode)
+            column.frombytes(raw)
+            setattr(columns, name, column)
+        return columns
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert pay_StatusTracker to columnar form and report its footprint.")
+    parser.add_argument('--input', help="Tracker JSON/NDJSON file (default: App_Data/pay_StatusTracker.json)")
+    parser.add_argument('--save', metavar='PATH', help="Write the columns to PATH")
+    parser.add_argument('--compare', action='store_true',
+                        help="Also load the file as dicts and compare memory (slow on large files)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'tracker_columns', args.save)
+    filepath = args.input or AppData().path('pay_StatusTracker.json')
+
+    print(f"📥 Converting {filepath}")
+    started = time.perf_counter()
+    with profiling.phase('load'):
+        columns = TrackerColumns.from_file(filepath)
+    elapsed = time.perf_counter() - started
+    columnar_bytes = columns.nbytes + columns.interned_nbytes
+    print(f"   {len(columns):,} events, {len(columns.operators):,} operators, "
+          f"{len(columns.statuses):,} statuses, {len(columns.divisions):,} divisions in {elapsed:.2f}s")
+    print(f"   Columns: {columns.nbytes / (1024 * 1024):,.1f} MB arrays, "
+          f"{columnar_bytes / (1024 * 1024):,.1f} MB including interned values")
+
+    if args.compare:
+        # --trace-memory may already be tracing; measure the growth and leave its trace running
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        records = list(iter_records(filepath))
+        dict_bytes = tracemalloc.get_traced_memory()[0] - before
+        if not tracing:
+            tracemalloc.stop()
+        print(f"   Dicts:   {dict_bytes / (1024 * 1024):,.1f} MB for {len(records):,} records "
+              f"({dict_bytes / max(columnar_bytes, 1):.0f}x the columnar size)")
+        del records
+
+    started = time.perf_counter()
+    with profiling.phase('compute'):
+        per_operator = columns.count_by('operator')
+    elapsed = time.perf_counter() - started
+    counts = per_operator.values()
+    print(f"\n📊 Events per operator (group-by in {elapsed * 1000:.1f} ms): "
+          f"avg {sum(counts) / len(counts) if counts else 0:.1f}, max {max(counts) if counts else 0}")
+
+    if args.save:
+        with profiling.phase('write'):
+            columns.save(args.save)
+        print(f"💾 Saved columns to {args.save} ({os.path.getsize(args.save) / (1024 * 1024):,.1f} MB)")
+
+if __name__ == '__main__':
+    main()
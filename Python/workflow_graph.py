@@ -0,0 +1,299 @@
+"""
+Operator Workflow Graph
+=======================
+Builds, once per App_Data snapshot, the per-division operator workflow from
+pay_StatusTypes.json and pay_PizzaStatuses.json. Every lookup by StatusTypes
+``Id`` is then a dict access.
+
+The workflow chain follows Docs/OperatorStatusFiltering.md and the
+Requirements editor:
+
+- A StatusType is an operator status if it is not deleted, not Fleet, not
+  Providers, and has a PizzaStatusID whose PizzaStatus ``IsOperator``.
+- Each division's chain is sorted by ``parseInt(OrderID) || 9999``.
+  Duplicate Status names in a division keep the lowest OrderID; the
+  dropped duplicates resolve to the same step.
+
+``next_for_operator()`` is the Python equivalent of
+AutoAdvanceService.GetNextStatusForOperatorAsync. It resolves the current
+StatusType (by StatusID, else by Status name in the operator's division)
+and takes the next StatusType of the operator's division: lowest OrderID
+above the current one, skipping the same PizzaStatusID, non-numeric
+OrderID = 0. This rule runs over every StatusType in the division, not just
+the workflow chain, and is precomputed for each StatusType's own division.
+
+The graph is plain data. ``for_store()`` caches it as a marshal file in the
+App_Data cache, keyed on the two source files' size and mtime, so other
+tools load it instead of rebuilding it.
+
+Usage:
+    python workflow_graph.py [--division "10 - OR"] [--save PATH] [--profile] [--trace-memory]
+"""
+
+import argparse
+import bisect
+import hashlib
+import marshal
+import os
+import sys
+from collections import defaultdict
+
+import profiling
+from app_data import AppData
+from cert_bitsets import is_deleted, is_true
+
+# Bump when the saved layout changes
+GRAPH_VERSION = 1
+
+# Requirements editor: parseInt(OrderID) || 9999
+UNORDERED = 9999
+
+SOURCES = ('pay_StatusTypes.json', 'pay_PizzaStatuses.json')
+
+def parse_order(value):
+    """int.TryParse semantics: the integer value of OrderID, or 0."""
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return 0
+
+def workflow_order(value):
+    """Sort key of a workflow step: parseInt(OrderID) || 9999."""
+    return parse_order(value) or UNORDERED
+
+def is_operator_status(status_type, pizza_statuses):
+    """Docs/OperatorStatusFiltering.md: the StatusTypes shown in an operator workflow."""
+    pizza_status = pizza_statuses.get(status_type.get('PizzaStatusID'))
+    if pizza_status is None:
+        return False
+    if is_deleted(status_type) or is_true(status_type.get('Fleet')) or is_true(status_type.get('Providers')):
+        return False
+    return is_true(pizza_status.get('IsOperator'))
+
+class WorkflowGraph:
+    """Per-division operator workflow chains plus next-status links."""
+
+    def __init__(self):
+        self.chains = {}          # DivisionID -> [StatusType Id, ...] in workflow order
+        self.steps = {}           # StatusType Id -> (DivisionID, index in chain)
+        self.status_types = {}    # StatusType Id -> (DivisionID, Status, OrderID, PizzaStatusID)
+        self.by_name = {}         # (DivisionID, lower Status) -> first StatusType Id
+        self.advance = {}         # (DivisionID, StatusType Id) -> next StatusType Id or None
+        self._division_orders = None
+
+    @classmethod
+    def build(cls, status_types, pizza_statuses):
+        """Build from StatusType and PizzaStatus records."""
+        graph = cls()
+        pizza_by_id = {}
+        for pizza_status in pizza_statuses:
+            if pizza_status.get('ID'):
+                pizza_by_id.setdefault(pizza_status['ID'], pizza_status)
+
+        workflow = defaultdict(list)
+        for st in status_types:
+            status_id = st.get('Id')
+            if not status_id:
+                continue
+            division = st.get('DivisionID')
+            graph.status_types.setdefault(status_id, (division, st.get('Status'), st.get('OrderID'),
+                                                      st.get('PizzaStatusID')))
+            if st.get('Status'):
+                graph.by_name.setdefault((division, st['Status'].lower()), status_id)
+            if is_operator_status(st, pizza_by_id):
+                workflow[division].append(st)
+
+        for division, division_statuses in workflow.items():
+            # Stable sort, then keep the first (lowest order) of each Status name
+            division_statuses.sort(key=lambda st: workflow_order(st.get('OrderID')))
+            chain, kept = [], {}
+            for st in division_statuses:
+                index = kept.get(st.get('Status'))
+                if index is None:
+                    index = kept[st.get('Status')] = len(chain)
+                    chain.append(st['Id'])
+                graph.steps.setdefault(st['Id'], (division, index))
+            graph.chains[division] = chain
+
+        for status_id, (division, _, _, _) in graph.status_types.items():
+            if division:
+                graph.advance[division, status_id] = graph._next_in_division(division, status_id)
+        return graph
+
+    @classmethod
+    def from_store(cls, store):
+        return cls.build(store.status_types, store.pizza_statuses)
+
+    # --- Workflow chain ---------------------------------------------------
+
+    def chain(self, division):
+        """StatusType Ids of division's workflow, in order."""
+        return self.chains.get(division, [])
+
+    def position(self, status_id):
+        """(DivisionID, 0-based step) of a workflow StatusType, or None."""
+        return self.steps.get(status_id)
+
+    def next(self, status_id):
+        """Following workflow step's StatusType Id, or None at the end / outside the workflow."""
+        step = self.steps.get(status_id)
+        if step is None:
+            return None
+        chain = self.chains[step[0]]
+        return chain[step[1] + 1] if step[1] + 1 < len(chain) else None
+
+    def previous(self, status_id):
+        """Preceding workflow step's StatusType Id, or None at the start / outside the workflow."""
+        step = self.steps.get(status_id)
+        if step is None or step[1] == 0:
+            return None
+        return self.chains[step[0]][step[1] - 1]
+
+    def in_workflow(self, status_id):
+        """True if the StatusType is an operator workflow status (including dropped duplicates)."""
+        return status_id in self.steps
+
+    def status(self, status_id):
+        """Status name of a StatusType Id."""
+        info = self.status_types.get(status_id)
+        return info[1] if info else None
+
+    # --- AutoAdvanceService rules -----------------------------------------
+
+    def _orders(self, division):
+        """([OrderID, ...], [(Id, PizzaStatusID), ...]) for division's named StatusTypes, by OrderID (stable)."""
+        if self._division_orders is None:
+            entries = defaultdict(list)
+            for status_id, (st_division, status, order, pizza) in self.status_types.items():
+                if status:
+                    entries[st_division].append((parse_order(order), status_id, (pizza or '').lower()))
+            self._division_orders = {}
+            for st_division, division_entries in entries.items():
+                division_entries.sort(key=lambda entry: entry[0])
+                self._division_orders[st_division] = ([entry[0] for entry in division_entries],
+                                                      [entry[1:] for entry in division_entries])
+        return self._division_orders.get(division, ((), ()))
+
+    def _next_in_division(self, division, status_id):
+        _, _, order, pizza = self.status_types[status_id]
+        current_order, current_pizza = parse_order(order), (pizza or '').lower()
+        orders, entries = self._orders(division)
+        for index in range(bisect.bisect_right(orders, current_order), len(entries)):
+            step_id, step_pizza = entries[index]
+            if current_pizza and step_pizza == current_pizza:
+                continue
+            return step_id
+        return None
+
+    def resolve(self, operator):
+        """ResolveCurrentStatusType: the operator's StatusType Id, or None."""
+        status_id = operator.get('StatusID')
+        if status_id in self.status_types:
+            return status_id
+        status = operator.get('Status')
+        if status:
+            return self.by_name.get((operator.get('DivisionID'), status.lower()))
+        return None
+
+    def next_status(self, division, status_id):
+        """GetNextStatusTypeForOperator for a StatusType in the given (operator) division."""
+        if not division or status_id not in self.status_types:
+            return None
+        key = (division, status_id)
+        if key not in self.advance:
+            # Operator in a different division from its StatusType; rare, so computed on demand
+            self.advance[key] = self._next_in_division(division, status_id)
+        return self.advance[key]
+
+    def next_for_operator(self, operator):
+        """GetNextStatusForOperatorAsync: the StatusType Id the operator would advance to, or None."""
+        status_id = self.resolve(operator)
+        return self.next_status(operator.get('DivisionID'), status_id) if status_id else None
+
+    # --- Persistence --------------------------------------------------------
+
+    def to_data(self):
+        return {'chains': self.chains, 'steps': self.steps, 'status_types': self.status_types,
+                'by_name': self.by_name, 'advance': self.advance}
+
+    @classmethod
+    def from_data(cls, data):
+        graph = cls()
+        for name in ('chains', 'steps', 'status_types', 'by_name', 'advance'):
+            setattr(graph, name, data[name])
+        return graph
+
+    def save(self, path, key=None):
+        """Write the graph to path (atomically)."""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            marshal.dump((key or (GRAPH_VERSION,), self.to_data()), f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, key=None):
+        """Read a graph written by save(); None if it is missing or was saved under another key."""
+        try:
+            with open(path, 'rb') as f:
+                stored_key, data = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if stored_key != (key or (GRAPH_VERSION,)):
+            return None
+        return cls.from_data(data)
+
+    @classmethod
+    def for_store(cls, store):
+        """The graph for store's App_Data, from the cache when the source files are unchanged."""
+        if store.cache_dir is None:
+            return cls.from_store(store)
+        signatures = []
+        for filename in SOURCES:
+            stat = os.stat(store.path(filename))
+            signatures.append((stat.st_size, stat.st_mtime_ns))
+        key = (GRAPH_VERSION, sys.implementation.cache_tag, os.path.abspath(store.app_data_dir), tuple(signatures))
+        digest = hashlib.sha1(os.path.abspath(store.app_data_dir).encode('utf-8')).hexdigest()[:12]
+        path = os.path.join(store.cache_dir, f"workflow_graph.{digest}.marshal")
+        graph = cls.load(path, key)
+        if graph is None:
+            graph = cls.from_store(store)
+            try:
+                os.makedirs(store.cache_dir, exist_ok=True)
+                graph.save(path, key)
+            except OSError:
+                pass
+        return graph
+
+def print_chains(graph, division=None):
+    for chain_division in sorted(graph.chains):
+        if division and chain_division != division:
+            continue
+        chain = graph.chains[chain_division]
+        print(f"\n📍 {chain_division} ({len(chain)} steps)")
+        for index, status_id in enumerate(chain):
+            _, status, order, _ = graph.status_types[status_id]
+            next_id = graph.next_status(chain_division, status_id)
+            next_text = f"  → auto-advance: {graph.status(next_id)}" if next_id else ''
+            print(f"   {index + 1:>3}. [{order if order is not None else '-':>4}] {status}{next_text}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the per-division operator workflow.")
+    parser.add_argument('--division', help="Only show this DivisionID")
+    parser.add_argument('--save', metavar='PATH', help="Also write the graph to PATH")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'workflow_graph', args.save)
+
+    with profiling.phase('compute'):
+        graph = WorkflowGraph.for_store(AppData())
+    print(f"📊 {len(graph.chains)} division workflows, {len(graph.steps)} operator StatusTypes "
+          f"of {len(graph.status_types)}")
+    with profiling.phase('render'):
+        print_chains(graph, args.division)
+    if args.save:
+        with profiling.phase('write'):
+            graph.save(args.save)
+        print(f"\n💾 Saved graph to {args.save}")
+
+if __name__ == '__main__':
+    main()